@@ -0,0 +1,399 @@
+"""
+Módulo de auditoría estructurada
+Registros binarios de tamaño fijo (usuario, acción, estado, fecha) en un
+archivo de solo-anexado, con índice por usuario y día para responder
+consultas sin recorrer todo el historial. El índice se guarda como punto de
+control (con la cantidad de registros que cubre) al cerrar, y al abrir solo
+se leen los registros anexados después. La tabla de cadenas también es de
+solo-anexado
+"""
+
+import csv
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from datetime import datetime, date
+
+from file_utils import atomic_write_bytes
+
+
+class AuditLog:
+    """Almacén de auditoría de solo-anexado con índice por usuario y día"""
+
+    MAGIC = b"TBAUD001"
+    # timestamp (float64), id de usuario (uint32), id de acción (uint16), estado (uint8)
+    RECORD = struct.Struct("<dIHBx")
+
+    STATUS_FAILURE = 0
+    STATUS_SUCCESS = 1
+    STATUS_INFO = 2
+    STATUS_NAMES = {0: "FALLIDO", 1: "EXITOSO", 2: "INFO"}
+
+    INDEX_MAGIC = b"TBAIX001"
+    INDEX_HEADER_LEN = struct.Struct("<I")
+
+    def __init__(self, log_dir="logs", checkpoint_tail=10000):
+        self.log_dir = log_dir
+        self.data_file = os.path.join(log_dir, "audit.dat")
+        self.strings_file = os.path.join(log_dir, "audit_strings.log")
+        self.index_file = os.path.join(log_dir, "audit_index.bin")
+        # Si al abrir hubo que leer más registros que esto fuera del punto
+        # de control, se guarda uno nuevo (p. ej. tras varios cierres abruptos)
+        self.checkpoint_tail = checkpoint_tail
+
+        self._lock = threading.RLock()
+        self._users = []
+        self._actions = []
+        self._user_ids = {}
+        self._action_ids = {}
+        self._record_count = 0
+        self._user_day_index = {}
+        self._day_ranges = {}
+        self._log_id = None
+        self._checkpointed = 0
+
+        os.makedirs(log_dir, exist_ok=True)
+        self._open()
+
+    # ------------------------------------------------------------------
+    # Carga y persistencia
+    # ------------------------------------------------------------------
+
+    def _open(self):
+        """Abre el archivo de datos, carga las cadenas y el índice"""
+        if not os.path.exists(self.data_file) or os.path.getsize(self.data_file) == 0:
+            with open(self.data_file, 'wb') as f:
+                f.write(self.MAGIC)
+        else:
+            with open(self.data_file, 'rb') as f:
+                if f.read(len(self.MAGIC)) != self.MAGIC:
+                    raise ValueError(f"Archivo de auditoría inválido: {self.data_file}")
+
+        self._load_strings()
+        total = self._truncate_partial()
+        if total:
+            with open(self.data_file, 'rb') as f:
+                f.seek(len(self.MAGIC))
+                self._log_id = self._identity(f.read(self.RECORD.size))
+
+        self._load_checkpoint(total)
+        scanned = total - self._record_count
+        self._scan_records(self._record_count, total)
+        if scanned >= self.checkpoint_tail:
+            self.checkpoint()
+
+    def _load_strings(self):
+        """Carga las tablas de usuarios y acciones internados"""
+        if os.path.exists(self.strings_file):
+            with open(self.strings_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        kind, value = json.loads(line)
+                    except ValueError:
+                        # Línea cortada por un cierre abrupto: aún no la usa ningún registro
+                        break
+                    (self._users if kind == "u" else self._actions).append(value)
+        self._user_ids = {u: i for i, u in enumerate(self._users)}
+        self._action_ids = {a: i for i, a in enumerate(self._actions)}
+
+    @staticmethod
+    def _string_line(kind, value):
+        return json.dumps([kind, value], ensure_ascii=False) + "\n"
+
+    def _truncate_partial(self):
+        """Descarta un registro incompleto al final y devuelve la cantidad de registros"""
+        header = len(self.MAGIC)
+        size = os.path.getsize(self.data_file)
+        total = (size - header) // self.RECORD.size
+        end = header + total * self.RECORD.size
+        if size > end:
+            # Registro incompleto al final (cierre abrupto): se descarta
+            with open(self.data_file, 'r+b') as f:
+                f.truncate(end)
+        return total
+
+    def _load_checkpoint(self, total):
+        """
+        Carga el índice guardado si corresponde a este audit.dat (misma
+        identidad y no más registros de los que hay). Si no, queda vacío
+        """
+        self._record_count = 0
+        self._user_day_index = {}
+        self._day_ranges = {}
+        self._checkpointed = 0
+
+        try:
+            with open(self.index_file, 'rb') as f:
+                buffer = f.read()
+            if buffer[:len(self.INDEX_MAGIC)] != self.INDEX_MAGIC:
+                return
+            header_at = len(self.INDEX_MAGIC)
+            (header_len,) = self.INDEX_HEADER_LEN.unpack_from(buffer, header_at)
+            rows_at = header_at + self.INDEX_HEADER_LEN.size + header_len
+            header = json.loads(buffer[rows_at - header_len:rows_at].decode('utf-8'))
+        except (OSError, ValueError, struct.error):
+            return
+
+        if header.get('log_id') != self._log_id or not 0 < header.get('records', 0) <= total:
+            return
+
+        rows = array('I')
+        rows.frombytes(buffer[rows_at:])
+        users = self._user_day_index
+        for user_id, day, start, count in header['postings']:
+            users.setdefault(user_id, {})[day] = rows[start:start + count]
+        self._day_ranges = {day: (first, last) for day, first, last in header['days']}
+        self._record_count = self._checkpointed = header['records']
+
+    def _scan_records(self, start, total):
+        """Agrega al índice los registros de audit.dat desde start hasta total"""
+        if start >= total:
+            return
+
+        # Los registros van en orden cronológico: se reutilizan los límites
+        # del día del registro anterior en vez de convertir cada timestamp
+        users = self._user_day_index
+        ranges = self._day_ranges
+        day, day_start, day_end = None, 0.0, -1.0
+        offset = len(self.MAGIC)
+        size = self.RECORD.size
+        with open(self.data_file, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                records = self.RECORD.iter_unpack(data[offset + start * size:offset + total * size])
+                for recno, (timestamp, user_id, _, _) in enumerate(records, start):
+                    if not day_start <= timestamp < day_end:
+                        current = date.fromtimestamp(timestamp)
+                        day = current.toordinal()
+                        day_start = datetime.combine(current, datetime.min.time()).timestamp()
+                        day_end = datetime.combine(
+                            date.fromordinal(day + 1), datetime.min.time()
+                        ).timestamp()
+                    users.setdefault(user_id, {}).setdefault(day, array('I')).append(recno)
+                    # recno crece en el recorrido: el primero queda y el último avanza
+                    ranges[day] = (ranges.get(day, (recno,))[0], recno)
+        self._record_count = total
+
+    def checkpoint(self):
+        """
+        Guarda el índice completo junto con la cantidad de registros que
+        cubre. Se hace al cerrar, no en cada anexado
+        """
+        with self._lock:
+            if self._record_count == self._checkpointed:
+                return
+
+            postings = []
+            rows = array('I')
+            for user_id, days in self._user_day_index.items():
+                for day, recnos in days.items():
+                    postings.append([user_id, day, len(rows), len(recnos)])
+                    rows.extend(recnos)
+
+            header = json.dumps({
+                'records': self._record_count,
+                'log_id': self._log_id,
+                'days': [[day, first, last] for day, (first, last) in self._day_ranges.items()],
+                'postings': postings
+            }).encode('utf-8')
+            atomic_write_bytes(
+                self.index_file,
+                self.INDEX_MAGIC + self.INDEX_HEADER_LEN.pack(len(header)) + header + rows.tobytes()
+            )
+            self._checkpointed = self._record_count
+
+    @staticmethod
+    def _identity(first_record):
+        return hashlib.sha256(first_record).hexdigest()[:16]
+
+    def get_log_id(self):
+        """
+        Identidad del archivo de datos: hash de su primer registro (None si está
+        vacío). Cambia si audit.dat se borra y vuelve a empezar desde cero
+        """
+        return self._log_id
+
+    def _index_record(self, recno, timestamp, user_id):
+        day = date.fromtimestamp(timestamp).toordinal()
+        self._user_day_index.setdefault(user_id, {}).setdefault(day, array('I')).append(recno)
+
+        first, last = self._day_ranges.get(day, (recno, recno))
+        self._day_ranges[day] = (min(first, recno), max(last, recno))
+        self._record_count = recno + 1
+
+    def _intern(self, value, table, ids, kind, pending):
+        """Obtiene el id de una cadena; si es nueva se agrega a pending para anexarla"""
+        key = str(value)
+        if key not in ids:
+            ids[key] = len(table)
+            table.append(key)
+            pending.append(self._string_line(kind, key))
+        return ids[key]
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def append(self, user, action, status, timestamp=None):
+        """Anexa un registro de auditoría"""
+        if isinstance(status, bool):
+            status = self.STATUS_SUCCESS if status else self.STATUS_FAILURE
+        timestamp = time.time() if timestamp is None else timestamp
+
+        with self._lock:
+            pending = []
+            user_id = self._intern(str(user).strip().lower(), self._users, self._user_ids, "u", pending)
+            action_id = self._intern(action, self._actions, self._action_ids, "a", pending)
+
+            # Las cadenas nuevas se anexan antes que el registro que las usa
+            if pending:
+                with open(self.strings_file, 'a', encoding='utf-8') as f:
+                    f.write("".join(pending))
+            record = self.RECORD.pack(timestamp, user_id, action_id, status)
+            with open(self.data_file, 'ab') as f:
+                f.write(record)
+
+            if not self._record_count:
+                self._log_id = self._identity(record)
+            self._index_record(self._record_count, timestamp, user_id)
+
+    def flush(self):
+        """Sin datos pendientes: cada registro se escribe al anexarlo"""
+
+    def close(self):
+        """Guarda el punto de control del índice"""
+        self.checkpoint()
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def _candidate_records(self, user, start_day, end_day):
+        """Números de registro candidatos según usuario y rango de días"""
+        if user is not None:
+            user_id = self._user_ids.get(str(user).strip().lower())
+            if user_id is None:
+                return []
+            days = self._user_day_index.get(user_id, {})
+            recnos = []
+            for day in sorted(days):
+                if start_day <= day <= end_day:
+                    recnos.extend(days[day])
+            return recnos
+
+        # Los registros se anexan en orden cronológico, así que cada día es
+        # un rango contiguo; se lee desde el primero hasta el último del rango
+        ranges = [r for day, r in self._day_ranges.items() if start_day <= day <= end_day]
+        if not ranges:
+            return []
+        return range(min(r[0] for r in ranges), max(r[1] for r in ranges) + 1)
+
+    @staticmethod
+    def _to_day(value, default):
+        if value is None:
+            return default
+        if isinstance(value, datetime):
+            return value.date().toordinal()
+        if isinstance(value, date):
+            return value.toordinal()
+        return date.fromtimestamp(value).toordinal()
+
+    def query(self, user=None, action=None, status=None, start=None, end=None):
+        """
+        Consulta registros por usuario, acción, estado y rango de fechas
+        (start/end: date, datetime o timestamp; ambos inclusive por día).
+        Solo se leen los registros señalados por el índice
+        """
+        with self._lock:
+            start_day = self._to_day(start, 0)
+            end_day = self._to_day(end, date.max.toordinal())
+            recnos = self._candidate_records(user, start_day, end_day)
+            if not recnos:
+                return []
+
+            action_id = None
+            if action is not None:
+                action_id = self._action_ids.get(action)
+                if action_id is None:
+                    return []
+            if isinstance(status, bool):
+                status = self.STATUS_SUCCESS if status else self.STATUS_FAILURE
+
+            results = []
+            with open(self.data_file, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    offset = len(self.MAGIC)
+                    size = self.RECORD.size
+                    for recno in recnos:
+                        timestamp, user_id, rec_action, rec_status = self.RECORD.unpack_from(
+                            data, offset + recno * size
+                        )
+                        if action_id is not None and rec_action != action_id:
+                            continue
+                        if status is not None and rec_status != status:
+                            continue
+                        day = date.fromtimestamp(timestamp).toordinal()
+                        if not start_day <= day <= end_day:
+                            continue
+                        results.append({
+                            'timestamp': timestamp,
+                            'user': self._users[user_id],
+                            'action': self._actions[rec_action],
+                            'status': self.STATUS_NAMES.get(rec_status, str(rec_status))
+                        })
+            return results
+
+    def iter_records(self, start=0):
+        """Registros desde el número start como (número, registro), en orden de escritura"""
+        with self._lock:
+            if start >= self._record_count:
+                return []
+            records = []
+            with open(self.data_file, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    offset = len(self.MAGIC)
+                    size = self.RECORD.size
+                    for recno in range(start, self._record_count):
+                        timestamp, user_id, action_id, status = self.RECORD.unpack_from(
+                            data, offset + recno * size
+                        )
+                        records.append((recno, {
+                            'timestamp': timestamp,
+                            'user': self._users[user_id],
+                            'action': self._actions[action_id],
+                            'status': self.STATUS_NAMES.get(status, str(status))
+                        }))
+            return records
+
+    def count(self, **filters):
+        """Cantidad de registros que cumplen los filtros de query()"""
+        return len(self.query(**filters))
+
+    def export_csv(self, file_path, **filters):
+        """Exporta registros a CSV para ingesta en Power BI"""
+        records = self.query(**filters)
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['fecha_hora', 'usuario', 'accion', 'estado'])
+            for record in records:
+                writer.writerow([
+                    datetime.fromtimestamp(record['timestamp']).isoformat(timespec='seconds'),
+                    record['user'],
+                    record['action'],
+                    record['status']
+                ])
+        return len(records)
+
+    def get_stats(self):
+        """Estadísticas del almacén de auditoría"""
+        with self._lock:
+            return {
+                'records': self._record_count,
+                'users': len(self._users),
+                'actions': len(self._actions),
+                'days': len(self._day_ranges)
+            }
@@ -3,14 +3,149 @@ Módulo de gestión de autenticación y autorización
 Lee permisos desde archivo CSV en OneDrive
 """
 
+# requests y cryptography se importan en el primer uso para no retrasar el
+# arranque en frío; el CSV se lee con pandas o, si no está instalado (APK),
+# con el backend liviano de tabular.py
 
-import requests
 import hashlib
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
-from cryptography.fernet import Fernet
 import os
-import pandas as pd
+from bloom_filter import BloomFilter, clamp_fp_rate
+from content_store import ContentStore
+from file_utils import atomic_write_json
+from metrics import get_metrics, timed
+import compression
+import tabular
+from config_manager import AppConstants, get_config
+from rate_limiter import LoginRateLimiter, get_device_id
+from offline_snapshot import OfflineSnapshot, build_offline_snapshot
+from permissions import get_permission_registry
+from sealed_roster import SealedRoster, derive_index_key
+from sqlite_store import get_sqlite_store
+from session_manager import SessionManager
+from task_executor import SingleFlight
+from utils import get_log_manager
+
+
+# Descargas del roster compartidas entre todas las instancias de AuthManager:
+# el hilo de login y un "Actualizar Datos" manual esperan la misma descarga
+_roster_flight = SingleFlight()
+
+# Pool acotado para descargar las fuentes del roster federado (se crea en el primer uso)
+_source_pool = None
+_source_pool_lock = threading.Lock()
+# Última descarga de cada fuente por almacén: (raíz, nombre, url) -> future. Una
+# fuente con descarga en curso no se vuelve a enviar y el almacén no se poda
+# mientras tanto (su CSV nuevo todavía no figura en ningún estado)
+_source_futures = {}
+
+# Versión ingerida del roster en el almacén de contenido y cuántas se conservan.
+# En el dispositivo se guarda sellada (encriptada por bloques)
+ROSTER_SEALED = 'sealed'
+ROSTER_FILTER = 'bloom'
+ROSTER_CONFLICTS = 'conflicts.json'
+ROSTER_HISTORY = 5
+
+
+def read_roster_rows(csv_data):
+    """Pares (nombre, cédula) del CSV del roster (archivo de texto abierto)"""
+    df = tabular.read_csv(csv_data, dtype=str)
+
+    # Normalizar nombres de columnas (soportar mayúsculas/minúsculas y BOM)
+    tabular.normalize_columns(df)
+
+    # Esperamos columnas: nombre, cedula (flexible con mayúsculas/minúsculas)
+    return [
+        (tabular.cell_text(row, 'nombre'), tabular.cell_text(row, 'cedula'))
+        for _, row in df.iterrows()
+    ]
+
+
+def ingest_roster_rows(rows):
+    """Tabla de permisos a partir de pares (nombre, cédula)"""
+    permissions = {}
+    for nombre, cedula in rows:
+        if nombre and cedula:
+            # Usar el nombre como username (en minúsculas para consistencia)
+            permissions[nombre.lower()] = {
+                # Usar la cédula como contraseña (generar hash)
+                'password_hash': hashlib.sha256(cedula.encode()).hexdigest(),
+                'active': True,  # Todos los usuarios en el CSV están activos
+                'expiry_date': '',  # Sin fecha de expiración
+                'permissions': 'dashboard',  # Permiso básico para todos
+                'full_name': nombre,  # Nombre completo
+                'department': '',  # Sin departamento específico
+                'role': 'usuario'  # Rol básico para todos
+                # La cédula no se guarda: para el login basta su hash
+            }
+    return permissions
+
+
+def _get_source_pool(max_workers):
+    global _source_pool
+
+    with _source_pool_lock:
+        if _source_pool is None:
+            _source_pool = ThreadPoolExecutor(
+                max_workers=max(1, int(max_workers)),
+                thread_name_prefix="roster-source"
+            )
+        return _source_pool
+
+
+def _submit_source(pool, key, func, *args):
+    """Future de la descarga de una fuente, reutilizando la que siga en curso"""
+    with _source_pool_lock:
+        future = _source_futures.get(key)
+        if future is None or future.done():
+            future = pool.submit(func, *args)
+            _source_futures[key] = future
+        return future
+
+
+def _source_downloads(root):
+    """(hay descargas en curso, hashes de las terminadas) de las fuentes de un almacén"""
+    with _source_pool_lock:
+        futures = [f for (store_root, _, _), f in _source_futures.items() if store_root == root]
+
+    pending = False
+    hashes = set()
+    for future in futures:
+        if not future.done():
+            pending = True
+        elif not future.cancelled() and future.exception() is None:
+            hashes.add(future.result()['content_hash'])
+    return pending, hashes
+
+
+def federated_hash(source_hashes):
+    """Hash del roster combinado: depende de qué versión de cada fuente se usó"""
+    key = ";".join(f"{name}={content_hash}" for name, content_hash in source_hashes)
+    return hashlib.sha256(f"federado:{key}".encode()).hexdigest()
+
+
+def merge_rosters(tables):
+    """
+    Combina las tablas de permisos [(fuente, hash, permisos)] en orden de
+    precedencia: ante un usuario repetido queda el de la primera fuente. Si
+    las cédulas difieren se registra el conflicto
+    """
+    merged = {}
+    owners = {}
+    conflicts = []
+
+    for name, _, permissions in tables:
+        for username, record in permissions.items():
+            if username not in merged:
+                merged[username] = record
+                owners[username] = name
+            elif record.get('password_hash') != merged[username].get('password_hash'):
+                conflicts.append({'username': username, 'kept': owners[username], 'ignored': name})
+
+    return merged, conflicts
 
 
 class AuthManager:
@@ -19,15 +154,93 @@ class AuthManager:
     def __init__(self):
         self.config_file = "auth_config.json"
         self.cache_file = "auth_cache.json"
-        self.encryption_key = self._get_or_create_key()
-        self.fernet = Fernet(self.encryption_key)
+        self._encryption_key = None
+        self._fernet = None
+        self._index_key = None
         self.csv_url = None
+        # Fuentes adicionales del roster (contratistas), después de csv_url en precedencia
+        self.csv_sources = []
         self.current_user = None
+        self.permission_bits = 0
         self.permissions_cache = {}
         self.cache_expiry = None
 
+        # Validadores del último roster descargado (descarga condicional)
+        self.roster_etag = None
+        self.roster_hash = None
+        self.roster_changed = None
+        self.roster_history = []
+        self.last_download = None
+
+        # Estado por fuente del roster federado (url, ETag, hash) y último resultado
+        self.source_state = {}
+        self.source_errors = {}
+        self.roster_conflicts = []
+        self._sources_lock = threading.Lock()
+        network = get_config().get_network_config()
+        self.max_parallel_sources = network.get("max_parallel_sources", 4)
+        self.source_timeout = network.get("source_timeout", 20)
+        self.request_timeout = network.get("timeout", 30)
+        # Objetos precompilados del APK (prebuild.py, solo el filtro de Bloom): se leen sin copiarlos
+        self.content_store = ContentStore(
+            fallback_roots=[os.path.join(AppConstants.PREBUILT_DIR, "objects")]
+        )
+
+        security = get_config().get_security_config()
+        # Filtro de Bloom de usuarios para rechazar inexistentes sin cargar el roster
+        fp_rate = security.get("username_filter_fp_rate", 0.01)
+        self.username_filter_fp_rate = clamp_fp_rate(fp_rate)
+        if self.username_filter_fp_rate != fp_rate:
+            print(f"security.username_filter_fp_rate inválido ({fp_rate}): "
+                  f"se usa {self.username_filter_fp_rate}")
+        self._username_filter = None
+        # Roster sellado abierto (hash, SealedRoster) para logins sin cargar la tabla
+        self._sealed = None
+        # Con storage.backend = "sqlite" el roster se guarda en la base (un registro por usuario)
+        self.roster_db = get_sqlite_store()
+
+        self.rate_limiter = LoginRateLimiter(
+            max_attempts=security.get("max_login_attempts", AppConstants.MAX_LOGIN_ATTEMPTS),
+            window_seconds=security.get("login_window", 300),
+            lockout_seconds=security.get("lockout_duration", 900)
+        )
+        self.device_id = None
+
+        # La sesión se persiste encriptada con la misma clave de la app
+        self.session_manager = SessionManager(
+            timeout=security.get("session_timeout", AppConstants.SESSION_TIMEOUT),
+            fernet_provider=lambda: self.fernet
+        )
+        self.session_token = None
+
+        # Origen de los permisos cargados: 'cache', 'network' o 'snapshot'
+        self.data_source = None
+        self.offline_snapshot = OfflineSnapshot(fernet_provider=lambda: self.fernet)
+
         self._load_config()
 
+    @property
+    def encryption_key(self):
+        """Clave de encriptación (se lee del disco en el primer uso)"""
+        if self._encryption_key is None:
+            self._encryption_key = self._get_or_create_key()
+        return self._encryption_key
+
+    @property
+    def fernet(self):
+        """Cifrador Fernet (se construye en el primer uso)"""
+        if self._fernet is None:
+            from cryptography.fernet import Fernet
+            self._fernet = Fernet(self.encryption_key)
+        return self._fernet
+
+    @property
+    def index_key(self):
+        """Clave del índice del roster sellado (derivada de la de encriptación)"""
+        if self._index_key is None:
+            self._index_key = derive_index_key(self.encryption_key)
+        return self._index_key
+
     def _get_or_create_key(self):
         """Obtiene o crea clave de encriptación"""
         key_file = "encryption.key"
@@ -36,6 +249,7 @@ class AuthManager:
             with open(key_file, 'rb') as f:
                 return f.read()
         else:
+            from cryptography.fernet import Fernet
             key = Fernet.generate_key()
             with open(key_file, 'wb') as f:
                 f.write(key)
@@ -48,6 +262,7 @@ class AuthManager:
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     config = json.load(f)
                     self.csv_url = config.get('csv_url')
+                    self.csv_sources = config.get('csv_sources', [])
         except Exception as e:
             print(f"Error cargando configuración: {e}")
 
@@ -56,15 +271,42 @@ class AuthManager:
         self.csv_url = url
         self._save_config()
 
+    def set_roster_sources(self, sources):
+        """
+        Establece las fuentes adicionales del roster: lista de {'name', 'url'}
+        en orden de precedencia (csv_url, si existe, va siempre primero)
+        """
+        from utils import DataValidator
+
+        names = set()
+        for source in sources:
+            valid, message = DataValidator.validate_onedrive_url(source.get('url'))
+            if not valid or not source.get('name') or source['name'] in names:
+                print(f"Fuente del roster inválida {source.get('name')!r}: {message}")
+                return False
+            names.add(source['name'])
+
+        self.csv_sources = [{'name': s['name'], 'url': s['url']} for s in sources]
+        self._save_config()
+        return True
+
+    def get_roster_sources(self):
+        """Fuentes del roster en orden de precedencia"""
+        sources = []
+        if self.csv_url:
+            sources.append({'name': 'principal', 'url': self.csv_url})
+        sources.extend(self.csv_sources)
+        return sources
+
     def _save_config(self):
         """Guarda configuración en archivo"""
         try:
             config = {
                 'csv_url': self.csv_url,
+                'csv_sources': self.csv_sources,
                 'last_updated': datetime.now().isoformat()
             }
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            atomic_write_json(self.config_file, config)
         except Exception as e:
             print(f"Error guardando configuración: {e}")
 
@@ -80,130 +322,720 @@ class AuthManager:
         """Genera hash de contraseña"""
         return hashlib.sha256(password.encode()).hexdigest()
 
-    def _download_csv_data(self):
-        """Descarga datos del CSV desde OneDrive"""
-        if not self.csv_url:
+    def _download_csv_data(self, conditional=False):
+        """
+        Descarga el CSV principal (csv_url) al almacén de contenido y devuelve
+        su hash. Con conditional=True envía el ETag anterior y devuelve None
+        si el servidor responde 304
+        """
+        result = self._download_source(self.csv_url, self.roster_etag if conditional else None)
+        self.csv_url = result['url']
+        self.last_download = result['download']
+        self.roster_etag = result['etag'] or self.roster_etag
+        return result['content_hash']
+
+    @timed("auth.download_csv")
+    def _download_source(self, url, etag=None):
+        """
+        Descarga un CSV de OneDrive/SharePoint al almacén sin tocar el estado
+        de la instancia (se usa desde varios hilos). Devuelve dict con
+        content_hash (None si 304), etag, url (expandida) y download
+        """
+        if not url:
             raise ValueError("URL del CSV no configurada")
 
+        import requests
+
         try:
             # Convertir URL de OneDrive para descarga directa
-            if "onedrive.live.com" in self.csv_url or "1drv.ms" in self.csv_url:
+            if "onedrive.live.com" in url or "1drv.ms" in url:
                 # Convertir URL de compartir a URL de descarga directa
-                if "1drv.ms" in self.csv_url:
+                if "1drv.ms" in url:
                     # Expandir URL corta primero
-                    response = requests.head(self.csv_url, allow_redirects=True)
-                    self.csv_url = response.url
+                    response = requests.head(url, allow_redirects=True, timeout=self.request_timeout)
+                    url = response.url
 
                 # Convertir a URL de descarga directa
-                if "view.aspx" in self.csv_url:
-                    download_url = self.csv_url.replace("view.aspx", "download.aspx")
+                if "view.aspx" in url:
+                    download_url = url.replace("view.aspx", "download.aspx")
                 else:
-                    download_url = self.csv_url + "&download=1"
+                    download_url = url + "&download=1"
+            elif "sharepoint.com" in url and "download=1" not in url:
+                # Enlace de compartir de SharePoint: forzar la descarga del archivo
+                download_url = url + ("&" if "?" in url else "?") + "download=1"
             else:
-                download_url = self.csv_url
+                download_url = url
 
-            # Descargar el archivo
-            response = requests.get(download_url, timeout=30)
-            response.raise_for_status()
+            # Descargar el archivo: se negocia gzip/deflate y el cuerpo se
+            # escribe en streaming al almacén mientras se calcula su hash
+            headers = {'Accept-Encoding': compression.ACCEPT_ENCODING}
+            if etag:
+                headers['If-None-Match'] = etag
+            response = requests.get(download_url, headers=headers, timeout=self.request_timeout, stream=True)
+            with response:
+                if etag and response.status_code == 304:
+                    get_metrics().inc("auth.download_csv.not_modified")
+                    return {
+                        'content_hash': None,
+                        'etag': etag,
+                        'url': url,
+                        'download': {'status': 304, 'wire_bytes': 0, 'content_bytes': 0}
+                    }
+                response.raise_for_status()
+
+                response.raw.decode_content = True
+                # El hash es del artefacto descargado (antes de descomprimir .gz/.zst)
+                content_hash, content_bytes = self.content_store.put_stream(response.raw, 'csv')
 
-            # Leer CSV desde el contenido descargado
-            from io import StringIO
-            csv_data = StringIO(response.text)
-            df = pd.read_csv(csv_data)
+                download = {
+                    'status': response.status_code,
+                    'encoding': response.headers.get('Content-Encoding', 'identity'),
+                    'wire_bytes': response.raw.tell(),
+                    'content_bytes': content_bytes
+                }
+                get_metrics().inc("auth.download_csv.wire_bytes", download['wire_bytes'])
 
-            return df
+            return {
+                'content_hash': content_hash,
+                'etag': response.headers.get('ETag'),
+                'url': url,
+                'download': download
+            }
 
         except Exception as e:
             raise Exception(f"Error descargando CSV: {str(e)}")
 
+    def _read_cache_metadata(self):
+        """Lee los metadatos del caché (hash vigente, ETag, fecha e historial)"""
+        if not os.path.exists(self.cache_file):
+            return None
+        with open(self.cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
     def _load_permissions_from_cache(self):
         """Carga permisos desde caché"""
         try:
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
-
-                    # Verificar si el caché no ha expirado
-                    cache_time = datetime.fromisoformat(cache_data.get('timestamp', ''))
-                    if datetime.now() - cache_time < timedelta(hours=1):
-                        self.permissions_cache = cache_data.get('permissions', {})
-                        self.cache_expiry = cache_time + timedelta(hours=1)
-                        return True
+            cache_data = self._read_cache_metadata()
+            if cache_data is None:
+                return False
+
+            self.roster_etag = cache_data.get('etag')
+            self.roster_hash = cache_data.get('content_hash')
+            self.roster_history = cache_data.get('history', [])
+            self.source_state = cache_data.get('sources', {})
+
+            # El caché de versiones anteriores traía la tabla con las cédulas en
+            # claro: no se usa y la próxima descarga lo reescribe sin ella
+            if 'permissions' in cache_data:
+                return False
+
+            # Verificar si el caché no ha expirado
+            cache_time = datetime.fromisoformat(cache_data.get('timestamp', ''))
+            if datetime.now() - cache_time < timedelta(hours=1):
+                permissions = self._get_permissions(self.roster_hash)
+                if permissions is None:
+                    return False
+                self.permissions_cache = permissions
+                self.cache_expiry = cache_time + timedelta(hours=1)
+                if self.roster_hash:
+                    self._build_username_filter(self.roster_hash, permissions)
+                return True
             return False
         except Exception as e:
             print(f"Error cargando caché: {e}")
             return False
 
     def _save_permissions_to_cache(self):
-        """Guarda permisos en caché"""
+        """
+        Guarda los metadatos del caché. La tabla de permisos vive en el
+        almacén de contenido, así que renovar la vigencia no la reescribe
+        """
         try:
             cache_data = {
-                'permissions': self.permissions_cache,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': datetime.now().isoformat(),
+                'etag': self.roster_etag,
+                'content_hash': self.roster_hash,
+                'history': self.roster_history
             }
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2, ensure_ascii=False)
+            if self.source_state:
+                cache_data['sources'] = self.source_state
+            atomic_write_json(self.cache_file, cache_data)
         except Exception as e:
             print(f"Error guardando caché: {e}")
 
-    def _load_permissions(self):
-        """Carga permisos desde CSV o caché"""
+    @timed("auth.load_permissions")
+    def _load_permissions(self, force_refresh=False):
+        """Carga permisos desde CSV o caché y registra sus nombres de permiso"""
+        self._load_permissions_data(force_refresh)
+        self._compile_permissions()
+
+    def _compile_permissions(self):
+        """Compila los permisos del roster a bitsets (una vez por combinación distinta)"""
+        registry = get_permission_registry()
+        for user_data in self.permissions_cache.values():
+            registry.compile(user_data.get('permissions', ''), user_data.get('role'))
+        get_metrics().set_gauge("auth.roster_users", len(self.permissions_cache))
+
+    def _load_permissions_data(self, force_refresh=False):
+        """Obtiene la tabla de permisos desde caché, OneDrive o el snapshot offline"""
         # Intentar cargar desde caché primero
-        if self._load_permissions_from_cache():
+        if not force_refresh and self._load_permissions_from_cache():
+            self.data_source = "cache"
             return
 
-        # Si no hay caché válido, descargar desde OneDrive
-        try:
-            df = self._download_csv_data()
-
-            # Procesar datos del CSV
-            self.permissions_cache = {}
-
-            # Normalizar nombres de columnas (soportar mayúsculas/minúsculas)
-            df.columns = df.columns.str.lower().str.strip()
-
-            # Esperamos columnas: nombre, cedula (flexible con mayúsculas/minúsculas)
-            for _, row in df.iterrows():
-                nombre = str(row.get('nombre', '')).strip()
-                cedula = str(row.get('cedula', '')).strip()
-
-                if nombre and cedula:
-                    # Usar el nombre como username (en minúsculas para consistencia)
-                    username = nombre.lower()
-                    # Usar la cédula como contraseña (generar hash)
-                    cedula_hash = self._hash_password(cedula)
-
-                    self.permissions_cache[username] = {
-                        'password_hash': cedula_hash,
-                        'active': True,  # Todos los usuarios en el CSV están activos
-                        'expiry_date': '',  # Sin fecha de expiración
-                        'permissions': 'dashboard',  # Permiso básico para todos
-                        'full_name': nombre,  # Nombre completo
-                        'department': '',  # Sin departamento específico
-                        'role': 'usuario',  # Rol básico para todos
-                        'cedula': cedula  # Guardar cédula original
-                    }
+        # Modo sin conexión forzado: solo el snapshot local
+        if get_config().get("network", "offline_mode", False):
+            if self._load_permissions_from_snapshot():
+                return
+            raise Exception("Modo sin conexión activo y no hay datos offline disponibles")
 
-            # Guardar en caché
-            self._save_permissions_to_cache()
+        # Si no hay caché válido, descargar desde OneDrive. Las llamadas
+        # concurrentes para la misma URL esperan una única descarga
+        try:
+            result = _roster_flight.do(
+                (self.csv_url, self.cache_file),
+                self._fetch_permissions
+            )
+            # Las instancias que esperaron la descarga de otra toman su resultado
+            self.permissions_cache = result['permissions']
+            self.roster_etag = result['etag']
+            self.roster_hash = result['content_hash']
+            self.roster_history = result['history']
+            self.source_state = result['sources']
+            self.roster_changed = result['changed']
             self.cache_expiry = datetime.now() + timedelta(hours=1)
+            self.data_source = "network"
 
         except Exception as e:
+            # Sin red (o descarga fallida): usar el snapshot offline si existe
+            if self._load_permissions_from_snapshot():
+                return
             raise Exception(f"Error cargando permisos: {str(e)}")
 
-    def authenticate(self, username, password):
-        """Autentica usuario usando nombre y cédula"""
+    def _load_permissions_from_snapshot(self):
+        """Carga permisos desde el snapshot offline encriptado"""
+        try:
+            if not self.offline_snapshot.exists():
+                return False
+            self.permissions_cache = self.offline_snapshot.read_json('roster.json')
+            self.cache_expiry = None
+            self.data_source = "snapshot"
+            return True
+        except Exception as e:
+            print(f"Error cargando snapshot offline: {e}")
+            return False
+
+    def is_offline(self):
+        """Verifica si los permisos actuales vienen del snapshot offline"""
+        return self.data_source == "snapshot"
+
+    def get_data_freshness(self):
+        """Texto de antigüedad de los datos offline para mostrar al usuario"""
+        return self.offline_snapshot.get_freshness_text()
+
+    def refresh_offline_snapshot(self, max_age=3600):
+        """Reconstruye el snapshot offline si es más antiguo que max_age segundos"""
+        if self.data_source not in ("network", "cache"):
+            return False
+
+        age = self.offline_snapshot.get_age_seconds()
+        if age is not None and age < max_age:
+            return False
+
+        path = self.offline_snapshot.path
+        build_offline_snapshot(self, path)
+        # El archivo se reemplazó: las lecturas nuevas usan otra instancia y las
+        # que están en curso terminan con el mapeo anterior (no se cierra bajo ellas)
+        self.offline_snapshot = OfflineSnapshot(path, fernet_provider=lambda: self.fernet)
+        return True
+
+    def _fetch_permissions(self):
+        """Descarga el CSV, construye la tabla de permisos y la guarda en caché"""
+        if not self.permissions_cache:
+            # Metadatos del caché aunque haya vencido: hash, ETag e historial
+            self._load_permissions_from_cache()
+
+        if self.csv_sources:
+            return self._fetch_federated()
+
+        # Si la versión vigente ya está ingerida basta una descarga condicional
+        known = self.roster_hash is not None and self._has_permissions(self.roster_hash)
+        content_hash = self._download_csv_data(conditional=known)
+        if content_hash is None:
+            # 304: el contenido vigente no cambió
+            content_hash = self.roster_hash
+
+        if content_hash == self.roster_hash and self.permissions_cache:
+            # Sin cambios (304 o mismo hash): solo se renueva la vigencia
+            self._discard_plaintext(content_hash)
+            self._save_permissions_to_cache()
+            return self._fetch_result(changed=False)
+
+        changed = content_hash != self.roster_hash
+        permissions = self._load_version(content_hash)
+        self._activate_roster(content_hash, permissions)
+        return self._fetch_result(changed=changed)
+
+    def _fetch_federated(self):
+        """
+        Roster federado: descarga todas las fuentes a la vez en un pool
+        acotado y combina sus tablas por precedencia. Una fuente lenta o con
+        error no bloquea el login: se usa su última versión guardada y su
+        descarga sigue en segundo plano para el próximo refresco
+        """
+        sources = self.get_roster_sources()
+        with self._sources_lock:
+            states = {}
+            for source in sources:
+                state = dict(self.source_state.get(source['name'], {}))
+                # Si cambió la URL configurada el estado guardado no sirve
+                states[source['name']] = state if state.get('source_url') == source['url'] else {}
+
+        pool = _get_source_pool(self.max_parallel_sources)
+        futures = {}
+        for source in sources:
+            name = source['name']
+            # Si la descarga anterior de la fuente sigue en curso se espera esa
+            futures[name] = _submit_source(
+                pool, (self.content_store.root, name, source['url']),
+                self._fetch_source, source, states[name]
+            )
+            futures[name].add_done_callback(
+                lambda f, name=name: self._record_source_state(name, f)
+            )
+        wait(futures.values(), timeout=self.source_timeout)
+
+        tables = []
+        errors = {}
+        for source in sources:
+            name = source['name']
+            future = futures[name]
+            state = states[name]
+            if not future.done():
+                errors[name] = "sin respuesta a tiempo"
+            elif future.exception() is not None:
+                errors[name] = str(future.exception())
+            else:
+                state = future.result()
+
+            permissions = state.get('content_hash') and self._get_permissions(state['content_hash'])
+            if permissions:
+                tables.append((name, state['content_hash'], permissions))
+
+        for name, error in errors.items():
+            print(f"Fuente del roster '{name}' no disponible, se usa la versión guardada: {error}")
+        get_metrics().inc("auth.roster_sources.failed", len(errors))
+        self.source_errors = errors
+
+        # Sin ninguna fuente actualizada se sigue el camino sin conexión (snapshot)
+        if len(errors) == len(sources) or not tables:
+            raise Exception(f"Ninguna fuente del roster disponible: {errors}")
+
+        source_hashes = {name: content_hash for name, content_hash, _ in tables}
+        merged_hash = federated_hash(source_hashes.items())
+        if merged_hash == self.roster_hash and self.permissions_cache:
+            self._save_permissions_to_cache()
+            return self._fetch_result(changed=False)
+
+        permissions = self._get_permissions(merged_hash)
+        conflicts = self.content_store.get_json(merged_hash, ROSTER_CONFLICTS) or []
+        if permissions is None:
+            permissions, conflicts = merge_rosters(tables)
+            self._put_permissions(merged_hash, permissions)
+            self.content_store.put_json(merged_hash, ROSTER_CONFLICTS, conflicts)
+            if conflicts:
+                print(f"Roster federado: {len(conflicts)} usuarios con datos distintos entre fuentes")
+        self.roster_conflicts = conflicts
+        get_metrics().set_gauge("auth.roster_conflicts", len(conflicts))
+
+        changed = merged_hash != self.roster_hash
+        self._activate_roster(merged_hash, permissions, sources=source_hashes)
+        return self._fetch_result(changed=changed)
+
+    def _fetch_source(self, source, state):
+        """
+        Descarga (condicional) e ingiere una fuente del roster en un hilo del
+        pool. El estado se registra al terminar aunque el login ya no la espere
+        """
+        known = state.get('content_hash') and self._has_permissions(state['content_hash'])
+        result = self._download_source(state.get('url') or source['url'],
+                                       state.get('etag') if known else None)
+        content_hash = result['content_hash'] or state['content_hash']
+
+        if self._has_sealed(content_hash):
+            self._discard_plaintext(content_hash)
+        else:
+            self._load_version(content_hash)
+
+        return {
+            'source_url': source['url'],
+            'url': result['url'],
+            'etag': result['etag'],
+            'content_hash': content_hash,
+            'checked_at': datetime.now().isoformat()
+        }
+
+    def _record_source_state(self, name, future):
+        """Registra el resultado de una fuente (también si llega después del login)"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._sources_lock:
+            self.source_state[name] = future.result()
+
+    def get_roster_conflicts(self):
+        """Usuarios repetidos entre fuentes con datos distintos (roster federado vigente)"""
+        if not self.roster_conflicts and self.roster_hash:
+            self.roster_conflicts = self.content_store.get_json(self.roster_hash, ROSTER_CONFLICTS) or []
+        return list(self.roster_conflicts)
+
+    def _ingest_roster(self, content_hash):
+        """Construye la tabla de permisos a partir del CSV guardado en el almacén"""
+        # Además de la codificación HTTP se aceptan artefactos .csv.gz / .zst
+        with compression.open_text(self.content_store.path(content_hash, 'csv')) as csv_data:
+            return ingest_roster_rows(read_roster_rows(csv_data))
+
+    def _has_permissions(self, content_hash):
+        """True si la versión ya está ingerida (sellada en el backend o en el almacén)"""
+        return self._has_sealed(content_hash) or self.content_store.has(content_hash, ROSTER_SEALED)
+
+    def _has_sealed(self, content_hash):
+        """True si la versión está guardada encriptada en el backend configurado"""
+        if self.roster_db is not None:
+            return self.roster_db.has_roster(content_hash)
+        return self.content_store.has(content_hash, ROSTER_SEALED)
+
+    def _open_sealed(self, content_hash):
+        """
+        Roster sellado del roster vigente, abierto una vez para los logins
+        siguientes, o None si no existe
+        """
+        if self._sealed is not None and self._sealed[0] == content_hash:
+            return self._sealed[1]
+        if not self.content_store.has(content_hash, ROSTER_SEALED):
+            return None
+
+        self._close_sealed()
+        sealed = SealedRoster(self.content_store.path(content_hash, ROSTER_SEALED),
+                              self.fernet, self.index_key)
+        sealed.open()
+        self._sealed = (content_hash, sealed)
+        return sealed
+
+    def _close_sealed(self):
+        if self._sealed is not None:
+            self._sealed[1].close()
+            self._sealed = None
+
+    def _get_permissions(self, content_hash):
+        """Tabla de permisos de una versión del almacén o None si no está ingerida"""
+        if self.roster_db is not None:
+            try:
+                permissions = self.roster_db.read_roster(content_hash, self.fernet)
+            except Exception as e:
+                # Encriptado con otra clave (p. ej. se borró encryption.key): se vuelve a ingerir
+                print(f"Roster en SQLite ilegible, se descarta: {e}")
+                self.roster_db.delete_roster(content_hash)
+                return None
+            if permissions is not None:
+                return permissions
+
+        if self.content_store.has(content_hash, ROSTER_SEALED):
+            path = self.content_store.path(content_hash, ROSTER_SEALED)
+            sealed = SealedRoster(path, self.fernet, self.index_key)
+            try:
+                permissions = sealed.read_all()
+                # Se pasó a SQLite: se guarda en la base
+                if self.roster_db is not None:
+                    sealed.close()
+                    self._put_permissions(content_hash, permissions)
+                return permissions
+            except Exception as e:
+                # Sellado con otra clave (p. ej. se borró encryption.key): se vuelve a ingerir
+                print(f"Roster sellado ilegible, se descarta: {e}")
+                os.remove(path)
+                return None
+            finally:
+                sealed.close()
+        return None
+
+    def _put_permissions(self, content_hash, permissions):
+        """Guarda la tabla sellada con la clave del dispositivo y borra el CSV en claro"""
+        if self.roster_db is not None:
+            self.roster_db.put_roster(content_hash, permissions, self.fernet, self.index_key)
+        else:
+            if self._sealed is not None and self._sealed[0] == content_hash:
+                self._close_sealed()
+            data = SealedRoster.seal(permissions, self.fernet, self.index_key)
+            self.content_store.put_bytes(content_hash, ROSTER_SEALED, data)
+        self._discard_plaintext(content_hash)
+
+    def _discard_plaintext(self, content_hash):
+        """
+        Borra del almacén local el CSV descargado de una versión ya sellada:
+        contiene las cédulas sin encriptar
+        """
+        try:
+            os.remove(os.path.join(self.content_store.root, f"{content_hash}.csv"))
+        except OSError:
+            pass
+
+    def _load_version(self, content_hash):
+        """
+        Tabla de una versión recién descargada. Un roster ya ingerido antes
+        (p. ej. tras revertir un cambio) no se vuelve a procesar
+        """
+        permissions = self._get_permissions(content_hash)
+        if permissions is None:
+            permissions = self._ingest_roster(content_hash)
+            self._put_permissions(content_hash, permissions)
+        else:
+            self._discard_plaintext(content_hash)
+        return permissions
+
+    def get_permissions_table(self):
+        """Tabla de permisos completa (tras un login por bloque solo se leyó el del usuario)"""
+        if not self.permissions_cache and self.roster_hash:
+            self.permissions_cache = self._get_permissions(self.roster_hash) or {}
+        return self.permissions_cache
+
+    def _activate_roster(self, content_hash, permissions, sources=None):
+        """
+        Marca un roster del almacén como vigente y guarda el caché. sources
+        son los hashes de cada fuente si el roster es federado
+        """
+        self.permissions_cache = permissions
+        self.roster_hash = content_hash
+        self._build_username_filter(content_hash, permissions)
+
+        history = [entry for entry in self.roster_history if entry['content_hash'] != content_hash]
+        entry = {'content_hash': content_hash, 'ingested_at': datetime.now().isoformat()}
+        if sources:
+            entry['sources'] = sources
+        history.insert(0, entry)
+        self.roster_history = history[:ROSTER_HISTORY]
+
+        self._save_permissions_to_cache()
+        if self._sealed is not None and self._sealed[0] != content_hash:
+            self._close_sealed()
+        # Con descargas de fuentes en curso no se poda: su CSV nuevo aún no
+        # está en ningún estado y se borraría; se poda en el próximo roster
+        pending, downloaded = _source_downloads(self.content_store.root)
+        if pending:
+            return
+        keep = self._referenced_hashes() | downloaded
+        self.content_store.prune(keep)
+        if self.roster_db is not None:
+            self.roster_db.prune_rosters(keep)
+
+    def _referenced_hashes(self):
+        """Hashes que el almacén debe conservar: historial, sus fuentes y el estado de cada fuente"""
+        keep = set()
+        for entry in self.roster_history:
+            keep.add(entry['content_hash'])
+            keep.update(entry.get('sources', {}).values())
+        with self._sources_lock:
+            keep.update(state['content_hash'] for state in self.source_state.values()
+                        if state.get('content_hash'))
+        return keep
+
+    def _build_username_filter(self, content_hash, permissions):
+        """Guarda el filtro de Bloom de usuarios del roster (si falta o cambió la tasa)"""
+        cached = self._load_username_filter(content_hash)
+        if cached is not None and cached.fp_rate == self.username_filter_fp_rate:
+            return
+
+        bloom = BloomFilter.from_items(permissions, self.username_filter_fp_rate)
+        self.content_store.put_bytes(content_hash, ROSTER_FILTER, bloom.to_bytes())
+        self._username_filter = (content_hash, bloom)
+
+    def _load_username_filter(self, content_hash):
+        """Filtro de Bloom del roster indicado (en memoria tras la primera lectura)"""
+        if self._username_filter is not None and self._username_filter[0] == content_hash:
+            return self._username_filter[1]
+
+        data = self.content_store.get_bytes(content_hash, ROSTER_FILTER)
+        if data is None:
+            return None
+        try:
+            bloom = BloomFilter.from_bytes(data)
+        except ValueError:
+            return None
+        self._username_filter = (content_hash, bloom)
+        return bloom
+
+    def _is_unknown_user(self, username):
+        """
+        Rechazo rápido: True solo si el usuario seguro no está en el roster
+        vigente. Se consulta el filtro de Bloom (pocos KB) en lugar de cargar
+        la tabla de permisos; con el caché vencido no se decide aquí porque
+        el roster pudo cambiar
+        """
+        if self.permissions_cache:
+            return False
+        try:
+            cache_data = self._valid_cache_metadata()
+            if cache_data is None:
+                return False
+            content_hash = cache_data['content_hash']
+            bloom = self._load_username_filter(content_hash)
+            if bloom is not None and bloom.fp_rate != self.username_filter_fp_rate:
+                # Cambió security.username_filter_fp_rate: se reconstruye una vez
+                permissions = self._get_permissions(content_hash)
+                if permissions is None:
+                    return False
+                self._build_username_filter(content_hash, permissions)
+                bloom = self._username_filter[1]
+            return bloom is not None and username not in bloom
+        except Exception:
+            return False
+
+    def _valid_cache_metadata(self):
+        """Metadatos del caché si está vigente y apunta a una versión del almacén"""
+        cache_data = self._read_cache_metadata()
+        if cache_data is None or not cache_data.get('content_hash'):
+            return None
+        cache_time = datetime.fromisoformat(cache_data.get('timestamp', ''))
+        if datetime.now() - cache_time >= timedelta(hours=1):
+            return None
+        return cache_data
+
+    def _lookup_cached_user(self, username):
+        """
+        Login con el caché vigente sin cargar la tabla: desencripta solo el
+        bloque del roster sellado que contiene al usuario. Devuelve
+        (decidido, registro); sin caché vigente o sellado no se decide aquí
+        """
+        if self.permissions_cache:
+            return False, None
         try:
-            # Cargar permisos
-            self._load_permissions()
+            cache_data = self._valid_cache_metadata()
+            if cache_data is None:
+                return False, None
+            content_hash = cache_data['content_hash']
+            if self.roster_db is not None and self.roster_db.has_roster(content_hash):
+                user_data = self.roster_db.lookup_user(content_hash, username, self.fernet, self.index_key)
+            else:
+                sealed = self._open_sealed(content_hash)
+                if sealed is None:
+                    return False, None
+                user_data = sealed.lookup(username)
+        except Exception as e:
+            print(f"Error leyendo roster sellado: {e}")
+            return False, None
+
+        self.roster_etag = cache_data.get('etag')
+        self.roster_hash = cache_data['content_hash']
+        self.roster_history = cache_data.get('history', [])
+        self.source_state = cache_data.get('sources', {})
+        self.cache_expiry = datetime.fromisoformat(cache_data['timestamp']) + timedelta(hours=1)
+        self.data_source = "cache"
+        return True, user_data
+
+    def _fetch_result(self, changed):
+        return {
+            'permissions': self.permissions_cache,
+            'etag': self.roster_etag,
+            'content_hash': self.roster_hash,
+            'history': self.roster_history,
+            'sources': self.source_state,
+            'changed': changed
+        }
+
+    def get_active_files(self):
+        """
+        Objetos del almacén que el limpiador de disco no borra: los de cada
+        versión del historial (para poder revertir), sus fuentes y el estado
+        de cada fuente. Si el historial aún no se cargó se lee del caché
+        """
+        hashes = self._referenced_hashes()
+        if not self.roster_history:
+            cache_data = self._read_cache_metadata() or {}
+            for entry in cache_data.get('history', []):
+                hashes.add(entry['content_hash'])
+                hashes.update(entry.get('sources', {}).values())
+            hashes.update(state['content_hash'] for state in cache_data.get('sources', {}).values()
+                          if state.get('content_hash'))
+        if self.roster_hash:
+            hashes.add(self.roster_hash)
+
+        return [self.content_store.path(content_hash, kind)
+                for content_hash in hashes
+                for kind in (ROSTER_SEALED, ROSTER_FILTER, ROSTER_CONFLICTS)]
+
+    def get_roster_history(self):
+        """Versiones del roster disponibles para revertir (la primera es la vigente)"""
+        if not self.roster_history:
+            self._load_permissions_from_cache()
+        return list(self.roster_history)
 
+    def rollback_roster(self, content_hash=None):
+        """
+        Vuelve a una versión anterior del roster (por defecto, la previa a la
+        vigente). No descarga ni procesa nada: la versión ingerida ya está en
+        el almacén. El próximo refresco vuelve a lo que sirva OneDrive
+        """
+        history = self.get_roster_history()
+        if content_hash is None:
+            if len(history) < 2:
+                return False
+            content_hash = history[1]['content_hash']
+
+        permissions = self._get_permissions(content_hash)
+        if permissions is None:
+            return False
+
+        # El ETag corresponde a la versión que sirve OneDrive, no a la revertida
+        self.roster_etag = None
+        self._activate_roster(content_hash, permissions)
+        self.cache_expiry = datetime.now() + timedelta(hours=1)
+        return True
+
+    def refresh_if_changed(self):
+        """
+        Actualiza el roster con descarga condicional (para el refresco
+        automático). Devuelve True si los datos cambiaron
+        """
+        if not self.permissions_cache:
+            self._load_permissions_from_cache()
+        self._load_permissions(force_refresh=True)
+        if self.data_source != "network":
+            raise Exception("No se pudo actualizar el roster desde OneDrive")
+        return bool(self.roster_changed)
+
+    @timed("auth.authenticate", outcome=True)
+    def authenticate(self, username, password):
+        """Autentica usuario usando nombre y cédula y registra el intento en la auditoría"""
+        success = self._check_credentials(username, password)
+        get_log_manager().log_auth_attempt(username.strip().lower(), success)
+        return success
+
+    def _check_credentials(self, username, password):
+        """Verifica nombre y cédula contra los permisos (sin auditoría)"""
+        try:
             username_lower = username.strip().lower()
+            if self.device_id is None:
+                self.device_id = get_device_id()
 
-            # Verificar si el usuario existe
-            if username_lower not in self.permissions_cache:
+            # Usuario bloqueado: se rechaza antes de tocar caché o red
+            if self.rate_limiter.is_locked(username_lower, self.device_id):
                 return False
 
-            user_data = self.permissions_cache[username_lower]
+            # Usuario inexistente: se rechaza sin cargar la tabla de permisos
+            if self._is_unknown_user(username_lower):
+                self.rate_limiter.record_failure(username_lower, self.device_id)
+                return False
+
+            # Con el caché vigente basta desencriptar el bloque del usuario
+            found, user_data = self._lookup_cached_user(username_lower)
+            if not found:
+                # Cargar permisos
+                self._load_permissions()
+                user_data = self.permissions_cache.get(username_lower)
+
+            # Verificar si el usuario existe
+            if user_data is None:
+                self.rate_limiter.record_failure(username_lower, self.device_id)
+                return False
 
             # Verificar contraseña (cédula)
             password_hash = self._hash_password(password)
@@ -217,52 +1049,105 @@ class AuthManager:
                     'department': user_data.get('department', ''),
                     'role': user_data.get('role', 'usuario'),
                     'permissions': user_data.get('permissions', 'dashboard'),
-                    'cedula': user_data.get('cedula', ''),
                     'login_time': datetime.now().isoformat()
                 }
+                self.permission_bits = self._user_permission_bits(self.current_user)
+                self.rate_limiter.record_success(username_lower, self.device_id)
+                self.session_token = self.session_manager.create(self.current_user).token
                 return True
 
+            self.rate_limiter.record_failure(username_lower, self.device_id)
             return False
 
         except Exception as e:
             print(f"Error en autenticación: {e}")
             return False
 
+    def get_lockout_remaining(self, username):
+        """Segundos de bloqueo restantes para el usuario en este dispositivo"""
+        if self.device_id is None:
+            self.device_id = get_device_id()
+        return self.rate_limiter.retry_after(username.strip().lower(), self.device_id)
+
     def is_authenticated(self):
-        """Verifica si hay un usuario autenticado"""
-        return self.current_user is not None
+        """Verifica si hay un usuario autenticado con sesión vigente"""
+        if self.current_user is None:
+            return False
+
+        if self.session_token is not None and not self.session_manager.is_valid(self.session_token):
+            self.current_user = None
+            self.permission_bits = 0
+            self.session_token = None
+            return False
+
+        return True
+
+    def restore_session(self):
+        """Restaura una sesión encriptada vigente (evita el login al reanudar)"""
+        session = self.session_manager.restore()
+        if session is None:
+            return False
+
+        self.current_user = session.user
+        self.permission_bits = self._user_permission_bits(session.user)
+        self.session_token = session.token
+        return True
+
+    def check_session(self):
+        """Expira sesiones vencidas; devuelve False si la sesión actual expiró"""
+        self.session_manager.expire_due()
+        return self.is_authenticated()
 
     def get_current_user(self):
         """Obtiene información del usuario actual"""
         return self.current_user
 
+    @staticmethod
+    def _user_permission_bits(user):
+        """Bitset de permisos del usuario (permisos explícitos más su rol)"""
+        return get_permission_registry().compile(user.get('permissions', ''), user.get('role'))
+
     def has_permission(self, permission):
         """Verifica si el usuario actual tiene un permiso específico"""
         if not self.current_user:
             return False
 
-        user_permissions = self.current_user.get('permissions', '').lower()
-        return permission.lower() in user_permissions or 'admin' in user_permissions
+        required = get_permission_registry().mask((permission,))
+        return self.permission_bits & required == required
+
+    def filter_permitted(self, items, key=lambda item: item.get('permission', '')):
+        """
+        Devuelve los elementos (tableros, vistas de KPIs) que el usuario
+        actual puede ver; key(item) indica el permiso o permisos requeridos
+        """
+        if not self.current_user:
+            return []
+        return get_permission_registry().filter(self.permission_bits, items, key)
 
     def logout(self):
         """Cierra sesión del usuario actual"""
+        if self.session_token is not None:
+            self.session_manager.end(self.session_token)
+        self.session_token = None
         self.current_user = None
+        self.permission_bits = 0
 
     def refresh_permissions(self):
         """Actualiza permisos forzando descarga desde OneDrive"""
         try:
-            # Eliminar caché
-            if os.path.exists(self.cache_file):
-                os.remove(self.cache_file)
-
-            # Recargar permisos
-            self._load_permissions()
+            # Forzar descarga sin borrar el caché: si la descarga falla, el
+            # caché anterior sigue disponible para los demás hilos
+            self._load_permissions(force_refresh=True)
             return True
 
         except Exception as e:
             print(f"Error actualizando permisos: {e}")
             return False
 
+    def get_fetch_stats(self):
+        """Obtiene métricas de descargas del roster (llamadas agrupadas)"""
+        return _roster_flight.get_stats()
+
     def create_sample_csv_structure(self):
         """Crea estructura de ejemplo para el CSV simplificado"""
         sample_data = {
@@ -270,7 +1155,7 @@ class AuthManager:
             'cedula': ['12345678', '23456789', '34567890', '45678901']
         }
 
-        df = pd.DataFrame(sample_data)
+        df = tabular.from_dict(sample_data)
         df.to_csv('usuarios_sistema.csv', index=False, encoding='utf-8')
 
         print("📋 CSV de ejemplo creado con estructura simplificada:")
@@ -0,0 +1,577 @@
+"""
+Benchmarks de rendimiento de la aplicación
+Uso: python benchmarks.py [nombre ...]   (sin argumentos ejecuta todos)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROSTER_CSV = os.path.join(BASE_DIR, "usuarios_sistema.csv")
+
+
+def _run_isolated(code):
+    """Ejecuta código en un intérprete nuevo y devuelve su salida JSON"""
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+_TABULAR_PROBE = """
+import json, resource, time
+started = time.perf_counter()
+import tabular
+if {backend!r} == 'pandas':
+    import pandas
+import_ms = (time.perf_counter() - started) * 1000
+
+started = time.perf_counter()
+for _ in range({repeat}):
+    df = tabular.normalize_columns(tabular.read_csv({path!r}, backend={backend!r}, dtype=str))
+    users = {{tabular.cell_text(row, 'nombre').lower(): tabular.cell_text(row, 'cedula')
+             for _, row in df.iterrows()}}
+parse_ms = (time.perf_counter() - started) * 1000 / {repeat}
+
+print(json.dumps({{
+    'import_ms': import_ms,
+    'parse_ms': parse_ms,
+    'rows': len(users),
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+}}))
+"""
+
+
+def bench_tabular(repeat=5):
+    """Compara backends pandas vs stdlib: importación, parseo del roster y RSS"""
+    import tabular
+
+    backends = ["stdlib"]
+    if tabular.pandas_available():
+        backends.append("pandas")
+
+    results = {}
+    for backend in backends:
+        code = _TABULAR_PROBE.format(backend=backend, repeat=repeat, path=ROSTER_CSV)
+        results[backend] = _run_isolated(code)
+
+    print("=== Backend tabular (roster usuarios_sistema.csv) ===")
+    print(f"{'backend':<10} {'import ms':>10} {'parse ms':>10} {'filas':>7} {'RSS MB':>8}")
+    for backend, r in results.items():
+        print(f"{backend:<10} {r['import_ms']:>10.1f} {r['parse_ms']:>10.1f} "
+              f"{r['rows']:>7} {r['max_rss_mb']:>8.1f}")
+    if "pandas" not in results:
+        print("(pandas no instalado: solo se midió el backend stdlib)")
+
+    return results
+
+
+def bench_kpi_queries(repeat=20):
+    """Carga de KPIs TecnicosTT.csv y consultas de la tabla (presupuesto de frame: 16 ms)"""
+    from kpi_data import KpiStore, SORTABLE_COLUMNS
+
+    started = time.perf_counter()
+    store = KpiStore.from_files(
+        os.path.join(BASE_DIR, "KPIs TecnicosTT.csv"),
+        os.path.join(BASE_DIR, "KPIs Tecnicos.csv")
+    )
+    load_ms = (time.perf_counter() - started) * 1000
+
+    work_type = store.get_work_types()[0]
+    queries = {
+        "sin filtro": {},
+        "orden por nota": {"sort_column": SORTABLE_COLUMNS[0], "descending": True},
+        "tipo + orden": {"work_type": work_type, "sort_column": SORTABLE_COLUMNS[1]},
+        "búsqueda técnico": {"technician": "juan"},
+    }
+
+    print(f"=== Tabla de KPIs ({store.row_count} filas, carga {load_ms:.1f} ms) ===")
+    print(f"{'consulta':<20} {'filas':>7} {'query ms':>10} {'datos ms':>10}")
+    results = {"load_ms": load_ms}
+    for label, params in queries.items():
+        store.query(**params)  # calentar órdenes precalculados
+        started = time.perf_counter()
+        for _ in range(repeat):
+            row_ids = store.query(**params)
+        query_ms = (time.perf_counter() - started) * 1000 / repeat
+
+        started = time.perf_counter()
+        store.view_rows(row_ids)
+        view_ms = (time.perf_counter() - started) * 1000
+
+        results[label] = {"rows": len(row_ids), "query_ms": query_ms, "view_ms": view_ms}
+        print(f"{label:<20} {len(row_ids):>7} {query_ms:>10.2f} {view_ms:>10.2f}")
+
+    return results
+
+
+def bench_logging(records=20000):
+    """Throughput de logs: FileHandler síncrono vs pipeline por lotes (registros/s)"""
+    import logging
+    import tempfile
+    from utils import LogManager
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Referencia: FileHandler síncrono como el LogManager original
+        logger = logging.getLogger("bench_sync")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        handler = logging.FileHandler(os.path.join(tmp_dir, "sync.log"), encoding='utf-8')
+        handler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        ))
+        logger.addHandler(handler)
+
+        started = time.perf_counter()
+        for i in range(records):
+            logger.info(f"Intento de login EXITOSO - Usuario: user{i} - IP: unknown")
+        elapsed = time.perf_counter() - started
+        handler.close()
+        logger.removeHandler(handler)
+        results["sync"] = {"caller_rps": records / elapsed, "total_rps": records / elapsed}
+
+        manager = LogManager(
+            log_dir=os.path.join(tmp_dir, "async"),
+            logger_name="bench_async"
+        )
+        started = time.perf_counter()
+        for i in range(records):
+            manager.log_auth_attempt(f"user{i}", True)
+        caller_elapsed = time.perf_counter() - started
+        manager.flush(timeout=60)
+        total_elapsed = time.perf_counter() - started
+        manager.close()
+        results["async"] = {
+            "caller_rps": records / caller_elapsed,
+            "total_rps": records / total_elapsed,
+            "batches": manager.writer.stats["batches"]
+        }
+
+    print(f"=== Logs ({records} registros) ===")
+    print(f"{'modo':<8} {'llamador reg/s':>16} {'total reg/s':>14}")
+    for mode, r in results.items():
+        print(f"{mode:<8} {r['caller_rps']:>16,.0f} {r['total_rps']:>14,.0f}")
+    print(f"lotes escritos (async): {results['async']['batches']}")
+
+    return results
+
+
+def bench_transport(repeat=5):
+    """Bytes en la red y tiempo de refresco del roster: plano, gzip negociado y artefactos .gz/.zst"""
+    import gzip
+    import shutil
+    import tempfile
+    import compression
+    from auth_manager import AuthManager
+    from content_store import ContentStore
+    from kpi_data import KpiStore
+    from load_simulator import OneDriveStandIn
+
+    with open(ROSTER_CSV, 'rb') as f:
+        roster = f.read()
+
+    variants = {
+        "plano": (roster, False),
+        "gzip (HTTP)": (roster, True),
+        ".csv.gz": (gzip.compress(roster, 9), False),
+    }
+    if compression.zstd_available():
+        import zstandard
+        variants[".csv.zst"] = (zstandard.ZstdCompressor(level=19).compress(roster), False)
+
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix="tablero_transport_")
+    previous_cwd = os.getcwd()
+    try:
+        os.chdir(work_dir)
+        for label, (data, negotiate) in variants.items():
+            server = OneDriveStandIn({"roster": data}, compress=negotiate).start()
+            try:
+                timings = []
+                same_hash = []
+                for i in range(repeat):
+                    # Cliente nuevo con caché y almacén propios: descarga completa
+                    client_dir = os.path.join(work_dir, f"{label}_{i}")
+                    client = AuthManager()
+                    client.csv_url = server.share_url("roster")
+                    client.cache_file = os.path.join(client_dir, "auth_cache.json")
+                    client.content_store = ContentStore(os.path.join(client_dir, "objects"))
+                    started = time.perf_counter()
+                    client._load_permissions(force_refresh=True)
+                    timings.append(time.perf_counter() - started)
+                    wire = client.last_download['wire_bytes']
+
+                    # Sin ETag el servidor responde 200: el hash igual evita reprocesar
+                    client.roster_etag = None
+                    started = time.perf_counter()
+                    client._load_permissions(force_refresh=True)
+                    same_hash.append(time.perf_counter() - started)
+
+                results[label] = {
+                    "wire_bytes": wire,
+                    "refresh_ms": sorted(timings)[len(timings) // 2] * 1000,
+                    "unchanged_ms": sorted(same_hash)[len(same_hash) // 2] * 1000,
+                    "users": len(client.permissions_cache)
+                }
+            finally:
+                server.stop()
+
+        # KPIs: lectura local del CSV plano vs artefactos comprimidos
+        kpi_source = os.path.join(BASE_DIR, "KPIs TecnicosTT.csv")
+        with open(kpi_source, 'rb') as f:
+            kpi_data = f.read()
+        kpi_variants = {"plano": ("kpis.csv", kpi_data), ".csv.gz": ("kpis.csv.gz", gzip.compress(kpi_data, 9))}
+        if compression.zstd_available():
+            kpi_variants[".csv.zst"] = ("kpis.csv.zst", zstandard.ZstdCompressor(level=19).compress(kpi_data))
+        kpi_results = {}
+        for label, (name, data) in kpi_variants.items():
+            kpi_dir = os.path.join(work_dir, label.strip("."))
+            os.makedirs(kpi_dir)
+            with open(os.path.join(kpi_dir, name), 'wb') as f:
+                f.write(data)
+            started = time.perf_counter()
+            store = KpiStore.from_files(os.path.join(kpi_dir, "kpis.csv"), None)
+            kpi_results[label] = {
+                "bytes": len(data),
+                "load_ms": (time.perf_counter() - started) * 1000,
+                "rows": store.row_count
+            }
+        results["kpis"] = kpi_results
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"=== Transporte del roster ({len(roster) / 1024:.0f} KB sin comprimir) ===")
+    print(f"{'variante':<14} {'KB en red':>10} {'refresco ms':>12} {'sin cambios ms':>15} {'usuarios':>9}")
+    for label, r in results.items():
+        if label != "kpis":
+            print(f"{label:<14} {r['wire_bytes'] / 1024:>10.1f} {r['refresh_ms']:>12.1f} "
+                  f"{r['unchanged_ms']:>15.1f} {r['users']:>9}")
+    print("--- KPIs TecnicosTT.csv ---")
+    print(f"{'variante':<14} {'KB':>10} {'carga ms':>12} {'filas':>9}")
+    for label, r in kpi_results.items():
+        print(f"{label:<14} {r['bytes'] / 1024:>10.1f} {r['load_ms']:>12.1f} {r['rows']:>9}")
+    if not compression.zstd_available():
+        print("(zstandard no instalado: se omitieron las variantes .zst)")
+
+    return results
+
+
+def bench_bloom(unknown=100000, fp_rates=(0.1, 0.01, 0.001), repeat=50):
+    """Filtro de Bloom de usuarios: tamaño, falsos positivos medidos y costo del rechazo"""
+    import shutil
+    import tempfile
+    import tabular
+    from auth_manager import AuthManager
+    from bloom_filter import BloomFilter
+    from load_simulator import OneDriveStandIn
+
+    roster = tabular.normalize_columns(tabular.read_csv(ROSTER_CSV, dtype=str))
+    usernames = {tabular.cell_text(row, 'nombre').lower() for _, row in roster.iterrows()}
+    usernames.discard('')
+    probes = [f"usuario inexistente {i}" for i in range(unknown)]
+
+    results = {}
+    print(f"=== Filtro de Bloom ({len(usernames)} usuarios, {unknown} nombres desconocidos) ===")
+    print(f"{'tasa conf.':>10} {'KB':>7} {'k':>3} {'FP esperado':>12} {'FP medido':>10} {'consulta us':>12}")
+    for fp_rate in fp_rates:
+        bloom = BloomFilter.from_items(usernames, fp_rate)
+        started = time.perf_counter()
+        false_positives = sum(1 for name in probes if name in bloom)
+        lookup_us = (time.perf_counter() - started) * 1e6 / unknown
+        assert all(name in bloom for name in usernames)
+
+        results[fp_rate] = {
+            "bytes": bloom.size_bytes(),
+            "hash_count": bloom.hash_count,
+            "expected_fp": bloom.expected_fp_rate(),
+            "measured_fp": false_positives / unknown,
+            "lookup_us": lookup_us
+        }
+        r = results[fp_rate]
+        print(f"{fp_rate:>10} {r['bytes'] / 1024:>7.1f} {r['hash_count']:>3} "
+              f"{r['expected_fp']:>12.4%} {r['measured_fp']:>10.4%} {r['lookup_us']:>12.2f}")
+
+    # Rechazo de un usuario inexistente: filtro vs carga de la tabla desde el caché
+    with open(ROSTER_CSV, 'rb') as f:
+        server = OneDriveStandIn({"roster": f.read()}).start()
+    work_dir = tempfile.mkdtemp(prefix="tablero_bloom_")
+    previous_cwd = os.getcwd()
+    try:
+        os.chdir(work_dir)
+        seed = AuthManager()
+        seed.csv_url = server.share_url("roster")
+        seed._load_permissions(force_refresh=True)
+
+        timings = {"filtro": [], "bloque sellado": [], "tabla completa": []}
+        for i in range(repeat):
+            client = AuthManager()
+            started = time.perf_counter()
+            rejected = client._is_unknown_user(probes[i])
+            timings["filtro"].append(time.perf_counter() - started)
+            assert rejected or probes[i] in client._username_filter[1]
+
+            # Sin filtro: se desencripta solo el bloque del roster sellado
+            client = AuthManager()
+            started = time.perf_counter()
+            found, user_data = client._lookup_cached_user(probes[i])
+            timings["bloque sellado"].append(time.perf_counter() - started)
+            assert found and user_data is None
+
+            client = AuthManager()
+            started = time.perf_counter()
+            client._load_permissions_from_cache()
+            _ = probes[i] in client.permissions_cache
+            timings["tabla completa"].append(time.perf_counter() - started)
+    finally:
+        os.chdir(previous_cwd)
+        server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("--- Rechazo de usuario inexistente (instancia nueva, caché vigente) ---")
+    for label, values in timings.items():
+        median_ms = sorted(values)[len(values) // 2] * 1000
+        results[f"reject_{label}"] = median_ms
+        print(f"{label:<16} {median_ms:>8.2f} ms")
+
+    return results
+
+
+def bench_first_login(repeat=3):
+    """
+    Instalación en frío: roster listo para el primer login y primera vista de
+    KPIs, sin y con el paquete precompilado (prebuilt/) que incluye el APK.
+    El paquete no trae el roster: en ambos casos se descarga y se sella, con
+    paquete se reutiliza su filtro de Bloom
+    """
+    import contextlib
+    import io
+    import shutil
+    import tempfile
+    from auth_manager import AuthManager, read_roster_rows
+    from kpi_data import KpiStore, KPI_FILE, TECHNICIANS_FILE, PREBUILT_FILE
+    from load_simulator import OneDriveStandIn
+    from prebuild import prebuild
+
+    with open(ROSTER_CSV, 'rb') as f:
+        roster = f.read()
+    with open(ROSTER_CSV, 'r', encoding='utf-8-sig', newline='') as f:
+        username = next(nombre for nombre, cedula in read_roster_rows(f) if nombre and cedula).lower()
+
+    server = OneDriveStandIn({"roster": roster}).start()
+    work_dir = tempfile.mkdtemp(prefix="tablero_first_login_")
+    previous_cwd = os.getcwd()
+    results = {}
+    try:
+        for label, with_bundle in (("sin paquete", False), ("con paquete", True)):
+            login_ms, kpi_ms = [], []
+            for i in range(repeat):
+                # Directorio de instalación nuevo: sin caché, solo lo que trae el APK
+                install_dir = os.path.join(work_dir, f"{label.replace(' ', '_')}_{i}")
+                os.makedirs(install_dir)
+                for name in (KPI_FILE, TECHNICIANS_FILE):
+                    shutil.copy(os.path.join(BASE_DIR, name), install_dir)
+                os.chdir(install_dir)
+                if with_bundle:
+                    # Paso de compilación: no se mide
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        prebuild("prebuilt", roster_path=ROSTER_CSV)
+                    # El APK trae kpis.bin en lugar de los CSV
+                    for name in (KPI_FILE, TECHNICIANS_FILE):
+                        os.remove(name)
+
+                started = time.perf_counter()
+                client = AuthManager()
+                client.csv_url = server.share_url("roster")
+                client._load_permissions()
+                assert username in client.permissions_cache
+                login_ms.append((time.perf_counter() - started) * 1000)
+
+                started = time.perf_counter()
+                store = KpiStore.load_local(os.path.join("prebuilt", PREBUILT_FILE))
+                store.query(sort_column="Nota Excelencia", descending=True)
+                kpi_ms.append((time.perf_counter() - started) * 1000)
+                os.chdir(work_dir)
+
+            results[label] = {
+                "login_ms": sorted(login_ms)[len(login_ms) // 2],
+                "kpis_ms": sorted(kpi_ms)[len(kpi_ms) // 2]
+            }
+    finally:
+        os.chdir(previous_cwd)
+        server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("=== Primer uso tras instalar (mediana) ===")
+    print(f"{'variante':<14} {'roster para login ms':>21} {'primera vista KPIs ms':>22}")
+    for label, r in results.items():
+        print(f"{label:<14} {r['login_ms']:>21.1f} {r['kpis_ms']:>22.1f}")
+    print("(sin contar la creación de la sesión encriptada, igual en ambos casos)")
+    return results
+
+
+def bench_sqlite(repeat=5):
+    """
+    Backend SQLite (storage.backend = "sqlite") frente a los archivos
+    JSON/CSV: carga, búsqueda y refresco del roster y de los KPIs
+    """
+    import shutil
+    import tempfile
+    from auth_manager import AuthManager, ingest_roster_rows, read_roster_rows
+    from content_store import file_sha256
+    from file_utils import atomic_write_json
+    from kpi_data import KpiStore, KPI_FILE, TECHNICIANS_FILE, PREBUILT_FILE
+    from sqlite_store import SqliteKpiStore, SqliteStore
+
+    with open(ROSTER_CSV, 'r', encoding='utf-8-sig', newline='') as f:
+        rows = read_roster_rows(f)
+    permissions = ingest_roster_rows(rows)
+    changed = dict(permissions)
+    username = next(iter(permissions))
+    changed[username] = dict(changed[username], permissions="dashboard,kpis")
+
+    def median_ms(func):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return sorted(timings)[len(timings) // 2]
+
+    work_dir = tempfile.mkdtemp(prefix="tablero_sqlite_")
+    previous_cwd = os.getcwd()
+    results = {}
+    try:
+        os.chdir(work_dir)
+        for name in (KPI_FILE, TECHNICIANS_FILE):
+            shutil.copy(os.path.join(BASE_DIR, name), work_dir)
+
+        # Roster: la misma ruta de AuthManager con cada backend
+        db = SqliteStore(os.path.join("cache", "tablero.db"))
+        clients = {}
+        for label, roster_db in (("sellado", None), ("sqlite", db)):
+            client = AuthManager()
+            client.roster_db = roster_db
+            client.cache_file = f"auth_cache_{label}.json"
+            clients[label] = client
+        json_path = os.path.join("cache", "roster.json")
+
+        results["roster: carga"] = {
+            "json": median_ms(lambda: atomic_write_json(json_path, permissions, indent=None)),
+            "sellado": median_ms(lambda: clients["sellado"]._put_permissions("v1", permissions)),
+            "sqlite": median_ms(lambda: clients["sqlite"]._put_permissions("v1", permissions)),
+        }
+
+        def json_lookup():
+            with open(json_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get(username)
+
+        for label in ("sellado", "sqlite"):
+            clients[label]._activate_roster("v1", permissions)
+        lookup = {"json": median_ms(json_lookup)}
+        for label in ("sellado", "sqlite"):
+            def cached_login(label=label):
+                client = AuthManager()
+                client.roster_db = clients[label].roster_db
+                client.cache_file = clients[label].cache_file
+                found, user_data = client._lookup_cached_user(username)
+                assert found and user_data is not None
+            lookup[label] = median_ms(cached_login)
+        results["roster: login (usuario)"] = lookup
+
+        results["roster: refresco"] = {
+            "json": median_ms(lambda: atomic_write_json(json_path, changed, indent=None)),
+            "sellado": median_ms(lambda: clients["sellado"]._put_permissions("v2", changed)),
+            "sqlite": median_ms(lambda: clients["sqlite"]._put_permissions("v2", changed)),
+        }
+
+        # KPIs: CSV + índices en memoria (y artefacto precompilado) frente a SQLite
+        prebuilt = os.path.join("prebuilt", PREBUILT_FILE)
+        os.makedirs("prebuilt")
+        with open(prebuilt, 'wb') as f:
+            f.write(KpiStore.from_files().to_bytes(sources={
+                KPI_FILE: file_sha256(KPI_FILE), TECHNICIANS_FILE: file_sha256(TECHNICIANS_FILE)
+            }))
+
+        def sqlite_reload():
+            db.connection().execute("DELETE FROM source")
+            db.connection().commit()
+            SqliteKpiStore.load_local(db)
+
+        results["kpis: carga desde CSV"] = {
+            "json": median_ms(KpiStore.from_files),
+            "sqlite": median_ms(sqlite_reload),
+        }
+        results["kpis: apertura sin cambios"] = {
+            "json": median_ms(lambda: KpiStore.load_local(prebuilt)),
+            "sqlite": median_ms(lambda: SqliteKpiStore.load_local(db)),
+        }
+
+        stores = {"json": KpiStore.load_local(prebuilt), "sqlite": SqliteKpiStore.load_local(db)}
+        cc = stores["json"].data["CC_TECNICO"][len(stores["json"].data["CC_TECNICO"]) // 2]
+        work_type = stores["json"].get_work_types()[0]
+        results["kpis: técnico (CC_TECNICO)"] = {
+            label: median_ms(lambda store=store: store.view_rows(store.query(technician=cc)))
+            for label, store in stores.items()
+        }
+        results["kpis: filtro + orden"] = {
+            label: median_ms(lambda store=store: store.view_rows(
+                store.query(work_type, None, "Nota Excelencia", True)[:50]
+            ))
+            for label, store in stores.items()
+        }
+        db.close()
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("=== SQLite vs archivos (mediana, ms) ===")
+    print(f"{'operación':<28} {'JSON/CSV':>9} {'sellado':>9} {'SQLite':>9}")
+    for operation, r in results.items():
+        sealed = f"{r['sellado']:>9.2f}" if "sellado" in r else f"{'-':>9}"
+        print(f"{operation:<28} {r['json']:>9.2f} {sealed} {r['sqlite']:>9.2f}")
+    return results
+
+
+def bench_fleet(clients=50):
+    """Descargas del roster de una flota simultánea contra un OneDrive local"""
+    from load_simulator import run_simulation
+    return run_simulation(clients=clients)
+
+
+BENCHMARKS = {
+    "tabular": bench_tabular,
+    "kpi": bench_kpi_queries,
+    "logging": bench_logging,
+    "transport": bench_transport,
+    "bloom": bench_bloom,
+    "fleet": bench_fleet,
+    "first_login": bench_first_login,
+    "sqlite": bench_sqlite,
+}
+
+
+def main(names=None):
+    """Ejecuta los benchmarks indicados (o todos)"""
+    names = names or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Benchmark desconocido: {name}. Disponibles: {', '.join(BENCHMARKS)}")
+            continue
+        started = time.perf_counter()
+        BENCHMARKS[name]()
+        print(f"[{name}] {time.perf_counter() - started:.2f} s\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
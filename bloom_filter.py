@@ -0,0 +1,96 @@
+"""
+Módulo de filtro de Bloom
+Conjunto probabilístico compacto: responde "seguro que no está" o "puede
+estar". Se usa para rechazar usuarios inexistentes sin cargar la tabla de
+permisos completa
+"""
+
+import hashlib
+import math
+import struct
+
+
+# Rango aceptado para la tasa configurable (fuera de él se usa la por defecto)
+DEFAULT_FP_RATE = 0.01
+MIN_FP_RATE = 1e-6
+MAX_FP_RATE = 0.5
+
+
+def clamp_fp_rate(value, default=DEFAULT_FP_RATE):
+    """Tasa de falsos positivos válida a partir de un valor de configuración"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return default
+    if not 0 < value < 1:
+        return default
+    return min(max(value, MIN_FP_RATE), MAX_FP_RATE)
+
+
+class BloomFilter:
+    """Filtro de Bloom con doble hashing sobre blake2b"""
+
+    MAGIC = b"TBBLM001"
+    # bits (uint32), funciones hash (uint8), elementos (uint32), tasa de falsos positivos (float64)
+    HEADER = struct.Struct("<IBId")
+
+    def __init__(self, capacity, fp_rate=0.01, bits=None, hash_count=None):
+        capacity = max(1, int(capacity))
+        if not 0 < fp_rate < 1:
+            raise ValueError(f"Tasa de falsos positivos fuera de (0, 1): {fp_rate}")
+        self.fp_rate = fp_rate
+        # Tamaño óptimo: m = -n ln p / (ln 2)^2, k = m/n ln 2
+        self.bits = bits or max(8, int(math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2)))
+        self.hash_count = hash_count or max(1, int(round(self.bits / capacity * math.log(2))))
+        self.count = 0
+        self._array = bytearray((self.bits + 7) // 8)
+
+    @classmethod
+    def from_items(cls, items, fp_rate=0.01):
+        """Construye el filtro con tamaño justo para los elementos dados"""
+        items = list(items)
+        bloom = cls(len(items), fp_rate)
+        for item in items:
+            bloom.add(item)
+        return bloom
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hash_count)]
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self._array[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        array = self._array
+        return all(array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def expected_fp_rate(self):
+        """Tasa de falsos positivos esperada con los elementos cargados"""
+        if not self.count:
+            return 0.0
+        return (1 - math.exp(-self.hash_count * self.count / self.bits)) ** self.hash_count
+
+    def size_bytes(self):
+        return len(self.MAGIC) + self.HEADER.size + len(self._array)
+
+    def to_bytes(self):
+        header = self.HEADER.pack(self.bits, self.hash_count, self.count, self.fp_rate)
+        return self.MAGIC + header + bytes(self._array)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:len(cls.MAGIC)] != cls.MAGIC:
+            raise ValueError("Filtro de Bloom inválido")
+        offset = len(cls.MAGIC)
+        bits, hash_count, count, fp_rate = cls.HEADER.unpack_from(data, offset)
+        bloom = cls(max(1, count), fp_rate, bits=bits, hash_count=hash_count)
+        bloom.count = count
+        bloom._array = bytearray(data[offset + cls.HEADER.size:])
+        if len(bloom._array) != (bits + 7) // 8:
+            raise ValueError("Filtro de Bloom truncado")
+        return bloom
@@ -13,16 +13,23 @@ package.domain = com.comcel.powerbi
 source.dir = .
 
 # (list) Source files to include (let empty to include all the files)
+# Sin csv: los KPIs van solo como prebuilt/kpis.bin
 source.include_exts = py,png,jpg,kv,atlas,json
 
 # (list) List of inclusions using pattern matching
 #source.include_patterns = assets/*,images/*.png
+# Artefactos precompilados (python prebuild.py --out prebuilt)
+source.include_patterns = prebuilt/*,prebuilt/objects/*
 
 # (list) Source files to exclude (let empty to not exclude anything)
 #source.exclude_exts = spec
 
 # (list) List of directory to exclude (let empty to not exclude anything)
-source.exclude_dirs = tests, bin, .venv, __pycache__
+source.exclude_dirs = tests, bin, .venv, __pycache__, cache, logs
+
+# (list) List of exclusions using pattern matching
+# El roster (cédulas en claro) no va en el APK: el teléfono lo descarga y lo sella
+source.exclude_patterns = usuarios_sistema.csv
 
 # (str) Application versioning (method 1)
 version = 1.0.0
@@ -33,7 +40,7 @@ version = 1.0.0
 
 # (list) Application requirements
 # comma separated e.g. requirements = sqlite3,kivy
-requirements = python3,kivy,kivymd,pandas,requests,cryptography,pillow,certifi,charset-normalizer,idna,urllib3,pyopenssl
+requirements = python3,kivy,kivymd,requests,cryptography,pillow,certifi,charset-normalizer,idna,urllib3,pyopenssl
 
 # (str) Custom source folders for requirements
 # Sets custom source for any requirements with recipes
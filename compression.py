@@ -0,0 +1,74 @@
+"""
+Módulo de lectura de archivos comprimidos
+Detecta artefactos .gz / .zst por su firma y los descomprime
+en streaming, de modo que el CSV llega al parser sin cargar el archivo
+completo en memoria. zstandard es opcional: si no está instalado solo se
+aceptan artefactos gzip
+"""
+
+import gzip
+import importlib.util
+import io
+import os
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Encabezado de negociación para descargas (urllib3 decodifica ambos)
+ACCEPT_ENCODING = "gzip, deflate"
+
+
+def zstd_available():
+    """Verifica si zstandard está instalado (sin importarlo)"""
+    return importlib.util.find_spec("zstandard") is not None
+
+
+def detect(head):
+    """
+    Formato de compresión según los primeros bytes: 'gzip', 'zstd' o None.
+    No se usa la extensión: un .csv.gz servido con Content-Encoding gzip
+    llega ya descomprimido
+    """
+    if head.startswith(GZIP_MAGIC):
+        return "gzip"
+    if head.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return None
+
+
+def find_artifact(path):
+    """Ruta existente para un CSV: el archivo plano o su versión .gz / .zst"""
+    candidates = [path, path + ".gz"]
+    if zstd_available():
+        candidates.append(path + ".zst")
+
+    for candidate in candidates:
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def open_binary(stream):
+    """Stream binario descomprimido a partir de uno posiblemente comprimido"""
+    if not hasattr(stream, "peek"):
+        stream = io.BufferedReader(stream)
+
+    kind = detect(stream.peek(4)[:4])
+    if kind == "gzip":
+        return gzip.GzipFile(fileobj=stream, mode="rb")
+    if kind == "zstd":
+        if not zstd_available():
+            raise ValueError("El archivo está comprimido con zstd y zstandard no está instalado")
+        import zstandard
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(stream))
+    return stream
+
+
+def open_text(source, encoding="utf-8-sig"):
+    """
+    Abre un CSV (ruta o stream binario) como texto, descomprimiendo en
+    streaming si es .gz o .zst
+    """
+    raw = open(source, "rb") if isinstance(source, (str, os.PathLike)) else source
+    return io.TextIOWrapper(open_binary(raw), encoding=encoding, newline="")
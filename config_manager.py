@@ -1,23 +1,61 @@
 """
 Módulo de gestión de configuración general
+La configuración publicada es una instantánea que nunca se modifica: los
+lectores la usan sin bloqueo y cada escritura publica una copia nueva
+(solo se copian las secciones que cambian). Los guardados se agrupan con
+un retardo y los suscriptores reciben solo las claves que cambiaron. Los
+lectores reciben vistas de solo lectura (MappingProxyType recursivo), así
+que nadie puede modificar la instantánea publicada por accidente
 """
 
+import atexit
 import json
 import os
+import threading
+from collections.abc import Mapping
 from datetime import datetime
-from cryptography.fernet import Fernet
+from types import MappingProxyType
+
+from file_utils import atomic_write_json
+
+
+def _freeze(value):
+    """Vista de solo lectura: dicts como MappingProxyType y listas como tuplas"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value):
+    """Copia modificable de un valor (p. ej. una vista devuelta por get)"""
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_thaw(v) for v in value]
+    return value
 
 
 class ConfigManager:
     """Gestor de configuración general de la aplicación"""
 
-    def __init__(self):
+    def __init__(self, save_delay=1.0):
         self.config_file = "app_config.json"
         self.app_name = "PowerBI Mobile Dashboard"
         self.version = "1.0.0"
-        self.config = self._load_default_config()
+        self.save_delay = save_delay
+
+        self._write_lock = threading.RLock()
+        self._subscribers = {}
+        self._next_subscriber = 0
+        self._save_timer = None
+        self._dirty = False
+        self._config = self._load_default_config()
 
         self._load_config()
+        self._view = _freeze(self._config)
+        atexit.register(self.flush)
 
     def _load_default_config(self):
         """Carga configuración por defecto"""
@@ -28,6 +66,7 @@ class ConfigManager:
                 "debug": False,
                 "auto_refresh": True,
                 "refresh_interval": 300,  # 5 minutos
+                "max_refresh_backoff": 8,  # intervalo máximo: 8 x refresh_interval
                 "cache_timeout": 3600     # 1 hora
             },
             "ui": {
@@ -40,6 +79,9 @@ class ConfigManager:
             "security": {
                 "session_timeout": 7200,  # 2 horas
                 "max_login_attempts": 3,
+                "login_window": 300,      # 5 minutos
+                "lockout_duration": 900,  # 15 minutos
+                "username_filter_fp_rate": 0.01,  # filtro de Bloom de usuarios
                 "require_strong_password": False,
                 "encrypt_local_data": True
             },
@@ -53,13 +95,26 @@ class ConfigManager:
             "network": {
                 "timeout": 30,
                 "retry_attempts": 3,
-                "offline_mode": False
+                "offline_mode": False,
+                "max_parallel_sources": 4,  # descargas simultáneas del roster federado
+                "source_timeout": 20        # segundos antes de usar la versión guardada
             },
             "logging": {
                 "enabled": True,
                 "level": "INFO",
                 "max_file_size": 1048576,  # 1MB
                 "backup_count": 3
+            },
+            "maintenance": {
+                "max_disk_mb": 50,        # cache/ + logs/
+                "max_age_days": 30,
+                "interval": 3600,         # 1 hora entre limpiezas
+                "slice_ms": 4             # trabajo máximo por tick
+            },
+            "storage": {
+                "backend": "files",       # "sqlite": roster, KPIs y auditoría en SQLite
+                "db_file": "cache/tablero.db",
+                "audit_sync_interval": 300  # segundos entre copias de la auditoría a SQLite
             }
         }
 
@@ -70,59 +125,179 @@ class ConfigManager:
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     saved_config = json.load(f)
                     # Merger configuración guardada con defaults
-                    self.config = self._merge_configs(self.config, saved_config)
+                    self._config = self._merge_configs(self._config, saved_config)
         except Exception as e:
             print(f"Error cargando configuración: {e}")
 
     def _merge_configs(self, default_config, saved_config):
-        """Combina configuración por defecto con la guardada"""
-        result = default_config.copy()
+        """Combina configuración por defecto con la guardada (sin modificar ninguna)"""
+        result = {
+            section: dict(values) if isinstance(values, dict) else values
+            for section, values in default_config.items()
+        }
 
         for section, values in saved_config.items():
-            if section in result and isinstance(values, dict):
+            if isinstance(result.get(section), dict) and isinstance(values, dict):
                 result[section].update(values)
             else:
-                result[section] = values
+                result[section] = dict(values) if isinstance(values, dict) else values
 
         return result
 
+    # ------------------------------------------------------------------
+    # Instantánea, escritura copia-en-escritura y notificaciones
+    # ------------------------------------------------------------------
+
+    @property
+    def config(self):
+        """Instantánea vigente de la configuración, de solo lectura (usar set)"""
+        return self._view
+
+    @config.setter
+    def config(self, new_config):
+        self._notify(self._publish(_thaw(new_config)))
+
+    def snapshot(self):
+        """Instantánea vigente de solo lectura; sigue válida aunque después se escriba"""
+        return self._view
+
+    @staticmethod
+    def _diff(old, new):
+        """Claves cambiadas entre dos instantáneas: {(sección, clave): (antes, después)}"""
+        changes = {}
+        for section in set(old) | set(new):
+            old_values = old.get(section)
+            new_values = new.get(section)
+            if old_values is new_values:
+                continue
+            if isinstance(old_values, dict) and isinstance(new_values, dict):
+                for key in set(old_values) | set(new_values):
+                    before = old_values.get(key)
+                    after = new_values.get(key)
+                    if before != after or (key in old_values) != (key in new_values):
+                        changes[(section, key)] = (_freeze(before), _freeze(after))
+            elif old_values != new_values:
+                changes[(section, None)] = (_freeze(old_values), _freeze(new_values))
+        return changes
+
+    def _publish(self, new_config):
+        """Publica una nueva instantánea; devuelve las claves que cambiaron"""
+        with self._write_lock:
+            changes = self._diff(self._config, new_config)
+            changes.pop(("_metadata", None), None)
+            if changes:
+                self._config = new_config
+                self._view = _freeze(new_config)
+                self._dirty = True
+            return changes
+
+    def _notify(self, changes):
+        """Avisa a los suscriptores (fuera del lock de escritura)"""
+        if not changes:
+            return
+        for callback, keys in list(self._subscribers.values()):
+            if keys is None:
+                relevant = changes
+            else:
+                relevant = {
+                    (section, key): value for (section, key), value in changes.items()
+                    if section in keys or (section, key) in keys
+                }
+            if relevant:
+                try:
+                    callback(relevant)
+                except Exception as e:
+                    print(f"Error notificando cambio de configuración: {e}")
+
+    def subscribe(self, callback, keys=None):
+        """
+        Registra un suscriptor de cambios. keys acota las notificaciones a
+        secciones ("ui") o claves (("app", "refresh_interval")); callback
+        recibe {(sección, clave): (antes, después)} en el hilo que escribió.
+        Devuelve un id para cancelar la suscripción
+        """
+        with self._write_lock:
+            subscriber_id = self._next_subscriber
+            self._next_subscriber += 1
+            self._subscribers[subscriber_id] = (callback, set(keys) if keys is not None else None)
+        return subscriber_id
+
+    def unsubscribe(self, subscriber_id):
+        with self._write_lock:
+            return self._subscribers.pop(subscriber_id, None) is not None
+
+    # ------------------------------------------------------------------
+    # Guardado con retardo
+    # ------------------------------------------------------------------
+
     def save_config(self):
-        """Guarda configuración en archivo"""
-        try:
+        """
+        Programa el guardado en archivo. Varias llamadas seguidas se agrupan
+        en una sola escritura atómica tras save_delay segundos
+        """
+        with self._write_lock:
+            self._dirty = True
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.save_delay, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def flush(self):
+        """Escribe ya la configuración pendiente (también se llama al salir)"""
+        with self._write_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+
             # Agregar metadata de guardado
-            self.config["_metadata"] = {
+            config = dict(self._config)
+            config["_metadata"] = {
                 "last_saved": datetime.now().isoformat(),
                 "version": self.version
             }
+            self._config = config
+            self._view = _freeze(config)
 
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
+        try:
+            atomic_write_json(self.config_file, config)
         except Exception as e:
             print(f"Error guardando configuración: {e}")
 
     def get(self, section, key=None, default=None):
-        """Obtiene valor de configuración"""
+        """Obtiene valor de configuración (las secciones son de solo lectura)"""
+        config = self._view
         try:
             if key is None:
-                return self.config.get(section, default)
+                return config.get(section, default)
             else:
-                return self.config.get(section, {}).get(key, default)
+                return config.get(section, {}).get(key, default)
         except Exception:
             return default
 
     def set(self, section, key, value):
-        """Establece valor de configuración"""
-        if section not in self.config:
-            self.config[section] = {}
-
-        if isinstance(self.config[section], dict):
-            self.config[section][key] = value
-        else:
-            self.config[section] = {key: value}
+        """Establece valor de configuración (copia solo la sección afectada)"""
+        with self._write_lock:
+            current = self._config.get(section)
+            if isinstance(current, dict) and key in current and current[key] == value:
+                return
+            values = dict(current) if isinstance(current, dict) else {}
+            values[key] = _thaw(value)
+
+            new_config = dict(self._config)
+            new_config[section] = values
+            changes = self._publish(new_config)
+        self._notify(changes)
 
     def set_section(self, section, values):
         """Establece sección completa de configuración"""
-        self.config[section] = values
+        with self._write_lock:
+            new_config = dict(self._config)
+            new_config[section] = _thaw(values)
+            changes = self._publish(new_config)
+        self._notify(changes)
 
     def get_app_info(self):
         """Obtiene información de la aplicación"""
@@ -179,8 +354,7 @@ class ConfigManager:
     def export_config(self, file_path):
         """Exporta configuración a archivo"""
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
+            atomic_write_json(file_path, self._config)
             return True
         except Exception as e:
             print(f"Error exportando configuración: {e}")
@@ -230,12 +404,16 @@ class AppConstants:
     CONFIG_DIR = "config"
     CACHE_DIR = "cache"
     LOGS_DIR = "logs"
+    PREBUILT_DIR = "prebuilt"  # artefactos precompilados que trae el APK (prebuild.py)
 
     # Límites
     MAX_LOGIN_ATTEMPTS = 3
     SESSION_TIMEOUT = 7200  # 2 horas
     CACHE_TIMEOUT = 3600    # 1 hora
 
+    # Presupuesto de arranque en frío (importaciones + primer frame)
+    COLD_START_BUDGET_MS = 2000
+
     # URLs y endpoints
     POWERBI_DOMAINS = [
         "app.powerbi.com",
@@ -253,6 +431,7 @@ class AppConstants:
         "es": {
             "login_required": "Debe iniciar sesión para continuar",
             "invalid_credentials": "Credenciales inválidas",
+            "too_many_attempts": "Demasiados intentos fallidos. Intente de nuevo en {minutes} min",
             "session_expired": "La sesión ha expirado",
             "network_error": "Error de conexión de red",
             "config_error": "Error en la configuración",
@@ -264,6 +443,7 @@ class AppConstants:
         "en": {
             "login_required": "Login required to continue",
             "invalid_credentials": "Invalid credentials",
+            "too_many_attempts": "Too many failed attempts. Try again in {minutes} min",
             "session_expired": "Session has expired",
             "network_error": "Network connection error",
             "config_error": "Configuration error",
@@ -0,0 +1,121 @@
+"""
+Módulo de almacén direccionado por contenido
+Los artefactos descargados se guardan en cache/objects con su sha256 como
+nombre, calculado mientras se escriben. Un contenido idéntico ocupa un
+solo objeto, y volver a una versión anterior es solo cambiar de hash
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from file_utils import atomic_write_bytes, atomic_write_json
+
+
+def file_sha256(path, chunk_size=65536):
+    """sha256 de un archivo leído por bloques"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContentStore:
+    """
+    Objetos <sha256>.<tipo> en un directorio (p. ej. el CSV y su versión
+    ingerida). fallback_roots son directorios de solo lectura donde también
+    se buscan objetos, como los precompilados que trae el APK
+    """
+
+    def __init__(self, root=os.path.join("cache", "objects"), fallback_roots=()):
+        self.root = root
+        self.fallback_roots = tuple(fallback_roots)
+
+    def path(self, digest, kind):
+        """Ruta del objeto: la del almacén o la de un directorio de respaldo que lo tenga"""
+        name = f"{digest}.{kind}"
+        for fallback in self.fallback_roots:
+            candidate = os.path.join(fallback, name)
+            if os.path.exists(candidate) and not os.path.exists(os.path.join(self.root, name)):
+                return candidate
+        return os.path.join(self.root, name)
+
+    def has(self, digest, kind):
+        return os.path.exists(self.path(digest, kind))
+
+    def put_stream(self, stream, kind, chunk_size=65536):
+        """
+        Copia un stream binario al almacén calculando el hash al pasar.
+        Devuelve (digest, bytes); si el objeto ya existía se descarta la copia
+        """
+        os.makedirs(self.root, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                while True:
+                    chunk = stream.read(chunk_size)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+
+            final_path = self.path(digest.hexdigest(), kind)
+            if os.path.exists(final_path):
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return digest.hexdigest(), size
+
+    def put_bytes(self, digest, kind, data):
+        os.makedirs(self.root, exist_ok=True)
+        atomic_write_bytes(os.path.join(self.root, f"{digest}.{kind}"), data)
+
+    def get_bytes(self, digest, kind):
+        """Contenido del objeto o None si no existe"""
+        try:
+            with open(self.path(digest, kind), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put_json(self, digest, kind, data):
+        os.makedirs(self.root, exist_ok=True)
+        atomic_write_json(os.path.join(self.root, f"{digest}.{kind}"), data, indent=None)
+
+    def get_json(self, digest, kind):
+        """Objeto JSON o None si no existe"""
+        try:
+            with open(self.path(digest, kind), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def prune(self, keep):
+        """Borra los objetos cuyo hash no está en keep; devuelve cuántos borró"""
+        keep = set(keep)
+        removed = 0
+        try:
+            entries = list(os.scandir(self.root))
+        except OSError:
+            return 0
+
+        for entry in entries:
+            digest = entry.name.split(".", 1)[0]
+            if entry.is_file() and digest not in keep and not entry.name.endswith(".tmp"):
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
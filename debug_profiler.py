@@ -0,0 +1,202 @@
+"""
+Módulo de perfilado en modo depuración
+Con app.debug activo envuelve las rutas críticas (carga de permisos,
+descarga de los CSV, validación, descifrado de la configuración de Power BI y
+construcción de la app) con un perfilador por muestreo. Las pilas se
+guardan en logs/ en formato "collapsed" (una pila por línea con su número de
+muestras), el que leen flamegraph.pl, speedscope e inferno. Sin app.debug no
+se instala nada: los métodos originales quedan intactos
+"""
+
+import atexit
+import functools
+import importlib
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+
+# Rutas críticas que se perfilan: (módulo, clase, método)
+DEFAULT_HOOKS = [
+    ("auth_manager", "AuthManager", "_load_permissions"),
+    ("auth_manager", "AuthManager", "_download_source"),
+    ("utils", "DataValidator", "validate_csv_structure"),
+    ("powerbi_manager", "PowerBIManager", "_load_encrypted_config"),
+]
+
+
+def _frame_label(code):
+    # El separador de frames en formato collapsed es ';'
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """
+    Perfilador por muestreo: un hilo lee cada interval segundos la pila de
+    los hilos que están dentro de una ruta perfilada y cuenta las pilas.
+    Con código Python puro el GIL limita la frecuencia real al intervalo de
+    cambio de hilo (5 ms por defecto)
+    """
+
+    def __init__(self, interval=0.001, log_dir="logs"):
+        self.interval = interval
+        self.log_dir = log_dir
+        self.stacks = Counter()
+        self.calls = Counter()
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._wakeup = threading.Event()
+        self._stopped = False
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="debug-profiler", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Bucle del hilo de muestreo (duerme mientras no hay rutas activas)"""
+        while not self._stopped:
+            with self._lock:
+                active = dict(self._active)
+            if not active:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            frames = sys._current_frames()
+            samples = []
+            for thread_id, (label, _) in active.items():
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    # Los frames del propio perfilador (wrapper) no aportan
+                    if frame.f_code.co_filename != __file__:
+                        stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    stack.append(label)
+                    samples.append(";".join(reversed(stack)))
+
+            with self._lock:
+                self.stacks.update(samples)
+            time.sleep(self.interval)
+
+    def enter(self, label):
+        """Marca que el hilo actual entra en una ruta perfilada"""
+        thread_id = threading.get_ident()
+        with self._lock:
+            current = self._active.get(thread_id)
+            if current is not None:
+                # Ruta anidada: las muestras siguen en la ruta exterior
+                self._active[thread_id] = (current[0], current[1] + 1)
+                return
+            self._active[thread_id] = (label, 1)
+            self.calls[label] += 1
+        self._ensure_thread()
+        self._wakeup.set()
+
+    def exit(self):
+        thread_id = threading.get_ident()
+        with self._lock:
+            label, depth = self._active[thread_id]
+            if depth > 1:
+                self._active[thread_id] = (label, depth - 1)
+            else:
+                del self._active[thread_id]
+
+    def wrap(self, func, label):
+        """Envuelve una función para perfilarla mientras se ejecuta"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self.enter(label)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.exit()
+        wrapper.__profiled__ = func
+        return wrapper
+
+    def dump(self, path=None):
+        """Escribe las pilas acumuladas (formato collapsed) y devuelve la ruta"""
+        with self._lock:
+            stacks = self.stacks
+            self.stacks = Counter()
+        if not stacks:
+            return None
+
+        if path is None:
+            os.makedirs(self.log_dir, exist_ok=True)
+            path = os.path.join(
+                self.log_dir, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.folded"
+            )
+        with open(path, 'a', encoding='utf-8') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def stop(self):
+        """Detiene el hilo de muestreo y guarda lo pendiente"""
+        self._stopped = True
+        self._wakeup.set()
+        return self.dump()
+
+
+def _install(profiler, owner, attr, label):
+    """Reemplaza owner.attr por su versión perfilada (respeta staticmethod/classmethod)"""
+    raw = owner.__dict__.get(attr) if isinstance(owner, type) else getattr(owner, attr)
+    if raw is None:
+        print(f"⚠️  No se puede perfilar {label}: no existe")
+        return False
+
+    func = raw.__func__ if isinstance(raw, (staticmethod, classmethod)) else raw
+    if hasattr(func, "__profiled__"):
+        return False
+
+    wrapped = profiler.wrap(func, label)
+    if isinstance(raw, staticmethod):
+        wrapped = staticmethod(wrapped)
+    elif isinstance(raw, classmethod):
+        wrapped = classmethod(wrapped)
+
+    setattr(owner, attr, wrapped)
+    return True
+
+
+# Instancia global: solo existe si el modo depuración la instaló
+_profiler = None
+
+
+def install_profiling_hooks(extra=(), interval=0.001):
+    """
+    Instala el perfilador en las rutas críticas y en extra (lista de
+    (objeto, atributo)). Se llama solo con app.debug activo; devuelve el
+    perfilador
+    """
+    global _profiler
+
+    if _profiler is None:
+        _profiler = SamplingProfiler(interval=interval)
+        atexit.register(_profiler.stop)
+
+    for module_name, class_name, attr in DEFAULT_HOOKS:
+        try:
+            owner = getattr(importlib.import_module(module_name), class_name)
+        except (ImportError, AttributeError) as e:
+            print(f"⚠️  No se puede perfilar {module_name}.{class_name}: {e}")
+            continue
+        _install(_profiler, owner, attr, f"{class_name}.{attr}")
+
+    for owner, attr in extra:
+        _install(_profiler, owner, attr, f"{getattr(owner, '__name__', type(owner).__name__)}.{attr}")
+
+    return _profiler
+
+
+def get_profiler():
+    """Perfilador instalado o None si el modo depuración no está activo"""
+    return _profiler
@@ -0,0 +1,43 @@
+"""
+Utilidades de escritura segura de archivos
+Las escrituras se hacen en un archivo temporal y se reemplazan de forma
+atómica, de modo que un lector nunca ve un archivo a medio escribir
+"""
+
+import json
+import os
+import tempfile
+
+
+def atomic_write_bytes(file_path, data):
+    """Escribe bytes en el archivo de forma atómica (temporal + rename)"""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(file_path)}.",
+        suffix=".tmp",
+        dir=directory
+    )
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_text(file_path, text, encoding='utf-8'):
+    """Escribe texto en el archivo de forma atómica"""
+    atomic_write_bytes(file_path, text.encode(encoding))
+
+
+def atomic_write_json(file_path, data, indent=2):
+    """Serializa JSON y lo escribe en el archivo de forma atómica"""
+    atomic_write_text(file_path, json.dumps(data, indent=indent, ensure_ascii=False))
@@ -0,0 +1,378 @@
+"""
+Módulo de datos de KPIs de técnicos
+Carga los CSV de KPIs en columnas y precalcula índices por tipo de trabajo,
+por técnico y órdenes de clasificación, para que filtrar y ordenar miles
+de filas no recorra la tabla completa
+"""
+
+import csv
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+import compression
+from content_store import file_sha256
+
+
+KPI_FILE = "KPIs TecnicosTT.csv"
+TECHNICIANS_FILE = "KPIs Tecnicos.csv"
+# Almacén ya construido (columnas + índices) que genera prebuild.py
+PREBUILT_FILE = "kpis.bin"
+
+TECHNICIAN_COLUMN = "CC_TECNICO"
+WORK_TYPE_COLUMN = "TIPO_TRABAJO(Grupo)"
+NAME_COLUMN = "NombreTecnico"
+
+# Columnas por las que se puede ordenar desde la interfaz
+SORTABLE_COLUMNS = [
+    "Nota Excelencia",
+    "KPI Efectividad",
+    "OTs Asignadas",
+    TECHNICIAN_COLUMN
+]
+
+
+def parse_kpi_value(text):
+    """Convierte '97,06%', '8,7' o '12' a número; vacío -> None"""
+    text = (text or "").strip()
+    if not text:
+        return None
+
+    text = text.rstrip('%').replace('.', '').replace(',', '.')
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+class KpiStore:
+    """Almacén columnar de KPIs con índices precalculados"""
+
+    def __init__(self):
+        self.columns = []
+        self.data = {}
+        self.row_count = 0
+        self.names = {}
+        self.work_type_index = {}
+        self.technician_index = {}
+        self._search_keys = {}
+        self._sort_orders = {}
+        self._all_rows = array('I')
+
+    @classmethod
+    def from_files(cls, kpi_path=KPI_FILE, technicians_path=TECHNICIANS_FILE):
+        """
+        Carga el CSV de KPIs por tipo de trabajo y, si existe, el de nombres.
+        Acepta también los artefactos comprimidos (.csv.gz / .csv.zst)
+        """
+        store = cls()
+        kpi_artifact = compression.find_artifact(kpi_path)
+        if kpi_artifact is None:
+            raise FileNotFoundError(kpi_path)
+        with compression.open_text(kpi_artifact) as f:
+            store.load(f)
+
+        technicians_artifact = technicians_path and compression.find_artifact(technicians_path)
+        if technicians_artifact:
+            with compression.open_text(technicians_artifact) as f:
+                store.load_names(f)
+
+        store.build_indexes()
+        return store
+
+    @classmethod
+    def from_snapshot(cls, snapshot, kpi_name=KPI_FILE, technicians_name=TECHNICIANS_FILE):
+        """Carga los KPIs desde el snapshot offline (ver offline_snapshot.py)"""
+        store = cls()
+        store.load(io.StringIO(snapshot.read(f"kpis/{kpi_name}").decode('utf-8-sig')))
+
+        if f"kpis/{technicians_name}" in snapshot.names():
+            store.load_names(io.StringIO(
+                snapshot.read(f"kpis/{technicians_name}").decode('utf-8-sig')
+            ))
+
+        store.build_indexes()
+        return store
+
+    def load(self, stream):
+        """Carga filas de KPIs desde un archivo abierto"""
+        reader = csv.reader(stream)
+        self.columns = [c.strip() for c in next(reader)]
+        self.data = {c: [] for c in self.columns}
+
+        columns = self.data
+        names = self.columns
+        width = len(names)
+        for row in reader:
+            if not row:
+                continue
+            row = row[:width] + [''] * (width - len(row))
+            for name, value in zip(names, row):
+                columns[name].append(value)
+
+        self.row_count = len(self.data[self.columns[0]]) if self.columns else 0
+
+    def load_names(self, stream):
+        """Carga nombres de técnicos (CC_TECNICO -> NombreTecnico)"""
+        for row in csv.DictReader(stream):
+            cc = (row.get(TECHNICIAN_COLUMN) or '').strip()
+            if cc:
+                self.names[cc] = (row.get(NAME_COLUMN) or '').strip()
+
+    def build_indexes(self):
+        """Precalcula índices por tipo de trabajo y por técnico"""
+        self.work_type_index = {}
+        self.technician_index = {}
+        self._sort_orders = {}
+        self._all_rows = array('I', range(self.row_count))
+
+        work_types = self.data.get(WORK_TYPE_COLUMN, [''] * self.row_count)
+        technicians = self.data.get(TECHNICIAN_COLUMN, [''] * self.row_count)
+
+        for row_id, (work_type, cc) in enumerate(zip(work_types, technicians)):
+            self.work_type_index.setdefault(work_type, array('I')).append(row_id)
+            self.technician_index.setdefault(cc, array('I')).append(row_id)
+
+        self._build_search_keys()
+
+    def _build_search_keys(self):
+        # Claves de búsqueda por técnico: cédula y nombre en minúsculas
+        self._search_keys = {
+            cc: f"{cc} {self.names.get(cc, '')}".lower()
+            for cc in self.technician_index
+        }
+
+    def get_work_types(self):
+        """Tipos de trabajo disponibles, ordenados"""
+        return sorted(w for w in self.work_type_index if w)
+
+    def _sort_order(self, column):
+        """
+        Permutación de filas ordenada por columna y rango de cada fila en
+        ella (se calculan una vez por columna). Los vacíos quedan al final
+        """
+        cached = self._sort_orders.get(column)
+        if cached is None:
+            parsed = [parse_kpi_value(v) for v in self.data[column]]
+            order = array('I', sorted(
+                range(self.row_count),
+                key=lambda i: (parsed[i] is None, parsed[i] or 0.0)
+            ))
+
+            rank = array('I', bytes(4 * self.row_count))
+            for position, row_id in enumerate(order):
+                rank[row_id] = position
+            self._sort_orders[column] = cached = (order, rank, parsed)
+        return cached
+
+    def query(self, work_type=None, technician=None, sort_column=None, descending=False):
+        """
+        Filtra y ordena usando los índices. Devuelve un array de ids de fila.
+        technician busca por cédula o nombre (subcadena, sin mayúsculas)
+        """
+        if work_type:
+            rows = self.work_type_index.get(work_type, array('I'))
+        else:
+            rows = self._all_rows
+
+        technician = (technician or '').strip().lower()
+        if technician:
+            matches = [cc for cc, key in self._search_keys.items() if technician in key]
+            selected = array('I')
+            for cc in matches:
+                selected.extend(self.technician_index[cc])
+            if work_type:
+                allowed = set(rows)
+                selected = array('I', (r for r in selected if r in allowed))
+            rows = selected
+
+        if sort_column:
+            order, rank, parsed = self._sort_order(sort_column)
+            if rows is self._all_rows:
+                rows = order
+            else:
+                rows = array('I', sorted(rows, key=rank.__getitem__))
+            if descending:
+                # Invertir manteniendo los vacíos al final
+                filled = [r for r in rows if parsed[r] is not None]
+                empty = [r for r in rows if parsed[r] is None]
+                rows = array('I', filled[::-1] + empty)
+        elif technician:
+            rows = array('I', sorted(rows))
+
+        return rows
+
+    def view_rows(self, row_ids):
+        """Filas listas para el RecycleView (solo datos, sin widgets)"""
+        cc = self.data[TECHNICIAN_COLUMN]
+        work_type = self.data.get(WORK_TYPE_COLUMN, [''] * self.row_count)
+        assigned = self.data.get("OTs Asignadas", [''] * self.row_count)
+        effectiveness = self.data.get("KPI Efectividad", [''] * self.row_count)
+        score = self.data.get("Nota Excelencia", [''] * self.row_count)
+        names = self.names
+
+        return [
+            {
+                'technician': names.get(cc[i]) or cc[i],
+                'work_type': work_type[i],
+                'assigned': assigned[i],
+                'effectiveness': effectiveness[i] or '-',
+                'score': score[i] or '-'
+            }
+            for i in row_ids
+        ]
+
+    # ------------------------------------------------------------------
+    # Artefacto precompilado
+    # ------------------------------------------------------------------
+
+    MAGIC = b"TBKPI001"
+    HEADER_LEN = struct.Struct("<I")
+
+    def to_bytes(self, sources=None):
+        """
+        Serializa columnas, nombres, índices y los órdenes de SORTABLE_COLUMNS:
+        MAGIC | largo del encabezado | encabezado JSON | secciones. Los índices
+        van como arrays uint32 crudos, que se leen sin parsear
+        """
+        sections = []
+        layout = {}
+        offset = 0
+
+        def add(name, data):
+            nonlocal offset
+            layout[name] = [offset, len(data)]
+            sections.append(data)
+            offset += len(data)
+
+        add("data", json.dumps([self.data[c] for c in self.columns], ensure_ascii=False).encode('utf-8'))
+        add("names", json.dumps(self.names, ensure_ascii=False).encode('utf-8'))
+
+        for index_name, index in (("work_type", self.work_type_index),
+                                  ("technician", self.technician_index)):
+            keys = []
+            rows = array('I')
+            for key, row_ids in index.items():
+                keys.append([key, len(rows), len(row_ids)])
+                rows.extend(row_ids)
+            add(f"{index_name}.keys", json.dumps(keys, ensure_ascii=False).encode('utf-8'))
+            add(f"{index_name}.rows", rows.tobytes())
+
+        for column in SORTABLE_COLUMNS:
+            if column in self.data:
+                order, rank, parsed = self._sort_order(column)
+                add(f"sort.{column}.order", order.tobytes())
+                add(f"sort.{column}.rank", rank.tobytes())
+                # Vacíos como NaN
+                add(f"sort.{column}.parsed",
+                    array('d', (float('nan') if v is None else v for v in parsed)).tobytes())
+
+        header = json.dumps({
+            'columns': self.columns,
+            'row_count': self.row_count,
+            'byteorder': sys.byteorder,
+            'sources': sources or {},
+            'sections': layout
+        }, ensure_ascii=False).encode('utf-8')
+        return self.MAGIC + self.HEADER_LEN.pack(len(header)) + header + b"".join(sections)
+
+    @classmethod
+    def read_header(cls, buffer):
+        """Encabezado del artefacto y posición donde empiezan las secciones"""
+        if bytes(buffer[:len(cls.MAGIC)]) != cls.MAGIC:
+            raise ValueError("Almacén de KPIs precompilado inválido")
+        header_at = len(cls.MAGIC)
+        (header_len,) = cls.HEADER_LEN.unpack_from(buffer, header_at)
+        data_start = header_at + cls.HEADER_LEN.size
+        header = json.loads(bytes(buffer[data_start:data_start + header_len]).decode('utf-8'))
+        return header, data_start + header_len
+
+    @classmethod
+    def from_bytes(cls, buffer):
+        """Reconstruye el almacén desde to_bytes() (bytes o mmap)"""
+        header, data_start = cls.read_header(buffer)
+        layout = header['sections']
+        swap = header.get('byteorder', sys.byteorder) != sys.byteorder
+
+        with memoryview(buffer) as view:
+            def section(name):
+                start, length = layout[name]
+                return view[data_start + start:data_start + start + length]
+
+            def numbers(name, typecode):
+                values = array(typecode)
+                values.frombytes(section(name))
+                if swap:
+                    values.byteswap()
+                return values
+
+            store = cls()
+            store.columns = header['columns']
+            store.row_count = header['row_count']
+            store.data = dict(zip(store.columns, json.loads(bytes(section("data")).decode('utf-8'))))
+            store.names = json.loads(bytes(section("names")).decode('utf-8'))
+            store._all_rows = array('I', range(store.row_count))
+
+            for index_name, target in (("work_type", store.work_type_index),
+                                       ("technician", store.technician_index)):
+                rows = numbers(f"{index_name}.rows", 'I')
+                for key, start, count in json.loads(bytes(section(f"{index_name}.keys")).decode('utf-8')):
+                    target[key] = rows[start:start + count]
+
+            for column in SORTABLE_COLUMNS:
+                if f"sort.{column}.order" in layout:
+                    parsed = [None if v != v else v for v in numbers(f"sort.{column}.parsed", 'd')]
+                    store._sort_orders[column] = (
+                        numbers(f"sort.{column}.order", 'I'),
+                        numbers(f"sort.{column}.rank", 'I'),
+                        parsed
+                    )
+
+        store._build_search_keys()
+        return store
+
+    @classmethod
+    def from_prebuilt(cls, path=PREBUILT_FILE):
+        """Abre el almacén precompilado con mmap (sin leer el archivo a memoria de una vez)"""
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return cls.from_bytes(mapped)
+
+    @classmethod
+    def prebuilt_sources(cls, prebuilt_path):
+        """sha256 de los CSV con que se construyó el almacén precompilado (None si no se puede leer)"""
+        try:
+            with open(prebuilt_path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return cls.read_header(mapped)[0].get('sources', {})
+        except (OSError, ValueError):
+            return None
+
+    @classmethod
+    def prebuilt_matches(cls, prebuilt_path, kpi_path=KPI_FILE, technicians_path=TECHNICIANS_FILE):
+        """
+        Verifica que el almacén precompilado se construyó con los CSV
+        actuales (mismo sha256); si alguno cambió hay que reconstruirlo
+        """
+        sources = cls.prebuilt_sources(prebuilt_path)
+        if sources is None:
+            return False
+
+        for path in (kpi_path, technicians_path):
+            artifact = path and compression.find_artifact(path)
+            if not artifact:
+                continue
+            if sources.get(os.path.basename(path)) != file_sha256(artifact):
+                return False
+        return True
+
+    @classmethod
+    def load_local(cls, prebuilt_path, kpi_path=KPI_FILE, technicians_path=TECHNICIANS_FILE):
+        """Almacén precompilado si corresponde a los CSV locales; si no, se construye de los CSV"""
+        if os.path.exists(prebuilt_path) and cls.prebuilt_matches(prebuilt_path, kpi_path, technicians_path):
+            return cls.from_prebuilt(prebuilt_path)
+        return cls.from_files(kpi_path, technicians_path)
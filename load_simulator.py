@@ -0,0 +1,293 @@
+"""
+Simulador de carga de la flota
+Levanta un servidor HTTP local que imita el enlace corto de OneDrive (1drv.ms),
+su redirección a view.aspx y la descarga por download.aspx, y simula N
+clientes AuthManager descargando el roster al mismo tiempo (inicio de turno).
+Reporta bytes servidos, solicitudes por ruta y estado, el tiempo de servicio
+del servidor y la distribución de latencias de los clientes. Los clientes
+corren como hilos de un mismo proceso, así que su latencia incluye la
+contención de CPU entre ellos (parseo y guardado del caché)
+
+Uso: python load_simulator.py [--clients 200] [--latency-ms 50] [--csv archivo]
+"""
+
+import argparse
+import gzip
+import hashlib
+import os
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROSTER_CSV = os.path.join(BASE_DIR, "usuarios_sistema.csv")
+
+
+class _FleetHTTPServer(ThreadingHTTPServer):
+    # Cola de conexiones amplia: con la cola por defecto (5) las conexiones
+    # simultáneas se reintentan por SYN y la latencia medida sería del kernel
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class OneDriveStandIn:
+    """
+    Servidor local con el comportamiento de OneDrive que usa AuthManager:
+      /1drv.ms/<id>                        -> 301 a /onedrive.live.com/view.aspx?resid=<id>
+      /onedrive.live.com/view.aspx?...     -> página HTML de vista previa
+      /onedrive.live.com/download.aspx?... -> contenido con ETag (304 si coincide)
+    Con compress=True responde con Content-Encoding gzip si el cliente lo acepta
+    """
+
+    def __init__(self, files, latency_ms=0, host="127.0.0.1", port=0, compress=False):
+        self.compress = compress
+        self.files = {}
+        for file_id, data in files.items():
+            self.set_file(file_id, data)
+        self.latency = latency_ms / 1000
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_HEAD(self):
+                stand_in._handle(self, head=True)
+
+            def do_GET(self):
+                stand_in._handle(self, head=False)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = _FleetHTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def share_url(self, file_id):
+        """Enlace corto de compartir, como el que se configura en auth_config.json"""
+        return f"{self.base_url}/1drv.ms/{file_id}"
+
+    def set_file(self, file_id, data):
+        """Publica (o reemplaza) el contenido de un archivo"""
+        gzipped = gzip.compress(data, 6) if self.compress else None
+        self.files[file_id] = (data, '"%s"' % hashlib.sha256(data).hexdigest()[:32], gzipped)
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {
+                'requests': 0,
+                'bytes_sent': 0,
+                'by_route': {},
+                'by_status': {},
+                'service_times': []
+            }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _record(self, route, status, sent, started):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.stats['service_times'].append(elapsed)
+            self.stats['requests'] += 1
+            self.stats['bytes_sent'] += sent
+            self.stats['by_route'][route] = self.stats['by_route'].get(route, 0) + 1
+            self.stats['by_status'][status] = self.stats['by_status'].get(status, 0) + 1
+
+    def _send(self, handler, route, status, body=b"", headers=None, head=False):
+        started = time.perf_counter()
+        handler.send_response(status)
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        if body and not head:
+            handler.wfile.write(body)
+        self._record(route, status, 0 if head else len(body), started)
+
+    def _handle(self, handler, head):
+        if self.latency:
+            time.sleep(self.latency)
+
+        parts = urlsplit(handler.path)
+        query = dict(p.split("=", 1) for p in parts.query.split("&") if "=" in p)
+
+        if parts.path.startswith("/1drv.ms/"):
+            file_id = parts.path.rsplit("/", 1)[-1]
+            location = f"{self.base_url}/onedrive.live.com/view.aspx?resid={file_id}"
+            self._send(handler, "redirect", 301, headers={"Location": location}, head=head)
+            return
+
+        file_id = query.get("resid")
+        if file_id not in self.files:
+            self._send(handler, "not_found", 404, head=head)
+            return
+
+        if parts.path == "/onedrive.live.com/view.aspx":
+            body = b"<html><body>Vista previa de OneDrive</body></html>"
+            self._send(handler, "view", 200, body, {"Content-Type": "text/html"}, head=head)
+        elif parts.path == "/onedrive.live.com/download.aspx":
+            data, etag, gzipped = self.files[file_id]
+            if handler.headers.get("If-None-Match") == etag:
+                self._send(handler, "download", 304, headers={"ETag": etag}, head=head)
+                return
+
+            headers = {"Content-Type": "text/csv; charset=utf-8", "ETag": etag}
+            if gzipped is not None and "gzip" in handler.headers.get("Accept-Encoding", ""):
+                headers["Content-Encoding"] = "gzip"
+                data = gzipped
+            self._send(handler, "download", 200, data, headers, head=head)
+        else:
+            self._send(handler, "not_found", 404, head=head)
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def latency_summary(latencies):
+    """Resumen de latencias en milisegundos"""
+    ms = [value * 1000 for value in latencies]
+    if not ms:
+        return {}
+    return {
+        'count': len(ms),
+        'mean': statistics.fmean(ms),
+        'p50': _percentile(ms, 50),
+        'p90': _percentile(ms, 90),
+        'p99': _percentile(ms, 99),
+        'max': max(ms)
+    }
+
+
+def _run_round(clients, action):
+    """Ejecuta action(client) en todos los clientes a la vez"""
+    barrier = threading.Barrier(len(clients))
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def _client(client):
+        barrier.wait()
+        started = time.perf_counter()
+        try:
+            action(client)
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+            return
+        with lock:
+            latencies.append(time.perf_counter() - started)
+
+    with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+        list(pool.map(_client, clients))
+    return latencies, errors
+
+
+def run_simulation(clients=100, latency_ms=0, csv_path=ROSTER_CSV, verbose=True):
+    """
+    Simula el inicio de turno de `clients` dispositivos en tres rondas:
+      inicial     - sin caché: enlace corto, redirección y descarga completa
+      caché       - caché vigente: no debería haber solicitudes
+      condicional - caché vencido: descarga condicional (304 si no cambió)
+    """
+    from auth_manager import AuthManager
+
+    with open(csv_path, 'rb') as f:
+        data = f.read()
+
+    server = OneDriveStandIn({"roster": data}, latency_ms=latency_ms).start()
+    work_dir = tempfile.mkdtemp(prefix="tablero_fleet_")
+    previous_cwd = os.getcwd()
+    results = {}
+
+    try:
+        # Cada cliente es un dispositivo: su propio caché y su propia URL
+        os.chdir(work_dir)
+        fleet = []
+        for i in range(clients):
+            client = AuthManager()
+            client.csv_url = server.share_url("roster")
+            client.cache_file = os.path.join(work_dir, f"auth_cache_{i}.json")
+            fleet.append(client)
+
+        rounds = {
+            "inicial": lambda c: c._load_permissions(),
+            "caché": lambda c: c._load_permissions(),
+            "condicional": lambda c: c._load_permissions(force_refresh=True),
+        }
+        for name, action in rounds.items():
+            server.reset_stats()
+            latencies, errors = _run_round(fleet, action)
+            server_stats = dict(server.stats)
+            results[name] = {
+                'latency_ms': latency_summary(latencies),
+                'service_ms': latency_summary(server_stats.pop('service_times')),
+                'errors': len(errors),
+                'server': server_stats
+            }
+            if errors and verbose:
+                print(f"[{name}] primer error: {errors[0]}")
+    finally:
+        os.chdir(previous_cwd)
+        server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if verbose:
+        print_report(results, clients, len(data))
+    return results
+
+
+def print_report(results, clients, file_size):
+    print(f"=== Simulación de flota: {clients} clientes, roster de {file_size / 1024:.0f} KB ===")
+    print(f"{'ronda':<12} {'solic.':>7} {'KB servidos':>12} {'p50 ms':>8} {'p90 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'errores':>8}")
+    for name, r in results.items():
+        lat = r['latency_ms']
+        print(f"{name:<12} {r['server']['requests']:>7} {r['server']['bytes_sent'] / 1024:>12,.0f} "
+              f"{lat.get('p50', 0):>8.1f} {lat.get('p90', 0):>8.1f} {lat.get('p99', 0):>8.1f} "
+              f"{lat.get('max', 0):>8.1f} {r['errors']:>8}")
+    for name, r in results.items():
+        service = r['service_ms']
+        if service:
+            print(f"  {name}: servicio p50 {service['p50']:.2f} ms, p99 {service['p99']:.2f} ms")
+        routes = ", ".join(f"{k}={v}" for k, v in sorted(r['server']['by_route'].items()))
+        statuses = ", ".join(f"{k}={v}" for k, v in sorted(r['server']['by_status'].items()))
+        print(f"  {name}: rutas [{routes or '-'}] estados [{statuses or '-'}]")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulador de carga de descargas del roster")
+    parser.add_argument("--clients", type=int, default=100, help="dispositivos simultáneos")
+    parser.add_argument("--latency-ms", type=float, default=0, help="latencia agregada por solicitud")
+    parser.add_argument("--csv", default=ROSTER_CSV, help="CSV servido como roster")
+    args = parser.parse_args(argv)
+
+    run_simulation(args.clients, args.latency_ms, args.csv)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,14 @@ con gestión de autorizaciones mediante CSV en OneDrive
 import os
 os.environ['KIVY_NO_ARGS'] = '1'
 
+from startup_profiler import startup_profiler
+
 from kivymd.app import MDApp
 from kivymd.uix.screen import MDScreen
 from kivymd.uix.screenmanager import MDScreenManager
 from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.textfield import MDTextField
-from kivymd.uix.button import MDRaisedButton, MDIconButton
+from kivymd.uix.button import MDRaisedButton, MDIconButton, MDFlatButton
 from kivymd.uix.label import MDLabel
 from kivymd.uix.card import MDCard
 from kivymd.uix.toolbar import MDTopAppBar
@@ -23,12 +25,18 @@ from kivymd.uix.dialog import MDDialog
 from kivymd.uix.snackbar import Snackbar
 from kivy.clock import Clock
 from kivy.metrics import dp
+from kivy.properties import StringProperty
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.utils import platform
 
-import threading
 from auth_manager import AuthManager
-from powerbi_manager import PowerBIManager
-from config_manager import ConfigManager
+from config_manager import AppConstants, get_config
+from metrics import get_metrics
+from task_executor import get_task_executor
+from utils import get_disk_janitor, get_log_manager
+
+startup_profiler.imports.append(("main (kivy, kivymd, app)", startup_profiler.elapsed_ms()))
 
 
 class LoginScreen(MDScreen):
@@ -125,25 +133,19 @@ class LoginScreen(MDScreen):
 
         self.show_loading(True)
 
-        # Ejecutar autenticación en hilo separado
-        threading.Thread(
-            target=self._authenticate_async,
-            args=(username, password)
-        ).start()
-
-    def _authenticate_async(self, username, password):
-        """Proceso de autenticación asíncrono"""
-        try:
-            success = self.auth_manager.authenticate(username, password)
-            Clock.schedule_once(
-                lambda dt: self._on_auth_complete(success), 0
-            )
-        except Exception as e:
-            Clock.schedule_once(
-                lambda dt: self._on_auth_error(str(e)), 0
-            )
+        # Ejecutar autenticación en el pool compartido; toques repetidos
+        # del mismo usuario reutilizan la tarea en curso. La clave no lleva
+        # la contraseña para no retenerla en el registro de tareas
+        get_task_executor().submit(
+            ("authenticate", username.lower()),
+            self.auth_manager.authenticate,
+            username,
+            password,
+            on_success=lambda success: self._on_auth_complete(success, username),
+            on_error=lambda e: self._on_auth_error(str(e))
+        )
 
-    def _on_auth_complete(self, success):
+    def _on_auth_complete(self, success, username=""):
         """Callback cuando la autenticación se completa"""
         self.show_loading(False)
 
@@ -151,8 +153,24 @@ class LoginScreen(MDScreen):
             # Cambiar a pantalla principal
             app = MDApp.get_running_app()
             app.root.current = "dashboard"
+
+            if self.auth_manager.is_offline():
+                Snackbar(text=f"Sin conexión - {self.auth_manager.get_data_freshness()}").open()
+            else:
+                # Con red: actualizar el snapshot offline en segundo plano
+                get_task_executor().submit(
+                    "offline_snapshot",
+                    self.auth_manager.refresh_offline_snapshot,
+                    get_config().get("app", "cache_timeout", AppConstants.CACHE_TIMEOUT)
+                )
+            return
+
+        remaining = self.auth_manager.get_lockout_remaining(username)
+        if remaining > 0:
+            minutes = max(1, int(remaining // 60) + 1)
+            self.show_error(AppConstants.get_message("too_many_attempts").format(minutes=minutes))
         else:
-            self.show_error("Credenciales inválidas")
+            self.show_error(AppConstants.get_message("invalid_credentials"))
 
     def _on_auth_error(self, error_msg):
         """Callback cuando hay error en autenticación"""
@@ -175,14 +193,316 @@ class LoginScreen(MDScreen):
         ).open()
 
 
+class KpiRow(MDBoxLayout):
+    """Fila de la tabla de KPIs (reutilizada por el RecycleView)"""
+
+    technician = StringProperty("")
+    work_type = StringProperty("")
+    assigned = StringProperty("")
+    effectiveness = StringProperty("")
+    score = StringProperty("")
+
+    COLUMNS = [
+        ("technician", 0.36),
+        ("work_type", 0.24),
+        ("assigned", 0.12),
+        ("effectiveness", 0.14),
+        ("score", 0.14)
+    ]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.orientation = "horizontal"
+        self.size_hint_y = None
+        self.height = dp(40)
+        self.padding = (dp(8), 0)
+        self.spacing = dp(4)
+
+        for name, width in self.COLUMNS:
+            label = MDLabel(
+                text=getattr(self, name),
+                font_style="Caption",
+                size_hint_x=width
+            )
+            self.bind(**{name: label.setter("text")})
+            self.add_widget(label)
+
+
+class KpiTableView(MDBoxLayout):
+    """
+    Tabla de KPIs virtualizada: el RecycleView solo crea widgets para las
+    filas visibles y los reutiliza al desplazarse. Filtrar y ordenar se
+    ejecuta en el pool de tareas contra los índices de KpiStore
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.orientation = "vertical"
+        self.spacing = dp(6)
+        self.padding = dp(8)
+
+        self.store = None
+        self.work_types = [None]
+        self.work_type_pos = 0
+        self.sort_pos = 0
+        self.descending = True
+        self._query_seq = 0
+        self._search_event = None
+
+        self.build_ui()
+
+    def build_ui(self):
+        """Construye filtros, encabezado y lista reciclada"""
+        from kpi_data import SORTABLE_COLUMNS
+
+        self.search_field = MDTextField(
+            hint_text="Buscar técnico (nombre o cédula)",
+            icon_left="magnify",
+            mode="rectangle",
+            size_hint_y=None,
+            height=dp(48)
+        )
+        self.search_field.bind(text=self._on_search_text)
+
+        controls = MDBoxLayout(
+            orientation="horizontal",
+            spacing=dp(6),
+            size_hint_y=None,
+            height=dp(40)
+        )
+        self.work_type_btn = MDRaisedButton(
+            text="Tipo: Todos",
+            on_release=self.cycle_work_type
+        )
+        self.sort_btn = MDRaisedButton(
+            text=f"Orden: {SORTABLE_COLUMNS[0]}",
+            on_release=self.cycle_sort
+        )
+        self.order_btn = MDIconButton(
+            icon="sort-descending",
+            on_release=self.toggle_order
+        )
+        controls.add_widget(self.work_type_btn)
+        controls.add_widget(self.sort_btn)
+        controls.add_widget(self.order_btn)
+
+        self.count_label = MDLabel(
+            text="Cargando KPIs...",
+            font_style="Caption",
+            size_hint_y=None,
+            height=dp(24)
+        )
+
+        header = KpiRow(
+            technician="Técnico",
+            work_type="Tipo",
+            assigned="Asig.",
+            effectiveness="Efect.",
+            score="Nota"
+        )
+
+        # Altura fija por fila: el layout no mide cada fila al desplazarse
+        self.rv = RecycleView(viewclass=KpiRow)
+        rv_layout = RecycleBoxLayout(
+            orientation="vertical",
+            default_size=(None, dp(40)),
+            default_size_hint=(1, None),
+            size_hint_y=None
+        )
+        rv_layout.bind(minimum_height=rv_layout.setter("height"))
+        self.rv.add_widget(rv_layout)
+
+        self.add_widget(self.search_field)
+        self.add_widget(controls)
+        self.add_widget(self.count_label)
+        self.add_widget(header)
+        self.add_widget(self.rv)
+
+    def load(self):
+        """Carga el CSV de KPIs e índices en segundo plano (una sola vez)"""
+        if self.store is not None:
+            return
+
+        get_task_executor().submit(
+            "kpi_load",
+            self._load_store,
+            on_success=self._on_store_loaded,
+            on_error=lambda e: self._set_status(f"Error cargando KPIs: {e}")
+        )
+
+    def reload(self):
+        """Vuelve a cargar los KPIs si ya se habían cargado (refresco automático)"""
+        if self.store is None:
+            return
+
+        get_task_executor().submit(
+            "kpi_load",
+            self._load_store,
+            on_success=self._on_store_loaded,
+            on_error=lambda e: self._set_status(f"Error cargando KPIs: {e}")
+        )
+
+    def _load_store(self):
+        """
+        Abre el almacén precompilado del APK (o lee los CSV locales si
+        cambiaron) o, si no están, el snapshot offline (en el pool)
+        """
+        from kpi_data import KpiStore, KPI_FILE, PREBUILT_FILE
+        from compression import find_artifact
+        from sqlite_store import SqliteKpiStore, get_sqlite_store
+
+        # El APK trae solo el almacén precompilado; los CSV, si están, mandan
+        prebuilt_path = os.path.join(AppConstants.PREBUILT_DIR, PREBUILT_FILE)
+        if find_artifact(KPI_FILE) or os.path.exists(prebuilt_path):
+            db = get_sqlite_store()
+            if db is not None:
+                return SqliteKpiStore.load_local(db, prebuilt_path=prebuilt_path)
+            return KpiStore.load_local(prebuilt_path)
+
+        app = MDApp.get_running_app()
+        snapshot = app.root.get_screen("login").auth_manager.offline_snapshot
+        return KpiStore.from_snapshot(snapshot)
+
+    def _on_store_loaded(self, store):
+        """Callback cuando los KPIs y sus índices están listos"""
+        selected = self.work_types[self.work_type_pos]
+        self.store = store
+        self.work_types = [None] + store.get_work_types()
+
+        # Un refresco puede traer otros tipos: conservar el filtro si sigue existiendo
+        if selected in self.work_types:
+            self.work_type_pos = self.work_types.index(selected)
+        else:
+            self.work_type_pos = 0
+            self.work_type_btn.text = "Tipo: Todos"
+        self.refresh_query()
+
+    def _set_status(self, text):
+        self.count_label.text = text
+
+    def _on_search_text(self, instance, text):
+        """Espera a que el usuario deje de escribir antes de filtrar"""
+        if self._search_event is not None:
+            self._search_event.cancel()
+        self._search_event = Clock.schedule_once(self.refresh_query, 0.3)
+
+    def cycle_work_type(self, instance):
+        """Alterna el filtro de tipo de trabajo"""
+        self.work_type_pos = (self.work_type_pos + 1) % len(self.work_types)
+        work_type = self.work_types[self.work_type_pos]
+        self.work_type_btn.text = f"Tipo: {work_type or 'Todos'}"
+        self.refresh_query()
+
+    def cycle_sort(self, instance):
+        """Alterna la columna de ordenamiento"""
+        from kpi_data import SORTABLE_COLUMNS
+
+        self.sort_pos = (self.sort_pos + 1) % len(SORTABLE_COLUMNS)
+        self.sort_btn.text = f"Orden: {SORTABLE_COLUMNS[self.sort_pos]}"
+        self.refresh_query()
+
+    def toggle_order(self, instance):
+        """Alterna orden ascendente/descendente"""
+        self.descending = not self.descending
+        self.order_btn.icon = "sort-descending" if self.descending else "sort-ascending"
+        self.refresh_query()
+
+    def refresh_query(self, *args):
+        """Lanza la consulta con los filtros actuales fuera del hilo de UI"""
+        if self.store is None:
+            return
+
+        from kpi_data import SORTABLE_COLUMNS
+
+        self._query_seq += 1
+        seq = self._query_seq
+        params = (
+            self.work_types[self.work_type_pos],
+            self.search_field.text.strip(),
+            SORTABLE_COLUMNS[self.sort_pos],
+            self.descending
+        )
+
+        get_task_executor().submit(
+            ("kpi_query",) + params,
+            self._run_query,
+            *params,
+            on_success=lambda rows: self._on_query_done(seq, rows),
+            on_error=lambda e: self._set_status(f"Error filtrando KPIs: {e}")
+        )
+
+    def _run_query(self, work_type, technician, sort_column, descending):
+        """Consulta y prepara los datos de las filas (se ejecuta en el pool)"""
+        row_ids = self.store.query(work_type, technician, sort_column, descending)
+        return self.store.view_rows(row_ids)
+
+    def _on_query_done(self, seq, rows):
+        """Publica el resultado si sigue siendo la consulta más reciente"""
+        if seq != self._query_seq:
+            return
+
+        self.rv.data = rows
+        self.rv.scroll_y = 1
+        self._set_status(f"{len(rows)} registros")
+
+
 class DashboardScreen(MDScreen):
     """Pantalla principal con el tablero Power BI"""
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.name = "dashboard"
+
+        # Importación diferida: solo se necesita tras iniciar sesión
+        from powerbi_manager import PowerBIManager
         self.powerbi_manager = PowerBIManager()
         self.build_ui()
+        self.refresh_scheduler = None
+
+    def _create_refresh_scheduler(self):
+        """Planificador de refresco automático de roster, KPIs y tablero"""
+        from refresh_scheduler import RefreshScheduler, FileChangeCheck
+        from kpi_data import KPI_FILE, TECHNICIANS_FILE
+        from rate_limiter import get_device_id
+
+        auth_manager = self.manager.get_screen("login").auth_manager
+        scheduler = RefreshScheduler.from_config(get_config(), device_id=get_device_id())
+
+        scheduler.add_job(
+            "roster",
+            auth_manager.refresh_if_changed,
+            on_changed=lambda: get_task_executor().submit(
+                "offline_snapshot", auth_manager.refresh_offline_snapshot, 0
+            )
+        )
+        scheduler.add_job(
+            "kpis",
+            FileChangeCheck(*(path + ext for path in (KPI_FILE, TECHNICIANS_FILE)
+                              for ext in ("", ".gz", ".zst"))),
+            on_changed=self.kpi_view.reload
+        )
+        self._dashboard_check = FileChangeCheck(self.powerbi_manager.encrypted_config_file)
+        scheduler.add_job(
+            "dashboard",
+            self._reload_dashboard_config,
+            on_changed=lambda: self.load_dashboard(0)
+        )
+        return scheduler
+
+    def _reload_dashboard_config(self):
+        """Relee la configuración del tablero si cambió (se ejecuta en el pool)"""
+        if not self._dashboard_check():
+            return False
+
+        from powerbi_manager import PowerBIManager
+        self.powerbi_manager = PowerBIManager()
+        return True
+
+    def on_enter(self, *args):
+        """Inicia el refresco automático al entrar al tablero"""
+        if self.refresh_scheduler is None:
+            self.refresh_scheduler = self._create_refresh_scheduler()
+        self.refresh_scheduler.start()
 
     def build_ui(self):
         """Construye la interfaz principal"""
@@ -191,9 +511,11 @@ class DashboardScreen(MDScreen):
 
         # Screen manager para contenido principal
         screen_manager = MDScreenManager()
+        self.content_manager = screen_manager
+        self.nav_layout = nav_layout
 
         # Pantalla del tablero
-        dashboard_screen = MDScreen()
+        dashboard_screen = MDScreen(name="tablero")
 
         # Toolbar
         toolbar = MDTopAppBar(
@@ -224,6 +546,21 @@ class DashboardScreen(MDScreen):
         dashboard_screen.add_widget(main_layout)
         screen_manager.add_widget(dashboard_screen)
 
+        # Pantalla de KPIs (tabla virtualizada)
+        kpi_screen = MDScreen(name="kpis")
+        kpi_toolbar = MDTopAppBar(
+            title="KPIs Técnicos",
+            left_action_items=[["arrow-left", self.show_dashboard]]
+        )
+        self.kpi_view = KpiTableView()
+
+        kpi_layout = MDBoxLayout(orientation="vertical")
+        kpi_layout.add_widget(kpi_toolbar)
+        kpi_layout.add_widget(self.kpi_view)
+
+        kpi_screen.add_widget(kpi_layout)
+        screen_manager.add_widget(kpi_screen)
+
         # Drawer de navegación
         nav_drawer = MDNavigationDrawer()
         nav_drawer_content = MDBoxLayout(
@@ -247,6 +584,13 @@ class DashboardScreen(MDScreen):
             on_release=self.refresh_data
         )
 
+        kpis_btn = MDRaisedButton(
+            text="Ver KPIs",
+            size_hint_y=None,
+            height=dp(40),
+            on_release=self.show_kpis
+        )
+
         settings_btn = MDRaisedButton(
             text="Configuración",
             size_hint_y=None,
@@ -263,6 +607,7 @@ class DashboardScreen(MDScreen):
 
         nav_drawer_content.add_widget(drawer_title)
         nav_drawer_content.add_widget(refresh_btn)
+        nav_drawer_content.add_widget(kpis_btn)
         nav_drawer_content.add_widget(settings_btn)
         nav_drawer_content.add_widget(logout_btn)
 
@@ -279,34 +624,66 @@ class DashboardScreen(MDScreen):
         """Carga el tablero Power BI"""
         self.show_loading_message("Cargando tablero...")
 
-        threading.Thread(target=self._load_dashboard_async).start()
+        get_task_executor().submit(
+            "load_dashboard",
+            self._load_dashboard_async,
+            on_success=self._on_dashboard_loaded,
+            on_error=lambda e: self._on_dashboard_error(str(e))
+        )
 
     def _load_dashboard_async(self):
-        """Carga el tablero de manera asíncrona"""
-        try:
-            dashboard_url = self.powerbi_manager.get_dashboard_url()
-            if dashboard_url:
-                Clock.schedule_once(
-                    lambda dt: self._on_dashboard_loaded(dashboard_url), 0
-                )
-            else:
-                Clock.schedule_once(
-                    lambda dt: self._on_dashboard_error("No se pudo obtener la URL del tablero"), 0
-                )
-        except Exception as e:
-            Clock.schedule_once(
-                lambda dt: self._on_dashboard_error(str(e)), 0
-            )
-
-    def _on_dashboard_loaded(self, dashboard_url):
+        """
+        Carga el tablero de manera asíncrona (se ejecuta en el pool). Sin red
+        se usa la página de embed guardada en el snapshot offline
+        """
+        from offline_snapshot import is_network_available, load_offline_dashboard
+
+        auth_manager = self.manager.get_screen("login").auth_manager
+        online_error = None
+        if not (get_config().get("network", "offline_mode", False) or auth_manager.is_offline()):
+            try:
+                return {'url': self._get_dashboard_url()}
+            except Exception as e:
+                # La conectividad solo se verifica cuando la carga en línea falla
+                if is_network_available():
+                    raise
+                online_error = e
+
+        offline = load_offline_dashboard(auth_manager.offline_snapshot)
+        if offline is not None:
+            offline['freshness'] = auth_manager.get_data_freshness()
+            return offline
+        if online_error is not None:
+            raise online_error
+        return {'url': self._get_dashboard_url()}
+
+    def _get_dashboard_url(self):
+        dashboard_url = self.powerbi_manager.get_dashboard_url()
+        if not dashboard_url:
+            raise ValueError("No se pudo obtener la URL del tablero")
+        return dashboard_url
+
+    def _log_dashboard_access(self, url, success):
+        """Registra el acceso al tablero en la auditoría"""
+        user = self.manager.get_screen("login").auth_manager.get_current_user() or {}
+        get_log_manager().log_powerbi_access(user.get('username', ''), url, success)
+
+    def _on_dashboard_loaded(self, dashboard):
         """Callback cuando el tablero se carga exitosamente"""
+        self._log_dashboard_access(dashboard['url'] or "", True)
         self.dashboard_container.clear_widgets()
 
+        # Offline se abre la página de embed del snapshot (data URL en memoria)
+        url = dashboard['url']
+        if 'page' in dashboard:
+            url = dashboard['page']
+            Snackbar(text=f"Tablero sin conexión - {dashboard['freshness']}").open()
+
         # Crear WebView para mostrar Power BI
         if platform == 'android':
-            self._create_webview_android(dashboard_url)
+            self._create_webview_android(url)
         else:
-            self._create_webview_desktop(dashboard_url)
+            self._create_webview_desktop(url)
 
     def _create_webview_android(self, url):
         """Crea WebView para Android"""
@@ -368,6 +745,7 @@ class DashboardScreen(MDScreen):
 
     def _on_dashboard_error(self, error_msg):
         """Callback cuando hay error cargando el tablero"""
+        self._log_dashboard_access("", False)
         self.show_error(f"Error cargando tablero: {error_msg}")
 
     def show_loading_message(self, message):
@@ -409,21 +787,17 @@ class DashboardScreen(MDScreen):
         """Actualiza los datos de autenticación"""
         self.show_loading_message("Actualizando datos de autorización...")
 
-        threading.Thread(target=self._refresh_data_async).start()
+        get_task_executor().submit(
+            "refresh_permissions",
+            self._refresh_data_async,
+            on_success=self._on_data_refreshed,
+            on_error=lambda e: self.show_error(f"Error actualizando datos: {str(e)}")
+        )
 
     def _refresh_data_async(self):
-        """Actualiza datos de manera asíncrona"""
-        try:
-            auth_manager = AuthManager()
-            success = auth_manager.refresh_permissions()
-
-            Clock.schedule_once(
-                lambda dt: self._on_data_refreshed(success), 0
-            )
-        except Exception as e:
-            Clock.schedule_once(
-                lambda dt: self.show_error(f"Error actualizando datos: {str(e)}"), 0
-            )
+        """Actualiza datos de manera asíncrona (se ejecuta en el pool)"""
+        auth_manager = AuthManager()
+        return auth_manager.refresh_permissions()
 
     def _on_data_refreshed(self, success):
         """Callback cuando los datos se actualizan"""
@@ -433,14 +807,53 @@ class DashboardScreen(MDScreen):
         else:
             self.show_error("No se pudieron actualizar los datos")
 
+    def show_kpis(self, instance):
+        """Muestra la tabla de KPIs"""
+        self.nav_layout.set_state("close")
+        self.content_manager.current = "kpis"
+        self.kpi_view.load()
+
+    def show_dashboard(self, instance):
+        """Vuelve a la vista del tablero"""
+        self.content_manager.current = "tablero"
+
     def show_settings(self, instance):
-        """Muestra configuración"""
-        # Implementar pantalla de configuración
-        pass
+        """Muestra las métricas de rendimiento del dispositivo"""
+        self.nav_layout.set_state("close")
+        self.settings_dialog = MDDialog(
+            title="Rendimiento",
+            text=get_metrics().report(),
+            buttons=[
+                MDFlatButton(text="EXPORTAR", on_release=self.export_metrics),
+                MDFlatButton(text="CERRAR", on_release=lambda x: self.settings_dialog.dismiss())
+            ]
+        )
+        self.settings_dialog.open()
+
+    def export_metrics(self, instance):
+        """Exporta las métricas en JSON (logs/metrics_<dispositivo>_<fecha>.json)"""
+        from datetime import datetime
+        from rate_limiter import get_device_id
+
+        device_id = get_device_id()
+        export_path = os.path.join(
+            "logs", f"metrics_{device_id[:8]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+        if get_metrics().export_json(export_path, device_id=device_id,
+                                     app_version=AppConstants.APP_VERSION):
+            Snackbar(text=f"Métricas exportadas a {export_path}").open()
+        else:
+            self.show_error("No se pudieron exportar las métricas")
 
     def logout(self, instance):
         """Cierra sesión"""
+        # Cancelar descargas pendientes y descartar resultados en curso
+        if self.refresh_scheduler is not None:
+            self.refresh_scheduler.stop()
+        get_task_executor().cancel_all()
+
         app = MDApp.get_running_app()
+        app.root.get_screen("login").auth_manager.logout()
         app.root.current = "login"
 
     def show_error(self, message):
@@ -448,23 +861,172 @@ class DashboardScreen(MDScreen):
         Snackbar(text=message).open()
 
 
+class LazyScreenManager(MDScreenManager):
+    """Screen manager que construye cada pantalla la primera vez que se muestra"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._screen_factories = {}
+
+    def register_factory(self, name, factory):
+        """Registra la función que construye la pantalla `name`"""
+        self._screen_factories[name] = factory
+
+    def ensure_screen(self, name):
+        """Construye la pantalla si aún no existe"""
+        if self.has_screen(name) or name not in self._screen_factories:
+            return
+
+        with startup_profiler.measure(f"{name} (pantalla)"), get_metrics().time(f"screen.{name}.build"):
+            self.add_widget(self._screen_factories[name]())
+
+    def on_current(self, instance, value):
+        if value is not None:
+            self.ensure_screen(value)
+        super().on_current(instance, value)
+
+
 class PowerBIApp(MDApp):
     """Aplicación principal"""
 
     def build(self):
         """Construye la aplicación"""
+        startup_profiler.budget_ms = AppConstants.COLD_START_BUDGET_MS
+        get_metrics().load()
+
         self.theme_cls.theme_style = "Light"
         self.theme_cls.primary_palette = "Blue"
+        get_config().subscribe(self._on_theme_changed, keys=[("ui", "theme"), ("ui", "primary_color")])
+
+        # Screen Manager principal: solo el login se construye al arrancar,
+        # el tablero se construye al navegar a él por primera vez
+        sm = LazyScreenManager()
+        sm.register_factory("login", LoginScreen)
+        sm.register_factory("dashboard", DashboardScreen)
+        sm.ensure_screen("login")
+
+        # Sesión encriptada vigente: se salta el login al reanudar
+        if sm.get_screen("login").auth_manager.restore_session():
+            sm.current = "dashboard"
+
+        # Revisión periódica de expiración (rueda de temporizadores)
+        Clock.schedule_interval(self._check_session, 30)
+
+        # Limpieza de cache/ y logs/ en porciones de pocos ms por tick
+        janitor = get_disk_janitor()
+        janitor.protect(sm.get_screen("login").auth_manager.get_active_files)
+        janitor.start()
+
+        # Copia periódica de la auditoría a SQLite (solo con storage.backend = "sqlite")
+        Clock.schedule_interval(
+            self._schedule_audit_sync,
+            get_config().get("storage", "audit_sync_interval", 300)
+        )
 
-        # Screen Manager principal
-        sm = MDScreenManager()
+        return sm
 
-        # Agregar pantallas
-        sm.add_widget(LoginScreen())
-        sm.add_widget(DashboardScreen())
+    def _on_theme_changed(self, changes):
+        """Aplica el tema configurado (la notificación llega en el hilo que escribió)"""
+        theme = get_config().get_theme_settings()
 
-        return sm
+        def _apply(dt):
+            self.theme_cls.theme_style = theme["theme_style"]
+            self.theme_cls.primary_palette = theme["primary_palette"]
+
+        Clock.schedule_once(_apply, 0)
+
+    def _check_session(self, dt):
+        """Vuelve al login si la sesión expiró"""
+        if self.root.current == "login":
+            return
+
+        if not self.root.get_screen("login").auth_manager.check_session():
+            self._refresh_scheduler_call("stop")
+            get_task_executor().cancel_all()
+            self.root.current = "login"
+            self.root.get_screen("login").show_error(
+                AppConstants.get_message("session_expired")
+            )
+
+    def _refresh_scheduler_call(self, method):
+        """Llama al planificador de refresco si el tablero ya se construyó"""
+        if self.root.has_screen("dashboard"):
+            scheduler = self.root.get_screen("dashboard").refresh_scheduler
+            if scheduler is not None:
+                getattr(scheduler, method)()
+
+    def on_pause(self):
+        """Permite que Android pause la app sin cerrarla"""
+        # Sin refrescos en segundo plano
+        self._refresh_scheduler_call("pause")
+        get_disk_janitor().stop()
+        # Android puede cerrar la app pausada: la copia de la auditoría va al
+        # pool (no frena el hilo de la interfaz; audit.dat ya la conserva) y se
+        # guardan las pilas perfiladas
+        self._schedule_audit_sync(0)
+        self._dump_profile()
+        return True
+
+    def on_resume(self):
+        """Al volver del segundo plano se verifica la sesión"""
+        self._check_session(0)
+        self._refresh_scheduler_call("resume")
+        get_disk_janitor().start()
+
+    def on_start(self):
+        """Registra el tiempo de arranque en frío"""
+        first_frame_ms = startup_profiler.mark_first_frame()
+        get_metrics().observe("app.first_frame", first_frame_ms)
+
+        if get_config().is_debug_enabled() or not startup_profiler.within_budget():
+            print(startup_profiler.report())
+
+    def on_stop(self):
+        """Libera los hilos de trabajo al cerrar la aplicación"""
+        self._refresh_scheduler_call("stop")
+        get_disk_janitor().stop()
+        get_task_executor().shutdown()
+        get_config().flush()
+        get_metrics().save()
+        self._sync_audit()
+        self._dump_profile()
+
+    def _schedule_audit_sync(self, dt):
+        """Copia la auditoría en el pool (una sola copia en curso a la vez)"""
+        if get_config().get("storage", "backend", "files") == "sqlite":
+            get_task_executor().submit("audit_sync", self._sync_audit)
+
+    def _sync_audit(self, flush_timeout=5.0):
+        """Copia la auditoría nueva a SQLite (solo con storage.backend = "sqlite")"""
+        from sqlite_store import get_sqlite_store
+
+        db = get_sqlite_store()
+        if db is None:
+            return
+        log_manager = get_log_manager()
+        if log_manager.audit is not None:
+            # Los registros encolados se escriben en audit.dat antes de copiar
+            log_manager.flush(flush_timeout)
+            try:
+                db.sync_audit(log_manager.audit)
+            except Exception as e:
+                print(f"Error copiando auditoría a SQLite: {e}")
+
+    def _dump_profile(self):
+        """Guarda las pilas del perfilador de depuración (si está instalado)"""
+        if get_config().is_debug_enabled():
+            from debug_profiler import get_profiler
+            profiler = get_profiler()
+            if profiler is not None:
+                path = profiler.dump()
+                if path:
+                    print(f"Perfil guardado en {path}")
 
 
 if __name__ == "__main__":
+    # Modo depuración: perfilado por muestreo de las rutas críticas
+    if get_config().is_debug_enabled():
+        from debug_profiler import install_profiling_hooks
+        install_profiling_hooks(extra=[(PowerBIApp, "build")])
+
     PowerBIApp().run()
@@ -0,0 +1,264 @@
+"""
+Módulo de métricas
+Contadores, indicadores (gauges) e histogramas de latencia con cubetas fijas
+que la app registra sobre sí misma. Se acumulan entre ejecuciones en
+cache/metrics.json y se pueden exportar en JSON para analizar la flota
+"""
+
+import atexit
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from file_utils import atomic_write_json
+
+
+METRICS_FILE = os.path.join("cache", "metrics.json")
+METRICS_VERSION = 1
+
+# Límites superiores de las cubetas en milisegundos (la última es +inf)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class Histogram:
+    """Histograma de cubetas fijas: observar es una búsqueda binaria y un incremento"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        """
+        Percentil aproximado: límite superior de la cubeta que lo contiene
+        (el máximo observado si cae en la última)
+        """
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target and bucket_count:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            'buckets': list(self.buckets),
+            'counts': list(self.counts),
+            'count': self.count,
+            'sum': round(self.total, 3),
+            'max': round(self.max, 3)
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data.get('buckets', LATENCY_BUCKETS_MS))
+        counts = data.get('counts', [])
+        if len(counts) == len(histogram.counts):
+            histogram.counts = [int(c) for c in counts]
+            histogram.count = int(data.get('count', sum(histogram.counts)))
+            histogram.total = float(data.get('sum', 0.0))
+            histogram.max = float(data.get('max', 0.0))
+        return histogram
+
+
+class MetricsRegistry:
+    """Registro de métricas en memoria con persistencia acumulativa"""
+
+    def __init__(self, metrics_file=METRICS_FILE):
+        self.metrics_file = metrics_file
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.runs = 0
+        self.since = None
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def inc(self, name, amount=1):
+        """Incrementa un contador"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauge(self, name, value):
+        """Fija el valor actual de un indicador"""
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name, value_ms):
+        """Registra una latencia (ms) en el histograma `name`"""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value_ms)
+
+    @contextmanager
+    def time(self, name):
+        """Mide un bloque; si lanza una excepción cuenta también `name.errors`"""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.inc(f"{name}.errors")
+            raise
+        finally:
+            self.observe(name, (time.perf_counter() - started) * 1000)
+
+    def snapshot(self):
+        """Copia de todas las métricas como dict serializable"""
+        with self._lock:
+            return {
+                'version': METRICS_VERSION,
+                'since': self.since,
+                'runs': self.runs,
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges),
+                'histograms': {name: h.to_dict() for name, h in self.histograms.items()}
+            }
+
+    def load(self):
+        """
+        Suma las métricas guardadas de ejecuciones anteriores a las de esta.
+        Se llama una vez al arrancar; desde entonces se guardan al salir
+        """
+        if self._loaded:
+            return
+        self._loaded = True
+        atexit.register(self.save)
+
+        data = None
+        try:
+            with open(self.metrics_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        with self._lock:
+            self.runs += 1
+            if not data or data.get('version') != METRICS_VERSION:
+                self.since = datetime.now().isoformat()
+                return
+
+            self.since = data.get('since') or datetime.now().isoformat()
+            self.runs += int(data.get('runs', 0))
+            for name, value in data.get('counters', {}).items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for name, value in data.get('gauges', {}).items():
+                self.gauges.setdefault(name, value)
+            for name, saved in data.get('histograms', {}).items():
+                stored = Histogram.from_dict(saved)
+                current = self.histograms.get(name)
+                if current is not None and current.buckets == stored.buckets:
+                    stored.counts = [a + b for a, b in zip(stored.counts, current.counts)]
+                    stored.count += current.count
+                    stored.total += current.total
+                    stored.max = max(stored.max, current.max)
+                self.histograms[name] = stored
+
+    def save(self):
+        """Guarda las métricas acumuladas (escritura atómica)"""
+        if not self._loaded:
+            self.load()
+        try:
+            os.makedirs(os.path.dirname(self.metrics_file) or ".", exist_ok=True)
+            atomic_write_json(self.metrics_file, self.snapshot(), indent=None)
+            return True
+        except OSError as e:
+            print(f"Error guardando métricas: {e}")
+            return False
+
+    def reset(self):
+        """Descarta las métricas acumuladas"""
+        self.load()
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+            self.runs = 1
+            self.since = datetime.now().isoformat()
+        self.save()
+
+    def export_json(self, export_path, device_id=None, app_version=None):
+        """Exporta las métricas con datos del dispositivo para análisis de flota"""
+        data = self.snapshot()
+        data['exported_at'] = datetime.now().isoformat()
+        data['device_id'] = device_id
+        data['app_version'] = app_version
+        try:
+            atomic_write_json(export_path, data)
+            return True
+        except OSError as e:
+            print(f"Error exportando métricas: {e}")
+            return False
+
+    def report(self):
+        """Resumen en texto (pantalla de configuración)"""
+        data = self.snapshot()
+        lines = [f"Ejecuciones: {data['runs']} (desde {str(data['since'])[:10]})"]
+
+        if data['histograms']:
+            lines.append("")
+            lines.append("Latencias (n / p50 / p95 / máx ms):")
+            for name, saved in sorted(data['histograms'].items()):
+                histogram = Histogram.from_dict(saved)
+                p50 = histogram.percentile(0.5)
+                p95 = histogram.percentile(0.95)
+                lines.append(f"  {name}: {histogram.count} / {p50:g} / {p95:g} / {histogram.max:.1f}")
+
+        if data['counters']:
+            lines.append("")
+            lines.append("Contadores:")
+            for name, value in sorted(data['counters'].items()):
+                lines.append(f"  {name}: {value}")
+
+        if data['gauges']:
+            lines.append("")
+            lines.append("Indicadores:")
+            for name, value in sorted(data['gauges'].items()):
+                lines.append(f"  {name}: {value}")
+
+        return "\n".join(lines)
+
+
+def timed(name, outcome=False):
+    """
+    Decorador que mide la función en el histograma `name`. Con outcome=True
+    cuenta además `name.ok` / `name.fail` según el valor devuelto
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            metrics = get_metrics()
+            with metrics.time(name):
+                result = func(*args, **kwargs)
+            if outcome:
+                metrics.inc(f"{name}.ok" if result else f"{name}.fail")
+            return result
+        return wrapper
+    return decorator
+
+
+# Instancia global del registro (solo persiste si la app llama a load())
+_metrics = MetricsRegistry()
+
+
+def get_metrics():
+    """Obtiene el registro global de métricas"""
+    return _metrics
@@ -0,0 +1,233 @@
+"""
+Módulo de snapshot offline
+Empaqueta roster, KPIs, registro de tableros y páginas de embed en un único
+archivo. Cada entrada se comprime y encripta por separado y el índice va al
+inicio, así que el archivo se abre con mmap y solo se desencripta la
+entrada que se necesita
+"""
+
+import base64
+import json
+import mmap
+import os
+import socket
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+
+import compression
+from file_utils import atomic_write_bytes
+
+
+SNAPSHOT_FILE = os.path.join("cache", "offline_snapshot.bin")
+KPI_FILES = ["KPIs TecnicosTT.csv", "KPIs Tecnicos.csv"]
+
+
+class OfflineSnapshot:
+    """
+    Archivo de snapshot: MAGIC | largo del índice | índice JSON | entradas.
+    El mapeo se abre y se lee bajo un lock: varios hilos del pool leen el
+    mismo snapshot
+    """
+
+    MAGIC = b"TBSNAP01"
+    HEADER_LEN = struct.Struct("<I")
+
+    def __init__(self, path=SNAPSHOT_FILE, fernet_provider=None):
+        self.path = path
+        self._fernet_provider = fernet_provider
+        self._file = None
+        self._map = None
+        self._index = None
+        self._data_start = 0
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def write(self, entries, metadata=None):
+        """Escribe el snapshot completo de forma atómica (entries: nombre -> bytes)"""
+        fernet = self._fernet_provider()
+        blobs = []
+        index_entries = {}
+        offset = 0
+
+        for name, data in entries.items():
+            if isinstance(data, str):
+                data = data.encode('utf-8')
+            blob = fernet.encrypt(zlib.compress(data, 6))
+            index_entries[name] = {
+                'offset': offset,
+                'length': len(blob),
+                'size': len(data)
+            }
+            blobs.append(blob)
+            offset += len(blob)
+
+        index = {
+            'created_at': time.time(),
+            'metadata': metadata or {},
+            'entries': index_entries
+        }
+        index_bytes = json.dumps(index, ensure_ascii=False).encode('utf-8')
+
+        self.close()
+        atomic_write_bytes(
+            self.path,
+            self.MAGIC + self.HEADER_LEN.pack(len(index_bytes)) + index_bytes + b"".join(blobs)
+        )
+        return index
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def open(self):
+        """Mapea el archivo en memoria y lee el índice"""
+        with self._lock:
+            return self._open()
+
+    def _open(self):
+        if self._map is not None:
+            return True
+        if not self.exists():
+            return False
+
+        self._file = open(self.path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._map[:len(self.MAGIC)] != self.MAGIC:
+                raise ValueError("Snapshot offline inválido")
+
+            header_at = len(self.MAGIC)
+            (index_len,) = self.HEADER_LEN.unpack_from(self._map, header_at)
+            index_at = header_at + self.HEADER_LEN.size
+            self._index = json.loads(self._map[index_at:index_at + index_len].decode('utf-8'))
+            self._data_start = index_at + index_len
+        except Exception:
+            self._close()
+            raise
+        return True
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._index = None
+
+    def names(self):
+        with self._lock:
+            return list(self._index['entries']) if self._open() else []
+
+    def read(self, name):
+        """Desencripta y descomprime solo la entrada pedida"""
+        with self._lock:
+            if not self._open():
+                raise FileNotFoundError(self.path)
+
+            entry = self._index['entries'].get(name)
+            if entry is None:
+                raise KeyError(name)
+
+            # El slice copia la entrada: se desencripta fuera del lock
+            start = self._data_start + entry['offset']
+            blob = self._map[start:start + entry['length']]
+        return zlib.decompress(self._fernet_provider().decrypt(blob))
+
+    def read_json(self, name):
+        return json.loads(self.read(name).decode('utf-8'))
+
+    def get_created_at(self):
+        """Fecha de creación del snapshot (timestamp) o None"""
+        try:
+            with self._lock:
+                return self._index['created_at'] if self._open() else None
+        except (OSError, ValueError):
+            return None
+
+    def get_age_seconds(self):
+        created_at = self.get_created_at()
+        return None if created_at is None else max(0.0, time.time() - created_at)
+
+    def get_freshness_text(self):
+        """Texto para mostrar al usuario con la antigüedad de los datos"""
+        created_at = self.get_created_at()
+        if created_at is None:
+            return "Sin datos offline"
+        return f"Datos sin conexión del {datetime.fromtimestamp(created_at).strftime('%d/%m/%Y %H:%M')}"
+
+
+def is_network_available(host="1drv.ms", port=443, timeout=2.0):
+    """Verificación rápida de conectividad (conexión TCP al host de OneDrive)"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def load_offline_dashboard(snapshot):
+    """
+    Tablero guardado en el snapshot: devuelve {'url', 'page', 'title'}, con la
+    página de embed como data URL (no se escribe desencriptada en disco), o
+    None si el snapshot no trae tablero
+    """
+    try:
+        if 'dashboards.json' not in snapshot.names():
+            return None
+        registry = snapshot.read_json('dashboards.json')
+        html = snapshot.read('embed/dashboard.html')
+    except Exception as e:
+        print(f"Error leyendo tablero offline: {e}")
+        return None
+
+    return {
+        'url': registry.get('dashboard_url'),
+        'page': "data:text/html;charset=utf-8;base64," + base64.b64encode(html).decode('ascii'),
+        'title': registry.get('config', {}).get('title', '')
+    }
+
+
+def build_offline_snapshot(auth_manager, path=SNAPSHOT_FILE, kpi_files=KPI_FILES):
+    """
+    Construye el snapshot con el roster ya cargado en auth_manager, los CSV de
+    KPIs locales, el registro de tableros y la página de embed renderizada
+    """
+    from powerbi_manager import PowerBIManager, PowerBIEmbedHelper
+
+    entries = {
+        'roster.json': json.dumps(auth_manager.get_permissions_table(), ensure_ascii=False)
+    }
+
+    for kpi_file in kpi_files:
+        artifact = compression.find_artifact(kpi_file)
+        if artifact:
+            # El snapshot guarda el CSV plano (ya se comprime por entrada)
+            with open(artifact, 'rb') as f:
+                entries[f"kpis/{kpi_file}"] = compression.open_binary(f).read()
+
+    powerbi_manager = PowerBIManager()
+    if powerbi_manager.is_configured():
+        entries['dashboards.json'] = json.dumps({
+            'dashboard_url': powerbi_manager.dashboard_url,
+            'config': powerbi_manager.dashboard_config
+        }, ensure_ascii=False)
+        entries['embed/dashboard.html'] = PowerBIEmbedHelper.create_iframe_html(
+            powerbi_manager.create_mobile_friendly_url()
+        )
+
+    snapshot = OfflineSnapshot(path, fernet_provider=lambda: auth_manager.fernet)
+    return snapshot.write(entries, metadata={'csv_url': auth_manager.csv_url})
@@ -0,0 +1,107 @@
+"""
+Módulo de permisos
+Registro que asigna un bit a cada nombre de permiso. Los permisos de cada
+usuario (texto separado por comas más la expansión de su rol) se compilan
+una vez a un entero, y verificar un permiso es un único AND
+"""
+
+import threading
+
+
+# Bits de admin: todos, incluidos los permisos que se registren después
+ALL_PERMISSIONS = -1
+ADMIN_PERMISSION = "admin"
+
+# Permisos que otorga cada rol además de los de la columna permissions
+ROLE_PERMISSIONS = {
+    "admin": (ADMIN_PERMISSION,),
+    "usuario": ("dashboard",),
+}
+
+
+class PermissionRegistry:
+    """Registro de nombres de permiso -> bit"""
+
+    def __init__(self, role_permissions=None):
+        self.role_permissions = dict(role_permissions or ROLE_PERMISSIONS)
+        self._bits = {}
+        self._names = []
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(name):
+        return str(name).strip().lower()
+
+    def bit(self, name):
+        """Bit del permiso (se registra en el primer uso)"""
+        name = self._normalize(name)
+        bit = self._bits.get(name)
+        if bit is None:
+            with self._lock:
+                bit = self._bits.get(name)
+                if bit is None:
+                    bit = 1 << len(self._names)
+                    self._names.append(name)
+                    self._bits[name] = bit
+        return bit
+
+    def mask(self, names):
+        """Máscara con los permisos indicados (lista o texto separado por comas)"""
+        if isinstance(names, str):
+            names = names.split(",")
+
+        mask = 0
+        for name in names:
+            name = self._normalize(name)
+            if not name:
+                continue
+            if name == ADMIN_PERMISSION:
+                return ALL_PERMISSIONS
+            mask |= self.bit(name)
+        return mask
+
+    def compile(self, permissions, role=None):
+        """
+        Bitset efectivo de un usuario: sus permisos más los de su rol. Se
+        guarda por (permisos, rol), así que un roster con pocas combinaciones
+        distintas se compila casi gratis
+        """
+        key = (permissions if isinstance(permissions, str) else ",".join(permissions or ()),
+               self._normalize(role or ""))
+        mask = self._compiled.get(key)
+        if mask is None:
+            mask = self.mask(key[0]) | self.mask(self.role_permissions.get(key[1], ()))
+            self._compiled[key] = mask
+        return mask
+
+    def names(self, mask):
+        """Nombres de permiso contenidos en la máscara"""
+        if mask == ALL_PERMISSIONS:
+            return [ADMIN_PERMISSION]
+        return [name for name in self._names if mask & self._bits[name]]
+
+    @staticmethod
+    def allows(user_mask, required_mask):
+        return user_mask & required_mask == required_mask
+
+    def filter(self, user_mask, items, key):
+        """
+        Filtra en bloque los elementos (tableros, vistas de KPIs) que el
+        usuario puede ver. key(item) devuelve el permiso o permisos requeridos
+        """
+        allowed = []
+        for item in items:
+            required = self.mask(key(item))
+            if user_mask & required == required:
+                allowed.append(item)
+        return allowed
+
+
+# Instancia global del registro
+_permission_registry = PermissionRegistry()
+
+
+def get_permission_registry():
+    """Obtiene el registro global de permisos"""
+    return _permission_registry
@@ -9,6 +9,8 @@ from datetime import datetime
 from cryptography.fernet import Fernet
 import base64
 
+from metrics import timed
+
 
 class PowerBIManager:
     """Gestor de tableros Power BI"""
@@ -49,6 +51,7 @@ class PowerBIManager:
         except Exception as e:
             print(f"Error cargando configuración Power BI: {e}")
 
+    @timed("powerbi.decrypt_config")
     def _load_encrypted_config(self):
         """Carga configuración encriptada"""
         try:
@@ -0,0 +1,199 @@
+"""
+Precompilación de artefactos de caché sin interfaz
+Lee (o descarga) el roster y los CSV de KPIs, los valida y construye lo que
+cada teléfono construiría en su primer uso: filtro de Bloom de usuarios y
+almacén de KPIs con sus índices (este último en otro proceso, a la vez que
+el filtro). El resultado es un paquete
+que se genera una vez en un servidor (o al compilar el APK) y se copia a los
+dispositivos:
+
+    <salida>/manifest.json                 (hash y usuarios del roster)
+    <salida>/objects/<sha256>.bloom        (formato de ContentStore)
+    <salida>/kpis.bin                      (KpiStore.to_bytes)
+
+El roster en sí (CSV y tabla con los hashes de las cédulas) no se incluye:
+el teléfono lo descarga y lo sella con su propia clave en el primer login
+
+Uso: python prebuild.py --roster usuarios_sistema.csv --out prebuilt
+     python prebuild.py --roster-url https://1drv.ms/...
+
+Si el roster que descarga el teléfono tiene el mismo hash que el del
+paquete, usa su filtro de Bloom en vez de construirlo
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import compression
+from auth_manager import ROSTER_FILTER, read_roster_rows
+from bloom_filter import BloomFilter
+from config_manager import AppConstants
+from content_store import ContentStore, file_sha256
+from file_utils import atomic_write_bytes, atomic_write_json
+from kpi_data import (KPI_FILE, PREBUILT_FILE, TECHNICIANS_FILE, TECHNICIAN_COLUMN,
+                      WORK_TYPE_COLUMN, KpiStore)
+
+
+MANIFEST_FILE = "manifest.json"
+BUNDLE_VERSION = 1
+
+
+def build_kpi_artifact(kpi_path, technicians_path):
+    """
+    Construye el almacén de KPIs con índices y órdenes (en un proceso
+    aparte) y devuelve (bytes, filas, errores de validación)
+    """
+    store = KpiStore.from_files(kpi_path, technicians_path)
+
+    errors = [f"Columna faltante en {kpi_path}: {column}"
+              for column in (TECHNICIAN_COLUMN, WORK_TYPE_COLUMN)
+              if column not in store.data]
+    if errors:
+        return None, store.row_count, errors
+
+    sources = {os.path.basename(kpi_path): file_sha256(compression.find_artifact(kpi_path))}
+    technicians_artifact = technicians_path and compression.find_artifact(technicians_path)
+    if technicians_artifact:
+        sources[os.path.basename(technicians_path)] = file_sha256(technicians_artifact)
+
+    return store.to_bytes(sources=sources), store.row_count, []
+
+
+def fetch_roster(store, roster_path=None, roster_url=None):
+    """Copia el roster (archivo local o URL de OneDrive) al almacén; devuelve su hash"""
+    if roster_url:
+        from auth_manager import AuthManager
+
+        auth_manager = AuthManager()
+        auth_manager.csv_url = roster_url
+        auth_manager.content_store = store
+        return auth_manager._download_csv_data()
+
+    artifact = compression.find_artifact(roster_path)
+    if artifact is None:
+        raise FileNotFoundError(roster_path)
+    with open(artifact, 'rb') as f:
+        content_hash, _ = store.put_stream(f, 'csv')
+    return content_hash
+
+
+def _print_errors(label, errors, limit=10):
+    for error in errors[:limit]:
+        print(f"  {label}: {error}")
+    if len(errors) > limit:
+        print(f"  {label}: ... y {len(errors) - limit} más")
+
+
+def prebuild(out_dir, roster_path=None, roster_url=None, kpi_path=KPI_FILE,
+             technicians_path=TECHNICIANS_FILE, fp_rate=0.01):
+    """
+    Construye el paquete en out_dir. Devuelve el manifiesto, o None si la
+    validación encontró errores que impiden usarlo
+    """
+    started = time.perf_counter()
+    store = ContentStore(os.path.join(out_dir, "objects"))
+
+    # El CSV se lee de un almacén temporal: no debe quedar en el paquete
+    with tempfile.TemporaryDirectory(prefix="prebuild_") as work_dir:
+        work_store = ContentStore(work_dir)
+        content_hash = fetch_roster(work_store, roster_path, roster_url)
+        with compression.open_text(work_store.path(content_hash, 'csv')) as csv_data:
+            rows = read_roster_rows(csv_data)
+
+    from utils import DataValidator
+    roster_ok, roster_errors = DataValidator.validate_roster_rows(rows)
+    _print_errors("roster", roster_errors)
+    if not roster_ok:
+        return None
+
+    # Los KPIs se construyen en otro proceso mientras se arma el filtro
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        kpi_future = None
+        if kpi_path and compression.find_artifact(kpi_path):
+            kpi_future = pool.submit(build_kpi_artifact, kpi_path, technicians_path)
+
+        # El filtro solo necesita los usuarios (mismo criterio que ingest_roster_rows):
+        # no hace falta hashear las cédulas
+        usernames = {nombre.lower() for nombre, cedula in rows if nombre and cedula}
+
+        kpi_result = kpi_future.result() if kpi_future is not None else None
+
+    bloom = BloomFilter.from_items(usernames, fp_rate)
+    store.put_bytes(content_hash, ROSTER_FILTER, bloom.to_bytes())
+
+    manifest = {
+        'version': BUNDLE_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'roster': {
+            'content_hash': content_hash,
+            'source': roster_url or os.path.basename(roster_path),
+            'users': len(usernames),
+            'fp_rate': fp_rate
+        },
+        'kpis': None
+    }
+
+    if kpi_result is not None:
+        kpi_bytes, kpi_rows, kpi_errors = kpi_result
+        _print_errors("kpis", kpi_errors)
+        if kpi_bytes is None:
+            return None
+        atomic_write_bytes(os.path.join(out_dir, PREBUILT_FILE), kpi_bytes)
+        manifest['kpis'] = {
+            'file': PREBUILT_FILE,
+            'rows': kpi_rows,
+            'sources': KpiStore.read_header(kpi_bytes)[0]['sources']
+        }
+
+    manifest['build_seconds'] = round(time.perf_counter() - started, 3)
+    atomic_write_json(os.path.join(out_dir, MANIFEST_FILE), manifest)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompila los artefactos de caché (roster y KPIs)")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--roster", default="usuarios_sistema.csv", help="CSV local del roster (.csv/.gz/.zst)")
+    source.add_argument("--roster-url", help="URL de OneDrive del roster (en lugar de --roster)")
+    parser.add_argument("--kpis", default=KPI_FILE, help="CSV de KPIs por tipo de trabajo ('' para omitir)")
+    parser.add_argument("--technicians", default=TECHNICIANS_FILE, help="CSV de nombres de técnicos")
+    parser.add_argument("--out", default=AppConstants.PREBUILT_DIR,
+                        help="directorio del paquete (el APK incluye prebuilt/)")
+    parser.add_argument("--fp-rate", type=float, default=0.01, help="falsos positivos del filtro de Bloom")
+    args = parser.parse_args(argv)
+    if not 0 < args.fp_rate < 1:
+        parser.error("--fp-rate debe estar entre 0 y 1")
+
+    os.makedirs(args.out, exist_ok=True)
+    try:
+        manifest = prebuild(
+            args.out,
+            roster_path=None if args.roster_url else args.roster,
+            roster_url=args.roster_url,
+            kpi_path=args.kpis or None,
+            technicians_path=args.technicians or None,
+            fp_rate=args.fp_rate
+        )
+    except Exception as e:
+        print(f"Error precompilando artefactos: {e}")
+        return 1
+
+    if manifest is None:
+        print("✗ La validación falló: no se generó el paquete")
+        return 1
+
+    roster = manifest['roster']
+    print(f"✓ Roster {roster['content_hash'][:12]}: {roster['users']} usuarios")
+    if manifest['kpis']:
+        print(f"✓ KPIs: {manifest['kpis']['rows']} filas -> {manifest['kpis']['file']}")
+    print(f"✓ Paquete en {args.out} ({manifest['build_seconds']:.2f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Módulo de limitación de intentos de login
+Ventana deslizante por usuario y dispositivo implementada como anillo de
+marcas de tiempo: cada verificación y cada fallo cuestan O(1). El estado se
+guarda con retardo y sin las claves cuya ventana y bloqueo ya vencieron
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+
+from file_utils import atomic_write_json, atomic_write_text
+
+
+def get_device_id(id_file=os.path.join("cache", "device.id")):
+    """Identificador estable del dispositivo (se genera en el primer uso)"""
+    try:
+        with open(id_file, 'r', encoding='utf-8') as f:
+            device_id = f.read().strip()
+            if device_id:
+                return device_id
+    except OSError:
+        pass
+
+    device_id = uuid.uuid4().hex
+    try:
+        atomic_write_text(id_file, device_id)
+    except OSError:
+        pass
+    return device_id
+
+
+class LoginRateLimiter:
+    """
+    Limitador de intentos fallidos. Para cada (usuario, dispositivo) guarda un
+    anillo con las marcas de tiempo de los últimos max_attempts fallos: si el
+    más antiguo del anillo está dentro de la ventana, hubo max_attempts fallos
+    en la ventana y la clave se bloquea por lockout_seconds
+    """
+
+    def __init__(self, max_attempts=3, window_seconds=300, lockout_seconds=900,
+                 state_file=os.path.join("cache", "login_attempts.json"), save_delay=2.0):
+        self.max_attempts = max(1, int(max_attempts))
+        self.window_seconds = window_seconds
+        self.lockout_seconds = lockout_seconds
+        self.state_file = state_file
+        self.save_delay = save_delay
+        self._lock = threading.Lock()
+        self._state = None
+        self._save_timer = None
+        self._dirty = False
+        atexit.register(self.flush)
+
+    @staticmethod
+    def _key(username, device_id):
+        return f"{username.strip().lower()}|{device_id}"
+
+    def _ensure_loaded(self):
+        """Carga el estado persistido en el primer uso"""
+        if self._state is not None:
+            return
+
+        self._state = {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        now = time.time()
+        for key, entry in saved.items():
+            ring = entry.get('ring', [])
+            # Si cambió max_attempts se reinicia el anillo de esa clave
+            if len(ring) != self.max_attempts:
+                ring = [0.0] * self.max_attempts
+            entry = {
+                'ring': ring,
+                'pos': entry.get('pos', 0) % self.max_attempts,
+                'locked_until': entry.get('locked_until', 0.0)
+            }
+            if not self._expired(entry, now):
+                self._state[key] = entry
+
+    def _expired(self, entry, now):
+        """Sin bloqueo vigente ni fallos dentro de la ventana: la clave sobra"""
+        if entry['locked_until'] > now:
+            return False
+        return not any(t and now - t <= self.window_seconds for t in entry['ring'])
+
+    # ------------------------------------------------------------------
+    # Guardado con retardo
+    # ------------------------------------------------------------------
+
+    def _schedule_save(self):
+        """Agrupa los cambios seguidos en una escritura tras save_delay segundos"""
+        self._dirty = True
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(self.save_delay, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        """Escribe ya el estado pendiente (también se llama al salir)"""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+
+            now = time.time()
+            for key in [k for k, e in self._state.items() if self._expired(e, now)]:
+                del self._state[key]
+            state = {
+                key: {'ring': list(e['ring']), 'pos': e['pos'], 'locked_until': e['locked_until']}
+                for key, e in self._state.items()
+            }
+
+        try:
+            atomic_write_json(self.state_file, state, indent=None)
+        except OSError as e:
+            print(f"Error guardando estado de intentos: {e}")
+
+    def retry_after(self, username, device_id):
+        """Segundos restantes de bloqueo (0 si puede intentar)"""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._state.get(self._key(username, device_id))
+            if entry is None:
+                return 0
+            remaining = entry['locked_until'] - time.time()
+            return remaining if remaining > 0 else 0
+
+    def is_locked(self, username, device_id):
+        """Verifica si el usuario está bloqueado en este dispositivo"""
+        return self.retry_after(username, device_id) > 0
+
+    def record_failure(self, username, device_id):
+        """Registra un intento fallido; devuelve True si quedó bloqueado"""
+        now = time.time()
+        with self._lock:
+            self._ensure_loaded()
+            key = self._key(username, device_id)
+            entry = self._state.get(key)
+            if entry is None:
+                entry = self._state[key] = {
+                    'ring': [0.0] * self.max_attempts,
+                    'pos': 0,
+                    'locked_until': 0.0
+                }
+
+            ring = entry['ring']
+            ring[entry['pos']] = now
+            entry['pos'] = (entry['pos'] + 1) % self.max_attempts
+
+            # La siguiente posición a escribir es el fallo más antiguo del anillo
+            oldest = ring[entry['pos']]
+            locked = bool(oldest) and now - oldest <= self.window_seconds
+            if locked:
+                entry['locked_until'] = now + self.lockout_seconds
+                entry['ring'] = [0.0] * self.max_attempts
+                entry['pos'] = 0
+
+            self._schedule_save()
+
+        # Un bloqueo se guarda enseguida: cerrar la app no debe levantarlo
+        if locked:
+            self.flush()
+        return locked
+
+    def record_success(self, username, device_id):
+        """Limpia los fallos tras un login exitoso"""
+        with self._lock:
+            self._ensure_loaded()
+            if self._state.pop(self._key(username, device_id), None) is not None:
+                self._schedule_save()
@@ -0,0 +1,256 @@
+"""
+Módulo de actualización automática
+Refresca roster, KPIs y tablero cada app.refresh_interval segundos. Si los
+datos no cambian (304 o mismo hash) el intervalo de ese trabajo se duplica
+hasta un máximo; cada dispositivo arranca con un desfase propio y cada ciclo
+lleva un jitter aleatorio para no consultar OneDrive todos al mismo tiempo
+"""
+
+import hashlib
+import os
+import random
+import threading
+import time
+
+from task_executor import get_task_executor
+
+
+def file_signature(path):
+    """Firma barata de un archivo (mtime, tamaño) o None si no existe"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class FileChangeCheck:
+    """Trabajo de refresco que detecta cambios por la firma de los archivos"""
+
+    def __init__(self, *paths):
+        self.paths = paths
+        self._last = self._signature()
+
+    def _signature(self):
+        return tuple(file_signature(path) for path in self.paths)
+
+    def __call__(self):
+        current = self._signature()
+        changed = current != self._last
+        self._last = current
+        return changed
+
+
+class RefreshJob:
+    """Estado de un trabajo de refresco"""
+
+    def __init__(self, name, func, on_changed=None):
+        self.name = name
+        self.func = func
+        self.on_changed = on_changed
+        self.multiplier = 1
+        self.next_run = None
+        self.running = False
+        self.runs = 0
+        self.changes = 0
+        self.errors = 0
+
+
+class RefreshScheduler:
+    """
+    Planificador de refrescos. Cada trabajo es una función sin argumentos que
+    devuelve True si los datos cambiaron; se ejecuta en el pool compartido y
+    on_changed se llama en el hilo de Kivy solo cuando hubo cambios
+    """
+
+    def __init__(self, interval=300, enabled=True, max_backoff=8, jitter=0.1,
+                 device_id=None, tick=5.0, clock=None, executor=None):
+        self.interval = max(1.0, float(interval))
+        self.enabled = enabled
+        self.max_backoff = max(1, int(max_backoff))
+        self.jitter = jitter
+        self.tick = tick
+        self._clock = clock
+        self._executor = executor
+        self._jobs = {}
+        self._event = None
+        self._paused = False
+        self._lock = threading.Lock()
+
+        # Desfase estable por dispositivo dentro de un intervalo (0..1)
+        seed = hashlib.sha256(str(device_id or "").encode()).digest()
+        self.phase = int.from_bytes(seed[:4], "big") / 2 ** 32
+
+    @classmethod
+    def from_config(cls, config, **kwargs):
+        """
+        Crea el planificador con la sección app de la configuración y se
+        suscribe a sus cambios
+        """
+        scheduler = cls(
+            interval=config.get("app", "refresh_interval", 300),
+            enabled=config.get("app", "auto_refresh", True),
+            max_backoff=config.get("app", "max_refresh_backoff", 8),
+            **kwargs
+        )
+        config.subscribe(scheduler._on_config_changed, keys=[
+            ("app", "refresh_interval"),
+            ("app", "auto_refresh"),
+            ("app", "max_refresh_backoff")
+        ])
+        return scheduler
+
+    def _on_config_changed(self, changes):
+        """Aplica cambios de configuración sin reiniciar la app"""
+        for (_, key), (_, value) in changes.items():
+            if key == "refresh_interval":
+                self.interval = max(1.0, float(value))
+            elif key == "max_refresh_backoff":
+                self.max_backoff = max(1, int(value))
+            elif key == "auto_refresh":
+                self.enabled = bool(value)
+
+        if not self.enabled:
+            self.stop()
+
+    def _get_clock(self):
+        if self._clock is None:
+            from kivy.clock import Clock
+            self._clock = Clock
+        return self._clock
+
+    def _get_executor(self):
+        return self._executor if self._executor is not None else get_task_executor()
+
+    def add_job(self, name, func, on_changed=None):
+        """Registra un trabajo de refresco"""
+        with self._lock:
+            self._jobs[name] = RefreshJob(name, func, on_changed)
+
+    def _first_delay(self):
+        # Tras iniciar sesión los datos están recién cargados: el primer
+        # refresco cae entre medio intervalo y uno completo según el dispositivo
+        return self.interval * (0.5 + self.phase / 2)
+
+    def _next_delay(self, job):
+        base = self.interval * job.multiplier
+        return base * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def start(self):
+        """Empieza a planificar refrescos (si app.auto_refresh está activo)"""
+        if not self.enabled or self._event is not None:
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            for job in self._jobs.values():
+                job.multiplier = 1
+                job.next_run = now + self._first_delay()
+                # Si sigue en el pool, el executor agrupa la nueva ejecución con ella
+                job.running = False
+        self._paused = False
+        self._event = self._get_clock().schedule_interval(self._tick, self.tick)
+        return True
+
+    def stop(self):
+        """Detiene el planificador (p. ej. al cerrar sesión)"""
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def pause(self):
+        """Suspende los refrescos mientras la app está en segundo plano"""
+        self._paused = True
+
+    def resume(self):
+        """
+        Reanuda los refrescos; los trabajos vencidos durante la pausa se
+        ejecutan en el siguiente tick
+        """
+        self._paused = False
+
+    def is_running(self):
+        return self._event is not None and not self._paused
+
+    def run_now(self, name=None):
+        """Fuerza el refresco de un trabajo (o de todos) en el siguiente tick"""
+        now = time.monotonic()
+        with self._lock:
+            for job in self._jobs.values():
+                if name is None or job.name == name:
+                    job.next_run = now
+
+    def _tick(self, dt=0):
+        """Lanza los trabajos vencidos que no estén ya en curso"""
+        if self._paused:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            due = [job for job in self._jobs.values()
+                   if not job.running and job.next_run is not None and job.next_run <= now]
+            for job in due:
+                job.running = True
+
+        for job in due:
+            future = self._get_executor().submit(
+                ("refresh", job.name),
+                self._run_job,
+                job,
+                on_success=lambda changed, job=job: self._on_job_done(job, changed)
+            )
+            future.add_done_callback(lambda f, job=job: self._on_job_cancelled(job, f))
+
+    def _run_job(self, job):
+        """Ejecuta el trabajo en el pool y planifica su próxima ejecución"""
+        # La replanificación se hace aquí y no en el callback: si un logout
+        # descarta el resultado, el trabajo no queda detenido
+        try:
+            changed = bool(job.func())
+        except Exception as e:
+            print(f"Error en refresco automático '{job.name}': {e}")
+            changed = None
+
+        with self._lock:
+            job.runs += 1
+            if changed:
+                job.changes += 1
+                job.multiplier = 1
+            else:
+                if changed is None:
+                    job.errors += 1
+                job.multiplier = min(job.multiplier * 2, self.max_backoff)
+            job.next_run = time.monotonic() + self._next_delay(job)
+            job.running = False
+        return changed
+
+    def _on_job_cancelled(self, job, future):
+        """
+        Un cancel_all (logout, sesión vencida) cancela el trabajo antes de que
+        _run_job empiece: se libera y replanifica aquí para que no quede detenido
+        """
+        if not future.cancelled():
+            return
+        with self._lock:
+            job.next_run = time.monotonic() + self._next_delay(job)
+            job.running = False
+
+    def _on_job_done(self, job, changed):
+        """Callback en el hilo principal"""
+        if changed and job.on_changed is not None:
+            job.on_changed()
+
+    def get_stats(self):
+        """Estadísticas por trabajo"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    'runs': job.runs,
+                    'changes': job.changes,
+                    'errors': job.errors,
+                    'multiplier': job.multiplier,
+                    'next_in': None if job.next_run is None else max(0.0, job.next_run - now)
+                }
+                for name, job in self._jobs.items()
+            }
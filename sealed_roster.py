@@ -0,0 +1,112 @@
+"""
+Módulo de roster sellado
+Tabla de permisos encriptada en reposo. Los usuarios se reparten en bloques
+según un HMAC de su nombre con una clave derivada de la del dispositivo; cada
+bloque se comprime y encripta (Fernet) por separado y una tabla de
+desplazamientos de tamaño fijo indica dónde empieza cada uno. Un login
+calcula el bloque del usuario, lo lee con mmap y desencripta solo ese
+bloque. El archivo no revela nombres ni cédulas sin la clave
+"""
+
+import hashlib
+import hmac
+import json
+import mmap
+import struct
+import zlib
+
+
+# Usuarios por bloque: lo que se desencripta en cada login
+USERS_PER_BLOCK = 64
+
+
+def derive_index_key(encryption_key):
+    """Clave del índice (HMAC), distinta de la que encripta los bloques"""
+    return hmac.new(encryption_key, b"roster-index", hashlib.sha256).digest()
+
+
+def block_of(index_key, username, block_count):
+    """Bloque donde se guarda el usuario"""
+    digest = hmac.new(index_key, username.encode('utf-8'), hashlib.sha256).digest()
+    return int.from_bytes(digest[:8], "big") % block_count
+
+
+class SealedRoster:
+    """Archivo: MAGIC | bloques, usuarios | (desplazamiento, largo) por bloque | bloques"""
+
+    MAGIC = b"TBSEAL01"
+    HEADER = struct.Struct("<II")
+    ENTRY = struct.Struct("<QI")
+
+    def __init__(self, path, fernet, index_key):
+        self.path = path
+        self.fernet = fernet
+        self.index_key = index_key
+        self._file = None
+        self._map = None
+        self.block_count = 0
+        self.users = 0
+
+    @classmethod
+    def seal(cls, permissions, fernet, index_key, users_per_block=USERS_PER_BLOCK):
+        """Bytes del roster sellado a partir de la tabla de permisos"""
+        block_count = max(1, -(-len(permissions) // users_per_block))
+        blocks = [{} for _ in range(block_count)]
+        for username, record in permissions.items():
+            blocks[block_of(index_key, username, block_count)][username] = record
+
+        table = []
+        blobs = []
+        offset = 0
+        for block in blocks:
+            data = json.dumps(block, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+            blob = fernet.encrypt(zlib.compress(data, 6))
+            table.append(cls.ENTRY.pack(offset, len(blob)))
+            blobs.append(blob)
+            offset += len(blob)
+
+        header = cls.MAGIC + cls.HEADER.pack(block_count, len(permissions))
+        return header + b"".join(table) + b"".join(blobs)
+
+    def open(self):
+        """Mapea el archivo en memoria y lee la cabecera"""
+        if self._map is not None:
+            return
+        self._file = open(self.path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._map[:len(self.MAGIC)] != self.MAGIC:
+                raise ValueError("Roster sellado inválido")
+            self.block_count, self.users = self.HEADER.unpack_from(self._map, len(self.MAGIC))
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _read_block(self, number):
+        """Desencripta un bloque (Fernet rechaza bloques alterados)"""
+        table_at = len(self.MAGIC) + self.HEADER.size
+        offset, length = self.ENTRY.unpack_from(self._map, table_at + number * self.ENTRY.size)
+        start = table_at + self.block_count * self.ENTRY.size + offset
+        data = zlib.decompress(self.fernet.decrypt(self._map[start:start + length]))
+        return json.loads(data.decode('utf-8'))
+
+    def lookup(self, username):
+        """Registro del usuario o None (desencripta solo su bloque)"""
+        self.open()
+        return self._read_block(block_of(self.index_key, username, self.block_count)).get(username)
+
+    def read_all(self):
+        """Tabla de permisos completa (desencripta todos los bloques)"""
+        self.open()
+        permissions = {}
+        for number in range(self.block_count):
+            permissions.update(self._read_block(number))
+        return permissions
@@ -0,0 +1,200 @@
+"""
+Módulo de gestión de sesiones
+Sesiones con expiración por reloj monotónico, índice token -> sesión en
+memoria y una rueda de temporizadores para expirar sesiones sin recorrer
+todas en cada verificación. La sesión activa se guarda encriptada para
+reanudar la app sin volver a iniciar sesión
+"""
+
+import json
+import os
+import threading
+import time
+
+from file_utils import atomic_write_bytes
+
+
+class Session:
+    """Sesión de usuario"""
+
+    __slots__ = ('token', 'user', 'created_at', 'expires_at', 'deadline')
+
+    def __init__(self, token, user, timeout, created_at=None, expires_at=None):
+        now_wall = time.time()
+        self.token = token
+        self.user = user
+        self.created_at = created_at if created_at is not None else now_wall
+        # Reloj de pared solo para persistir; la verificación usa el monotónico
+        self.expires_at = expires_at if expires_at is not None else now_wall + timeout
+        self.deadline = time.monotonic() + (self.expires_at - now_wall)
+
+    def is_expired(self, now=None):
+        """Verificación O(1) contra el reloj monotónico"""
+        return (now if now is not None else time.monotonic()) >= self.deadline
+
+    def remaining(self):
+        """Segundos de sesión restantes"""
+        return max(0.0, self.deadline - time.monotonic())
+
+
+class TimerWheel:
+    """
+    Rueda de temporizadores: cada ranura agrupa los tokens que vencen en ese
+    intervalo. Avanzar la rueda solo revisa las ranuras ya transcurridas
+    """
+
+    def __init__(self, tick=30.0, slots=256):
+        self.tick = tick
+        self.slots = [dict() for _ in range(slots)]
+        self._slot_of = {}
+        self._current_tick = int(time.monotonic() // tick)
+
+    def schedule(self, token, deadline):
+        """Programa la expiración de un token"""
+        self.cancel(token)
+        deadline_tick = max(int(deadline // self.tick), self._current_tick)
+        slot = deadline_tick % len(self.slots)
+        self.slots[slot][token] = deadline_tick
+        self._slot_of[token] = slot
+
+    def cancel(self, token):
+        """Quita un token de la rueda"""
+        slot = self._slot_of.pop(token, None)
+        if slot is not None:
+            self.slots[slot].pop(token, None)
+
+    def advance(self, now=None):
+        """Avanza hasta `now` y devuelve los tokens vencidos"""
+        now_tick = int((now if now is not None else time.monotonic()) // self.tick)
+        expired = []
+
+        # Si pasó más de una vuelta completa basta con revisar cada ranura una vez
+        last_tick = min(now_tick, self._current_tick + len(self.slots) - 1)
+        for t in range(self._current_tick, last_tick + 1):
+            slot = self.slots[t % len(self.slots)]
+            due = [token for token, deadline_tick in slot.items() if deadline_tick <= now_tick]
+            for token in due:
+                del slot[token]
+                del self._slot_of[token]
+            expired.extend(due)
+
+        self._current_tick = now_tick
+        return expired
+
+
+class SessionManager:
+    """Gestor de sesiones en memoria con persistencia encriptada opcional"""
+
+    def __init__(self, timeout=7200, session_file=os.path.join("cache", "session.dat"),
+                 fernet_provider=None):
+        self.timeout = timeout
+        self.session_file = session_file
+        self._fernet_provider = fernet_provider
+        self._sessions = {}
+        self._wheel = TimerWheel()
+        self._lock = threading.Lock()
+
+    def _new_token(self):
+        from utils import SecurityUtils
+        return SecurityUtils.generate_session_token()
+
+    def _register(self, session):
+        with self._lock:
+            self._sessions[session.token] = session
+            self._wheel.schedule(session.token, session.deadline)
+
+    def create(self, user):
+        """Crea una sesión para el usuario autenticado y la persiste"""
+        session = Session(self._new_token(), dict(user), self.timeout)
+        self._register(session)
+        self._persist(session)
+        return session
+
+    def get(self, token):
+        """Sesión válida para el token, o None si no existe o expiró"""
+        session = self._sessions.get(token)
+        if session is None:
+            return None
+        if session.is_expired():
+            self.end(token)
+            return None
+        return session
+
+    def is_valid(self, token):
+        return self.get(token) is not None
+
+    def end(self, token):
+        """Termina la sesión y borra la copia persistida si es la activa"""
+        with self._lock:
+            session = self._sessions.pop(token, None)
+            if session is not None:
+                self._wheel.cancel(token)
+
+        if session is not None:
+            self._remove_persisted(token)
+        return session is not None
+
+    def expire_due(self):
+        """Expira las sesiones vencidas según la rueda; devuelve sus tokens"""
+        with self._lock:
+            expired = self._wheel.advance()
+            for token in expired:
+                self._sessions.pop(token, None)
+
+        for token in expired:
+            self._remove_persisted(token)
+        return expired
+
+    def _persist(self, session):
+        """Guarda la sesión encriptada para reanudar la app"""
+        if self._fernet_provider is None:
+            return
+        try:
+            payload = json.dumps({
+                'token': session.token,
+                'user': session.user,
+                'created_at': session.created_at,
+                'expires_at': session.expires_at
+            }, ensure_ascii=False).encode()
+            atomic_write_bytes(self.session_file, self._fernet_provider().encrypt(payload))
+        except Exception as e:
+            print(f"Error guardando sesión: {e}")
+
+    def _remove_persisted(self, token):
+        """Borra la sesión persistida si corresponde al token"""
+        if not os.path.exists(self.session_file):
+            return
+        saved = self._read_persisted()
+        if saved is None or saved.get('token') == token:
+            try:
+                os.remove(self.session_file)
+            except OSError:
+                pass
+
+    def _read_persisted(self):
+        if self._fernet_provider is None or not os.path.exists(self.session_file):
+            return None
+        try:
+            with open(self.session_file, 'rb') as f:
+                return json.loads(self._fernet_provider().decrypt(f.read()).decode())
+        except Exception:
+            return None
+
+    def restore(self):
+        """Restaura la sesión persistida si sigue vigente"""
+        saved = self._read_persisted()
+        if saved is None:
+            return None
+
+        # Respetar el timeout configurado aunque la sesión se haya creado con otro
+        expires_at = min(saved['expires_at'], saved['created_at'] + self.timeout)
+        if expires_at <= time.time():
+            self._remove_persisted(saved.get('token'))
+            return None
+
+        session = Session(
+            saved['token'], saved['user'], self.timeout,
+            created_at=saved['created_at'], expires_at=expires_at
+        )
+        self._register(session)
+        return session
@@ -0,0 +1,416 @@
+"""
+Módulo de almacenamiento SQLite (opcional)
+Motor embebido alternativo a los archivos JSON/CSV para el roster, los KPIs
+y la auditoría (storage.backend = "sqlite"). Cada carga es un executemany
+dentro de una sola transacción, la base usa WAL para que las lecturas de
+la interfaz no esperen a un refresco, y las consultas frecuentes (usuario,
+CC_TECNICO, filtros y órdenes de KPIs) usan índices que cubren las
+columnas que leen. Las sentencias son constantes con parámetros, así que
+sqlite3 las compila una vez por conexión y las reutiliza
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import sqlite3
+import threading
+from array import array
+
+import compression
+from content_store import file_sha256
+from kpi_data import (KPI_FILE, TECHNICIANS_FILE, TECHNICIAN_COLUMN,
+                      WORK_TYPE_COLUMN, KpiStore, parse_kpi_value)
+
+
+DB_FILE = os.path.join("cache", "tablero.db")
+SCHEMA_VERSION = 1
+
+# Columna de la tabla kpi para cada columna ordenable de la interfaz
+SORT_COLUMNS = {
+    "Nota Excelencia": "score",
+    "KPI Efectividad": "effectiveness",
+    "OTs Asignadas": "assigned",
+    TECHNICIAN_COLUMN: "cc_value",
+}
+
+# Los vacíos se guardan como +inf: quedan al final en orden ascendente y el
+# índice (tipo, columna) devuelve el orden sin ordenar en memoria
+MISSING = float("inf")
+
+# Índices de la tabla kpi: (tipo, columna) y (columna) cubren el filtro y el
+# orden de la pantalla; (cc, tipo) las búsquedas por CC_TECNICO
+KPI_INDEXES = {
+    **{f"kpi_all_{column}": f"kpi ({column})" for column in SORT_COLUMNS.values()},
+    **{f"kpi_type_{column}": f"kpi (work_type, {column})" for column in SORT_COLUMNS.values()},
+    "kpi_technician": "kpi (cc, work_type)",
+}
+
+KPI_INDEX_SQL = "\n".join(
+    f"CREATE INDEX IF NOT EXISTS {name} ON {target};" for name, target in KPI_INDEXES.items()
+)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS roster (
+    content_hash TEXT NOT NULL,
+    user_key TEXT NOT NULL,
+    record BLOB NOT NULL,
+    PRIMARY KEY (content_hash, user_key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS kpi (
+    row_id INTEGER PRIMARY KEY,
+    cc TEXT NOT NULL,
+    work_type TEXT NOT NULL,
+    score REAL NOT NULL,
+    effectiveness REAL NOT NULL,
+    assigned REAL NOT NULL,
+    cc_value REAL NOT NULL,
+    score_text TEXT NOT NULL,
+    effectiveness_text TEXT NOT NULL,
+    assigned_text TEXT NOT NULL
+);
+{KPI_INDEX_SQL}
+
+CREATE TABLE IF NOT EXISTS technician (
+    cc TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    search_key TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS source (
+    name TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS audit (
+    log_id TEXT NOT NULL,
+    recno INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    user TEXT NOT NULL,
+    action TEXT NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (log_id, recno)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS audit_user_time ON audit (user, timestamp);
+"""
+
+
+def user_key(index_key, username):
+    """Clave del usuario en la tabla roster (HMAC: la base no guarda nombres)"""
+    return hmac.new(index_key, username.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+class SqliteStore:
+    """Base SQLite con una conexión por hilo (WAL: lectores y escritor no se bloquean)"""
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+
+    def connection(self):
+        """Conexión del hilo actual (se abre y configura en el primer uso)"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False, cached_statements=64)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # Con WAL, NORMAL no arriesga la base ante un corte, solo la última transacción
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA temp_store=MEMORY")
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                with self._write_lock, connection:
+                    connection.executescript(SCHEMA)
+                    connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def close(self):
+        """Cierra las conexiones de todos los hilos"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    def _bulk(self, statements):
+        """
+        Ejecuta [(sql, filas)] en una sola transacción: un único commit (y
+        fsync) para toda la carga en lugar de uno por fila
+        """
+        connection = self.connection()
+        with self._write_lock, connection:
+            for sql, rows in statements:
+                if rows is None:
+                    connection.execute(sql)
+                else:
+                    connection.executemany(sql, rows)
+
+    # ------------------------------------------------------------------
+    # Roster (un registro encriptado por usuario)
+    # ------------------------------------------------------------------
+
+    def put_roster(self, content_hash, permissions, fernet, index_key):
+        """Guarda una versión del roster: cada registro encriptado por separado"""
+        rows = [
+            (content_hash, user_key(index_key, username),
+             fernet.encrypt(json.dumps([username, record], ensure_ascii=False).encode('utf-8')))
+            for username, record in permissions.items()
+        ]
+        self._bulk([
+            ("DELETE FROM roster WHERE content_hash = ?", [(content_hash,)]),
+            ("INSERT INTO roster (content_hash, user_key, record) VALUES (?, ?, ?)", rows),
+        ])
+
+    def has_roster(self, content_hash):
+        return self.connection().execute(
+            "SELECT 1 FROM roster WHERE content_hash = ? LIMIT 1", (content_hash,)
+        ).fetchone() is not None
+
+    def lookup_user(self, content_hash, username, fernet, index_key):
+        """Registro del usuario o None: una búsqueda por clave primaria y un descifrado"""
+        row = self.connection().execute(
+            "SELECT record FROM roster WHERE content_hash = ? AND user_key = ?",
+            (content_hash, user_key(index_key, username))
+        ).fetchone()
+        return None if row is None else json.loads(fernet.decrypt(row[0]).decode('utf-8'))[1]
+
+    def read_roster(self, content_hash, fernet):
+        """Tabla de permisos completa de una versión (None si no está)"""
+        rows = self.connection().execute(
+            "SELECT record FROM roster WHERE content_hash = ?", (content_hash,)
+        ).fetchall()
+        if not rows:
+            return None
+        return dict(json.loads(fernet.decrypt(record).decode('utf-8')) for (record,) in rows)
+
+    def delete_roster(self, content_hash):
+        """Borra una versión del roster (p. ej. encriptada con otra clave)"""
+        self._bulk([("DELETE FROM roster WHERE content_hash = ?", [(content_hash,)])])
+
+    def prune_rosters(self, keep):
+        """Borra las versiones del roster cuyo hash no está en keep"""
+        keep = set(keep)
+        stored = [h for (h,) in self.connection().execute("SELECT DISTINCT content_hash FROM roster")]
+        removed = [(h,) for h in stored if h not in keep]
+        if removed:
+            self._bulk([("DELETE FROM roster WHERE content_hash = ?", removed)])
+        return len(removed)
+
+    # ------------------------------------------------------------------
+    # KPIs
+    # ------------------------------------------------------------------
+
+    def kpi_sources(self):
+        return dict(self.connection().execute("SELECT name, sha256 FROM source"))
+
+    def load_kpis(self, store, sources):
+        """
+        Reemplaza la tabla de KPIs con las filas de un KpiStore (ya leído del
+        CSV) en una sola transacción, junto con los hashes de sus fuentes
+        """
+        data = store.data
+        empty = [''] * store.row_count
+        technicians = data[TECHNICIAN_COLUMN]
+        work_types = data.get(WORK_TYPE_COLUMN, empty)
+        score = data.get("Nota Excelencia", empty)
+        effectiveness = data.get("KPI Efectividad", empty)
+        assigned = data.get("OTs Asignadas", empty)
+
+        def number(text):
+            value = parse_kpi_value(text)
+            return MISSING if value is None else value
+
+        rows = (
+            (i, technicians[i], work_types[i], number(score[i]), number(effectiveness[i]),
+             number(assigned[i]), number(technicians[i]), score[i], effectiveness[i], assigned[i])
+            for i in range(store.row_count)
+        )
+        names = (
+            (cc, store.names.get(cc, ''), f"{cc} {store.names.get(cc, '')}".lower())
+            for cc in dict.fromkeys(technicians)
+        )
+        # Los índices se crean después de insertar: ordenar una vez es más
+        # barato que mantenerlos fila por fila
+        self._bulk(
+            [(f"DROP INDEX IF EXISTS {name}", None) for name in KPI_INDEXES]
+            + [
+                ("DELETE FROM kpi", None),
+                ("DELETE FROM technician", None),
+                ("DELETE FROM source", None),
+                ("INSERT INTO kpi VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows),
+                ("INSERT INTO technician (cc, name, search_key) VALUES (?, ?, ?)", names),
+                ("INSERT INTO source (name, sha256) VALUES (?, ?)", sources.items()),
+            ]
+            + [(f"CREATE INDEX {name} ON {target}", None) for name, target in KPI_INDEXES.items()]
+        )
+
+    def rows_for_technician(self, cc):
+        """Filas de un técnico por CC_TECNICO (índice kpi_technician)"""
+        return self.connection().execute(
+            "SELECT row_id, work_type, score_text, effectiveness_text, assigned_text "
+            "FROM kpi WHERE cc = ? ORDER BY work_type", (cc,)
+        ).fetchall()
+
+    # ------------------------------------------------------------------
+    # Auditoría
+    # ------------------------------------------------------------------
+
+    def sync_audit(self, audit_log):
+        """
+        Copia los registros de auditoría nuevos (desde el último copiado). La
+        clave es (archivo, registro): si audit.dat vuelve a empezar, su
+        identidad cambia y se copia desde el principio sin pisar lo anterior
+        """
+        log_id = audit_log.get_log_id()
+        if log_id is None:
+            return 0
+        (last,) = self.connection().execute(
+            "SELECT COALESCE(MAX(recno), -1) FROM audit WHERE log_id = ?", (log_id,)
+        ).fetchone()
+        rows = [
+            (log_id, recno, record['timestamp'], record['user'], record['action'], record['status'])
+            for recno, record in audit_log.iter_records(last + 1)
+        ]
+        if rows:
+            # OR IGNORE: una sincronización simultánea pudo copiar los mismos registros
+            self._bulk([("INSERT OR IGNORE INTO audit VALUES (?, ?, ?, ?, ?, ?)", rows)])
+        return len(rows)
+
+    def query_audit(self, user, start=0.0, end=MISSING):
+        """Registros de un usuario entre dos timestamps (índice audit_user_time)"""
+        return [
+            {'timestamp': timestamp, 'user': user, 'action': action, 'status': status}
+            for timestamp, action, status in self.connection().execute(
+                "SELECT timestamp, action, status FROM audit "
+                "WHERE user = ? AND timestamp BETWEEN ? AND ? ORDER BY timestamp",
+                (str(user).strip().lower(), start, end)
+            )
+        ]
+
+
+class SqliteKpiStore:
+    """
+    Vista de los KPIs en SQLite con la misma interfaz que usa la pantalla
+    de KpiStore (get_work_types, query, view_rows)
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    @classmethod
+    def load_local(cls, db, kpi_path=KPI_FILE, technicians_path=TECHNICIANS_FILE, prebuilt_path=None):
+        """
+        Abre los KPIs de la base; si los CSV cambiaron, los vuelve a cargar.
+        Sin CSV (el APK solo trae el almacén precompilado) se cargan de prebuilt_path
+        """
+        sources = {}
+        for path in (kpi_path, technicians_path):
+            artifact = path and compression.find_artifact(path)
+            if artifact:
+                sources[os.path.basename(path)] = file_sha256(artifact)
+
+        if os.path.basename(kpi_path) in sources:
+            if db.kpi_sources() != sources:
+                db.load_kpis(KpiStore.from_files(kpi_path, technicians_path), sources)
+            return cls(db)
+
+        sources = prebuilt_path and KpiStore.prebuilt_sources(prebuilt_path)
+        if not sources:
+            raise FileNotFoundError(kpi_path)
+        if db.kpi_sources() != sources:
+            db.load_kpis(KpiStore.from_prebuilt(prebuilt_path), sources)
+        return cls(db)
+
+    @property
+    def row_count(self):
+        return self.db.connection().execute("SELECT COUNT(*) FROM kpi").fetchone()[0]
+
+    def get_work_types(self):
+        """Tipos de trabajo disponibles, ordenados"""
+        return [w for (w,) in self.db.connection().execute(
+            "SELECT DISTINCT work_type FROM kpi WHERE work_type != '' ORDER BY work_type"
+        )]
+
+    def query(self, work_type=None, technician=None, sort_column=None, descending=False):
+        """
+        Mismo resultado que KpiStore.query. Con orden, el índice (tipo,
+        columna) entrega las filas ya ordenadas; el orden descendente se
+        invierte aquí para dejar los vacíos al final
+        """
+        column = SORT_COLUMNS.get(sort_column) if sort_column else None
+        if sort_column and column is None:
+            raise KeyError(sort_column)
+
+        technician = (technician or '').strip().lower()
+        where, params = [], []
+        if work_type:
+            where.append("work_type = ?")
+            params.append(work_type)
+        if technician:
+            where.append("cc IN (SELECT cc FROM technician WHERE instr(search_key, ?) > 0)")
+            params.append(technician)
+
+        sql = f"SELECT row_id, {column or 'row_id'} FROM kpi"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {column}, row_id" if column else " ORDER BY row_id"
+        rows = self.db.connection().execute(sql, params).fetchall()
+
+        if column and descending:
+            filled = [row_id for row_id, value in rows if value != MISSING]
+            empty = [row_id for row_id, value in rows if value == MISSING]
+            return array('I', filled[::-1] + empty)
+        return array('I', (row_id for row_id, _ in rows))
+
+    def view_rows(self, row_ids):
+        """Filas listas para el RecycleView, en el orden de row_ids"""
+        connection = self.db.connection()
+        found = {}
+        ids = list(row_ids)
+        # Por bloques: SQLite limita la cantidad de parámetros por sentencia
+        for start in range(0, len(ids), 900):
+            chunk = ids[start:start + 900]
+            found.update(
+                (row[0], row[1:]) for row in connection.execute(
+                    "SELECT k.row_id, COALESCE(NULLIF(t.name, ''), k.cc), k.work_type, "
+                    "k.assigned_text, k.effectiveness_text, k.score_text "
+                    "FROM kpi k LEFT JOIN technician t ON t.cc = k.cc "
+                    f"WHERE k.row_id IN ({','.join('?' * len(chunk))})", chunk
+                )
+            )
+
+        return [
+            {
+                'technician': technician,
+                'work_type': work_type,
+                'assigned': assigned,
+                'effectiveness': effectiveness or '-',
+                'score': score or '-'
+            }
+            for technician, work_type, assigned, effectiveness, score in map(found.__getitem__, ids)
+        ]
+
+
+# Instancia global (solo se abre con storage.backend = "sqlite")
+_sqlite_store = None
+
+
+def get_sqlite_store():
+    """Base SQLite global, o None si el backend configurado son los archivos"""
+    global _sqlite_store
+
+    from config_manager import get_config
+
+    config = get_config()
+    if config.get("storage", "backend", "files") != "sqlite":
+        return None
+    if _sqlite_store is None:
+        _sqlite_store = SqliteStore(config.get("storage", "db_file", DB_FILE))
+    return _sqlite_store
@@ -0,0 +1,127 @@
+"""
+Perfilador de arranque en frío
+Mide tiempos de importación y de construcción de componentes y los
+compara con el presupuesto de arranque de la aplicación
+"""
+
+import importlib
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Registro de tiempos de arranque (importaciones y construcción)"""
+
+    def __init__(self, budget_ms=None):
+        self.start_time = time.perf_counter()
+        self.budget_ms = budget_ms
+        self.imports = []
+        self.constructions = []
+        self.first_frame_ms = None
+
+    def elapsed_ms(self):
+        """Milisegundos transcurridos desde el inicio del perfilado"""
+        return (time.perf_counter() - self.start_time) * 1000
+
+    @contextmanager
+    def measure(self, label, kind="construction"):
+        """Mide el tiempo de un bloque (kind: 'import' o 'construction')"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            target = self.imports if kind == "import" else self.constructions
+            target.append((label, elapsed))
+
+    def time_import(self, module_name):
+        """Importa un módulo midiendo su costo incremental"""
+        already_loaded = module_name in sys.modules
+        with self.measure(module_name, kind="import"):
+            try:
+                importlib.import_module(module_name)
+            except ImportError as e:
+                print(f"⚠️  {module_name} no disponible: {e}")
+        if already_loaded:
+            # Ya estaba importado por un módulo anterior: costo incluido allí
+            label, elapsed = self.imports.pop()
+            self.imports.append((f"{label} (ya cargado)", elapsed))
+
+    def mark_first_frame(self):
+        """Registra el momento en que se muestra el primer frame"""
+        self.first_frame_ms = self.elapsed_ms()
+        return self.first_frame_ms
+
+    def within_budget(self):
+        """Verifica si el arranque cumplió el presupuesto"""
+        if self.budget_ms is None:
+            return True
+        total = self.first_frame_ms if self.first_frame_ms is not None else self.elapsed_ms()
+        return total <= self.budget_ms
+
+    def report(self):
+        """Genera el desglose de tiempos en texto"""
+        lines = ["=== Perfil de arranque en frío ==="]
+
+        lines.append("Importaciones:")
+        for label, elapsed in self.imports:
+            lines.append(f"  {label:<40} {elapsed:9.1f} ms")
+        lines.append(f"  {'TOTAL':<40} {sum(e for _, e in self.imports):9.1f} ms")
+
+        lines.append("Construcción:")
+        for label, elapsed in self.constructions:
+            lines.append(f"  {label:<40} {elapsed:9.1f} ms")
+        lines.append(f"  {'TOTAL':<40} {sum(e for _, e in self.constructions):9.1f} ms")
+
+        total = self.first_frame_ms if self.first_frame_ms is not None else self.elapsed_ms()
+        lines.append(f"Tiempo hasta primer frame: {total:.1f} ms")
+
+        if self.budget_ms is not None:
+            status = "✓ dentro del presupuesto" if self.within_budget() else "✗ EXCEDE el presupuesto"
+            lines.append(f"Presupuesto: {self.budget_ms} ms - {status}")
+
+        return "\n".join(lines)
+
+
+# Instancia global, creada al importar main.py lo antes posible
+startup_profiler = StartupProfiler()
+
+
+def profile_cold_start():
+    """
+    Perfila el arranque sin abrir ventana: importaciones de dependencias y
+    módulos de la app, y construcción de los gestores que usan las pantallas
+    """
+    from config_manager import AppConstants
+
+    profiler = StartupProfiler(budget_ms=AppConstants.COLD_START_BUDGET_MS)
+
+    # Dependencias pesadas primero para separar su costo del de la app
+    for module_name in ["kivy", "kivymd.app", "cryptography.fernet",
+                        "requests", "pandas"]:
+        profiler.time_import(module_name)
+
+    for module_name in ["config_manager", "task_executor", "auth_manager",
+                        "powerbi_manager", "utils"]:
+        profiler.time_import(module_name)
+
+    from auth_manager import AuthManager
+    from powerbi_manager import PowerBIManager
+    from config_manager import ConfigManager
+
+    with profiler.measure("ConfigManager()"):
+        ConfigManager()
+
+    with profiler.measure("AuthManager() (pantalla de login)"):
+        AuthManager()
+
+    with profiler.measure("PowerBIManager() (pantalla de tablero)"):
+        PowerBIManager()
+
+    profiler.mark_first_frame()
+    return profiler
+
+
+if __name__ == "__main__":
+    print(profile_cold_start().report())
@@ -0,0 +1,167 @@
+"""
+Backend tabular liviano
+Lectura y escritura de CSV pequeños (roster, validación, generación) con
+la librería estándar. Se usa automáticamente cuando pandas no está
+instalado, como en el APK de Android
+"""
+
+import csv
+import importlib.util
+import io
+import os
+
+
+# Permite forzar el backend: TABLERO_TABULAR_BACKEND=stdlib|pandas
+BACKEND_ENV_VAR = "TABLERO_TABULAR_BACKEND"
+
+
+def pandas_available():
+    """Verifica si pandas está instalado (sin importarlo)"""
+    return importlib.util.find_spec("pandas") is not None
+
+
+def get_backend():
+    """Obtiene el backend tabular activo: 'pandas' o 'stdlib'"""
+    forced = os.environ.get(BACKEND_ENV_VAR, "").strip().lower()
+    if forced in ("pandas", "stdlib"):
+        if forced == "pandas" and not pandas_available():
+            return "stdlib"
+        return forced
+
+    return "pandas" if pandas_available() else "stdlib"
+
+
+class Table:
+    """Tabla columnar mínima con la parte de la API de DataFrame que usa la app"""
+
+    def __init__(self, columns, data=None):
+        self._columns = [str(c) for c in columns]
+        self._data = {c: list(data.get(c, [])) if data else [] for c in self._columns}
+
+    @classmethod
+    def from_rows(cls, columns, rows):
+        """Construye una tabla a partir de filas (listas de valores)"""
+        table = cls(columns)
+        width = len(table._columns)
+        for row in rows:
+            # Filas cortas se completan con vacío, filas largas se recortan
+            values = list(row[:width]) + [''] * (width - len(row))
+            for column, value in zip(table._columns, values):
+                table._data[column].append(value)
+        return table
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    @columns.setter
+    def columns(self, new_columns):
+        new_columns = [str(c) for c in new_columns]
+        if len(new_columns) != len(self._columns):
+            raise ValueError("Cantidad de columnas no coincide")
+        self._data = {new: self._data[old] for old, new in zip(self._columns, new_columns)}
+        self._columns = new_columns
+
+    def __len__(self):
+        if not self._columns:
+            return 0
+        return len(self._data[self._columns[0]])
+
+    def __getitem__(self, key):
+        if isinstance(key, (list, tuple)):
+            return Table(key, {c: self._data[c] for c in key})
+        return list(self._data[key])
+
+    def iterrows(self):
+        """Itera filas como (índice, dict), compatible con DataFrame.iterrows"""
+        columns = self._columns
+        for index, values in enumerate(zip(*(self._data[c] for c in columns))):
+            yield index, dict(zip(columns, values))
+
+    def to_csv(self, path_or_buf=None, index=False, encoding='utf-8'):
+        """Escribe la tabla como CSV (a archivo o devuelve el texto)"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        writer.writerow(self._columns)
+        writer.writerows(zip(*(self._data[c] for c in self._columns)))
+        text = buffer.getvalue()
+
+        if path_or_buf is None:
+            return text
+        if hasattr(path_or_buf, 'write'):
+            path_or_buf.write(text)
+        else:
+            with open(path_or_buf, 'w', encoding=encoding, newline='') as f:
+                f.write(text)
+        return None
+
+    def to_string(self, index=False):
+        """Representación en texto alineada por columnas"""
+        columns = self._columns
+        cells = [[str(v) for v in self._data[c]] for c in columns]
+        widths = [
+            max([len(c)] + [len(v) for v in col]) for c, col in zip(columns, cells)
+        ]
+        lines = [" ".join(c.rjust(w) for c, w in zip(columns, widths))]
+        for row in zip(*cells):
+            lines.append(" ".join(v.rjust(w) for v, w in zip(row, widths)))
+        return "\n".join(lines)
+
+
+def read_csv(source, backend=None, dtype=None):
+    """
+    Lee un CSV desde una ruta o un archivo abierto (p. ej. StringIO).
+    Devuelve un DataFrame (pandas) o una Table (stdlib, siempre texto)
+    """
+    backend = backend or get_backend()
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding='utf-8-sig', newline='') as f:
+            return read_csv(f, backend, dtype)
+
+    if backend == "pandas":
+        import pandas as pd
+        return pd.read_csv(source, dtype=dtype)
+
+    reader = csv.reader(source)
+    try:
+        header = next(reader)
+    except StopIteration:
+        return Table([])
+
+    rows = [row for row in reader if any(cell.strip() for cell in row)]
+    return Table.from_rows(header, rows)
+
+
+def from_dict(data, backend=None):
+    """Construye una tabla a partir de un dict columna -> lista"""
+    backend = backend or get_backend()
+
+    if backend == "pandas":
+        import pandas as pd
+        return pd.DataFrame(data)
+
+    return Table(list(data.keys()), data)
+
+
+def normalize_columns(table):
+    """Normaliza nombres de columnas: minúsculas, sin espacios ni BOM"""
+    table.columns = [str(c).replace('\ufeff', '').strip().lower() for c in table.columns]
+    return table
+
+
+def is_missing(value):
+    """Equivalente a pd.isna para valores escalares de cualquier backend"""
+    if value is None:
+        return True
+    if isinstance(value, float) and value != value:
+        return True
+    return False
+
+
+def cell_text(row, column):
+    """Valor de una celda como texto sin espacios ('' si falta)"""
+    value = row.get(column)
+    if is_missing(value):
+        return ''
+    return str(value).strip()
@@ -0,0 +1,226 @@
+"""
+Módulo de ejecución de tareas en segundo plano
+Pool acotado de hilos compartido por toda la aplicación, con agrupación
+de tareas idénticas en curso y entrega de resultados en el hilo de Kivy
+"""
+
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskExecutor:
+    """Ejecutor de tareas en segundo plano con agrupación y cancelación"""
+
+    def __init__(self, max_workers=2, scheduler=None):
+        self.max_workers = max_workers
+        self._scheduler = scheduler
+        self._executor = None
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._dropped = weakref.WeakSet()
+        self._generation = 0
+        self.stats = {
+            'submitted': 0,
+            'coalesced': 0,
+            'cancelled': 0
+        }
+
+    def _get_executor(self):
+        """Crea el pool de hilos en el primer uso"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="tablero-worker"
+            )
+        return self._executor
+
+    def _schedule(self, callback, value):
+        """Entrega el resultado en el hilo principal mediante Clock"""
+        if self._scheduler is None:
+            from kivy.clock import Clock
+            self._scheduler = Clock.schedule_once
+
+        self._scheduler(lambda dt: callback(value), 0)
+
+    def submit(self, key, func, *args, on_success=None, on_error=None, **kwargs):
+        """
+        Envía una tarea al pool. Si ya hay una tarea en curso con la misma
+        clave, se reutiliza su future en lugar de lanzar otra.
+        """
+        with self._lock:
+            generation = self._generation
+            future = self._inflight.get(key)
+
+            started = future is None or future.done()
+            if started:
+                future = self._get_executor().submit(func, *args, **kwargs)
+                self._inflight[key] = future
+                self.stats['submitted'] += 1
+            else:
+                self.stats['coalesced'] += 1
+
+        # Fuera del lock: si la tarea ya terminó el callback se ejecuta aquí mismo
+        if started:
+            future.add_done_callback(lambda f: self._release(key, f))
+
+        def _deliver(f):
+            # Resultados de tareas canceladas (p. ej. por logout) se descartan
+            if f.cancelled() or generation != self._generation or f in self._dropped:
+                return
+
+            error = f.exception()
+            if error is not None:
+                if on_error:
+                    self._schedule(on_error, error)
+            elif on_success:
+                self._schedule(on_success, f.result())
+
+        future.add_done_callback(_deliver)
+        return future
+
+    def _release(self, key, future):
+        """Quita la tarea del registro de tareas en curso"""
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def is_running(self, key):
+        """Verifica si hay una tarea en curso con la clave dada"""
+        with self._lock:
+            future = self._inflight.get(key)
+            return future is not None and not future.done()
+
+    def cancel(self, key):
+        """
+        Cancela una tarea por clave. Si ya está en ejecución no se puede
+        interrumpir, pero su resultado se descarta al terminar
+        """
+        with self._lock:
+            future = self._inflight.pop(key, None)
+            if future is None:
+                return False
+            self._dropped.add(future)
+
+        if future.cancel():
+            self.stats['cancelled'] += 1
+            return True
+        return False
+
+    def cancel_all(self):
+        """
+        Cancela todas las tareas pendientes y descarta los resultados de las
+        que ya están en ejecución (no se puede interrumpir un hilo en curso)
+        """
+        with self._lock:
+            self._generation += 1
+            futures = list(self._inflight.values())
+            self._inflight.clear()
+
+        cancelled = 0
+        for future in futures:
+            if future.cancel():
+                cancelled += 1
+
+        self.stats['cancelled'] += cancelled
+        return cancelled
+
+    def shutdown(self, wait=False):
+        """Detiene el pool de hilos"""
+        self.cancel_all()
+
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def get_stats(self):
+        """Obtiene estadísticas del ejecutor"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['inflight'] = sum(1 for f in self._inflight.values() if not f.done())
+        return stats
+
+
+# Instancia global del ejecutor
+_task_executor = None
+_task_executor_lock = threading.Lock()
+
+
+def get_task_executor():
+    """Obtiene instancia global del ejecutor de tareas"""
+    global _task_executor
+
+    if _task_executor is None:
+        with _task_executor_lock:
+            if _task_executor is None:
+                _task_executor = TaskExecutor()
+
+    return _task_executor
+
+
+
+class _FlightCall:
+    """Llamada en curso compartida por SingleFlight"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Deduplicación de llamadas concurrentes: mientras una llamada con una
+    clave está en curso, los demás llamadores esperan su resultado en lugar
+    de repetir el trabajo
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.stats = {
+            'calls': 0,
+            'executions': 0,
+            'coalesced': 0
+        }
+
+    def do(self, key, func, *args, **kwargs):
+        """Ejecuta func una sola vez por clave entre llamadores concurrentes"""
+        with self._lock:
+            self.stats['calls'] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self.stats['coalesced'] += 1
+                leader = False
+            else:
+                call = _FlightCall()
+                self._calls[key] = call
+                self.stats['executions'] += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def get_stats(self):
+        """Obtiene métricas de llamadas agrupadas"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['inflight'] = len(self._calls)
+        return stats
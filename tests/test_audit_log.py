@@ -0,0 +1,92 @@
+"""Pruebas del almacén de auditoría: reapertura y punto de control del índice"""
+import json
+import os
+from datetime import date, datetime
+
+from audit_log import AuditLog
+
+
+DAY = datetime(2024, 3, 5, 10, 0).timestamp()
+
+
+def test_index_is_restored_on_reopen(tmp_path):
+    log = AuditLog(str(tmp_path))
+    log.append("Ana", "login", True, DAY)
+    log.append("luis", "login", False, DAY + 60)
+    log.append("ana", "logout", True, DAY + 86400)
+    log.close()
+
+    reopened = AuditLog(str(tmp_path))
+    assert reopened.get_stats() == {'records': 3, 'users': 2, 'actions': 2, 'days': 2}
+    records = reopened.query(user="ANA")
+    assert [r['action'] for r in records] == ["login", "logout"]
+    assert reopened.count(start=date(2024, 3, 6)) == 1
+    assert os.path.exists(tmp_path / "audit_index.bin")
+
+
+def test_strings_are_appended_not_rewritten(tmp_path):
+    log = AuditLog(str(tmp_path))
+    log.append("ana", "login", True, DAY)
+    log.append("ana", "login", True, DAY + 1)
+    log.append("luis", "login", True, DAY + 2)
+
+    with open(tmp_path / "audit_strings.log", encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    assert lines == [["u", "ana"], ["a", "login"], ["u", "luis"]]
+
+
+def test_truncated_record_is_discarded(tmp_path):
+    log = AuditLog(str(tmp_path))
+    log.append("ana", "login", True, DAY)
+    with open(log.data_file, 'ab') as f:
+        f.write(b"\x00" * 5)
+
+    reopened = AuditLog(str(tmp_path))
+    reopened.append("ana", "logout", True, DAY + 1)
+    assert [r['action'] for r in reopened.query()] == ["login", "logout"]
+
+
+def test_reopen_scans_only_records_after_checkpoint(tmp_path, monkeypatch):
+    log = AuditLog(str(tmp_path))
+    log.append("ana", "login", True, DAY)
+    log.append("luis", "login", True, DAY + 60)
+    log.close()
+    # Cierre abrupto: estos registros no quedan en el punto de control
+    log.append("ana", "logout", True, DAY + 86400)
+
+    scanned = []
+    original = AuditLog._scan_records
+
+    def spy(self, start, total):
+        scanned.append((start, total))
+        return original(self, start, total)
+
+    monkeypatch.setattr(AuditLog, "_scan_records", spy)
+    reopened = AuditLog(str(tmp_path))
+    assert scanned == [(2, 3)]
+    assert [r['action'] for r in reopened.query(user="ana")] == ["login", "logout"]
+    assert reopened.get_stats()['days'] == 2
+
+
+def test_checkpoint_of_another_log_is_ignored(tmp_path):
+    log = AuditLog(str(tmp_path))
+    log.append("ana", "login", True, DAY)
+    log.close()
+    os.remove(log.data_file)
+    os.remove(log.strings_file)
+
+    fresh = AuditLog(str(tmp_path))
+    assert fresh.get_stats()['records'] == 0
+    fresh.append("luis", "login", True, DAY + 5)
+    assert [r['user'] for r in fresh.query()] == ["luis"]
+    assert fresh.query(user="ana") == []
+
+
+def test_long_tail_writes_a_new_checkpoint(tmp_path):
+    log = AuditLog(str(tmp_path), checkpoint_tail=3)
+    for i in range(4):
+        log.append("ana", "login", True, DAY + i)
+
+    AuditLog(str(tmp_path), checkpoint_tail=3)
+    with open(tmp_path / "audit_index.bin", 'rb') as f:
+        assert f.read(8) == AuditLog.INDEX_MAGIC
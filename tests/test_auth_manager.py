@@ -0,0 +1,72 @@
+"""Pruebas de AuthManager: auditoría de login, snapshot offline y filtro de usuarios"""
+import json
+
+import pytest
+
+import auth_manager as auth_module
+from auth_manager import ROSTER_FILTER, AuthManager, ingest_roster_rows
+from bloom_filter import BloomFilter
+
+
+class RecordingLogManager:
+    def __init__(self):
+        self.attempts = []
+
+    def log_auth_attempt(self, username, success, ip_address="unknown"):
+        self.attempts.append((username, success))
+
+
+@pytest.fixture
+def auth_manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return AuthManager()
+
+
+def test_login_attempts_are_audited(auth_manager, monkeypatch):
+    log_manager = RecordingLogManager()
+    monkeypatch.setattr(auth_module, "get_log_manager", lambda: log_manager)
+    monkeypatch.setattr(auth_manager, "_check_credentials",
+                        lambda username, password: password == "1001")
+
+    assert auth_manager.authenticate(" Ana.Perez ", "1001") is True
+    assert auth_manager.authenticate("ana.perez", "9999") is False
+    assert log_manager.attempts == [("ana.perez", True), ("ana.perez", False)]
+
+
+def test_snapshot_refresh_does_not_close_the_shared_instance(auth_manager, monkeypatch):
+    def build(manager, path, version):
+        auth_module.OfflineSnapshot(path, fernet_provider=lambda: manager.fernet).write(
+            {'roster.json': json.dumps({'version': version})}
+        )
+
+    build(auth_manager, auth_manager.offline_snapshot.path, 1)
+    old = auth_manager.offline_snapshot
+    assert old.read_json('roster.json') == {'version': 1}
+
+    auth_manager.data_source = "network"
+    monkeypatch.setattr(auth_module, "build_offline_snapshot",
+                        lambda manager, path: build(manager, path, 2))
+    assert auth_manager.refresh_offline_snapshot(max_age=0) is True
+
+    # Un lector que aún tiene la instancia anterior sigue pudiendo leerla
+    assert old.read_json('roster.json') == {'version': 1}
+    assert auth_manager.offline_snapshot is not old
+    assert auth_manager.offline_snapshot.read_json('roster.json') == {'version': 2}
+    old.close()
+
+
+def test_username_filter_follows_configured_fp_rate(auth_manager):
+    permissions = ingest_roster_rows([("ana.perez", "1001"), ("luis.gomez", "1002")])
+    content_hash = "cd" * 32
+    auth_manager._put_permissions(content_hash, permissions)
+    auth_manager._activate_roster(content_hash, permissions)
+    assert auth_manager._load_username_filter(content_hash).fp_rate == 0.01
+
+    # Otro arranque con una tasa distinta: el filtro guardado se reconstruye
+    restarted = AuthManager()
+    restarted.username_filter_fp_rate = 0.001
+    assert restarted._is_unknown_user("nadie") is True
+    assert restarted._is_unknown_user("ana.perez") is False
+
+    stored = BloomFilter.from_bytes(restarted.content_store.get_bytes(content_hash, ROSTER_FILTER))
+    assert stored.fp_rate == 0.001
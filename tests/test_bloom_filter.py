@@ -0,0 +1,32 @@
+"""Pruebas del filtro de Bloom: pertenencia, serialización y tasa válida"""
+import math
+
+import pytest
+
+from bloom_filter import BloomFilter, clamp_fp_rate, DEFAULT_FP_RATE, MAX_FP_RATE, MIN_FP_RATE
+
+
+def test_members_are_found_after_round_trip():
+    users = [f"user{i}" for i in range(500)]
+    bloom = BloomFilter.from_bytes(BloomFilter.from_items(users, 0.01).to_bytes())
+    assert all(user in bloom for user in users)
+    assert sum(f"otro{i}" in bloom for i in range(5000)) < 150
+
+
+@pytest.mark.parametrize("fp_rate", [0, 1, -0.1, 1.5, math.nan])
+def test_invalid_fp_rate_is_rejected(fp_rate):
+    with pytest.raises(ValueError):
+        BloomFilter(10, fp_rate)
+
+
+@pytest.mark.parametrize("value, expected", [
+    (0.05, 0.05),
+    (0, DEFAULT_FP_RATE),
+    (1, DEFAULT_FP_RATE),
+    ("x", DEFAULT_FP_RATE),
+    (None, DEFAULT_FP_RATE),
+    (0.9, MAX_FP_RATE),
+    (1e-12, MIN_FP_RATE),
+])
+def test_config_value_is_clamped(value, expected):
+    assert clamp_fp_rate(value) == expected
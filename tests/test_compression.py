@@ -0,0 +1,70 @@
+"""Pruebas de artefactos comprimidos: ida y vuelta gz/zst y prioridad de find_artifact"""
+import gzip
+import io
+
+import pytest
+
+import compression
+from compression import find_artifact, open_binary, open_text
+
+
+CSV_TEXT = "\ufeffUsuario,Cedula\nana.pérez,1001\n"
+
+
+def read_text(path):
+    with open_text(str(path)) as f:
+        return f.read()
+
+
+def test_plain_csv_is_read_as_is(tmp_path):
+    path = tmp_path / "roster.csv"
+    path.write_bytes(CSV_TEXT.encode('utf-8'))
+    assert read_text(path) == CSV_TEXT.lstrip("\ufeff")
+
+
+def test_gzip_round_trip(tmp_path):
+    path = tmp_path / "roster.csv.gz"
+    path.write_bytes(gzip.compress(CSV_TEXT.encode('utf-8')))
+    assert read_text(path) == CSV_TEXT.lstrip("\ufeff")
+
+
+def test_zstd_round_trip(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "roster.csv.zst"
+    path.write_bytes(zstandard.ZstdCompressor().compress(CSV_TEXT.encode('utf-8')))
+    assert read_text(path) == CSV_TEXT.lstrip("\ufeff")
+
+
+def test_format_comes_from_signature_not_extension(tmp_path):
+    # Un .gz servido con Content-Encoding gzip llega ya descomprimido
+    path = tmp_path / "roster.csv.gz"
+    path.write_bytes(CSV_TEXT.encode('utf-8'))
+    assert read_text(path) == CSV_TEXT.lstrip("\ufeff")
+    assert compression.detect(gzip.compress(b"x")[:4]) == "gzip"
+
+
+def test_zstd_without_library_is_rejected(monkeypatch):
+    monkeypatch.setattr(compression, "zstd_available", lambda: False)
+    with pytest.raises(ValueError):
+        open_binary(io.BytesIO(compression.ZSTD_MAGIC + b"\x00" * 8))
+
+
+def test_find_artifact_priority(tmp_path, monkeypatch):
+    base = tmp_path / "kpis.csv"
+    assert find_artifact(str(base)) is None
+
+    monkeypatch.setattr(compression, "zstd_available", lambda: True)
+    (tmp_path / "kpis.csv.zst").write_bytes(b"")
+    assert find_artifact(str(base)) == str(base) + ".zst"
+
+    (tmp_path / "kpis.csv.gz").write_bytes(b"")
+    assert find_artifact(str(base)) == str(base) + ".gz"
+
+    base.write_bytes(b"")
+    assert find_artifact(str(base)) == str(base)
+
+
+def test_zst_artifact_is_skipped_without_library(tmp_path, monkeypatch):
+    monkeypatch.setattr(compression, "zstd_available", lambda: False)
+    (tmp_path / "kpis.csv.zst").write_bytes(b"")
+    assert find_artifact(str(tmp_path / "kpis.csv")) is None
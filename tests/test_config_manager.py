@@ -0,0 +1,51 @@
+"""Pruebas del gestor de configuración: vistas de solo lectura y copia en escritura"""
+import json
+
+import pytest
+
+from config_manager import ConfigManager
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = ConfigManager(save_delay=60)
+    yield manager
+    # Sin escrituras pendientes al salir (atexit llama a flush)
+    if manager._save_timer is not None:
+        manager._save_timer.cancel()
+    manager._dirty = False
+
+
+def test_readers_get_read_only_views(config):
+    with pytest.raises(TypeError):
+        config.get("security")["max_login_attempts"] = 99
+    with pytest.raises(TypeError):
+        config.snapshot()["app"] = {}
+    with pytest.raises(TypeError):
+        config.config["network"]["timeout"] = 1
+    assert config.get("security", "max_login_attempts") == 3
+
+
+def test_snapshot_survives_later_writes(config):
+    before = config.snapshot()
+    config.set("app", "refresh_interval", 42)
+    assert before["app"]["refresh_interval"] != 42
+    assert config.get("app", "refresh_interval") == 42
+
+
+def test_views_can_be_written_back_and_saved(config):
+    config.set_section("network", config.get("network"))
+    config.set("ui", "extra", config.get("security"))
+    config.flush()
+    with open(config.config_file, encoding='utf-8') as f:
+        saved = json.load(f)
+    assert saved["ui"]["extra"]["max_login_attempts"] == 3
+
+
+def test_subscribers_receive_only_changed_keys(config):
+    seen = []
+    config.subscribe(seen.append, keys=[("app", "refresh_interval")])
+    config.set("ui", "theme", "Dark")
+    config.set("app", "refresh_interval", 10)
+    assert seen == [{("app", "refresh_interval"): (300, 10)}]
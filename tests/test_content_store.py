@@ -0,0 +1,147 @@
+"""Pruebas del almacén por contenido y del roster: ingesta única, poda y reversión"""
+import hashlib
+import io
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from auth_manager import AuthManager
+from content_store import ContentStore, file_sha256
+
+
+def test_put_stream_hashes_while_copying(tmp_path):
+    store = ContentStore(str(tmp_path / "objects"))
+    data = b"Cedula,Nombre\n" * 10000
+
+    digest, size = store.put_stream(io.BytesIO(data), 'csv', chunk_size=1024)
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert size == len(data)
+    assert file_sha256(store.path(digest, 'csv')) == digest
+
+    # El mismo contenido no crea otro objeto ni deja temporales
+    assert store.put_stream(io.BytesIO(data), 'csv') == (digest, size)
+    assert os.listdir(store.root) == [f"{digest}.csv"]
+
+
+def test_fallback_root_is_read_only_source(tmp_path):
+    fallback = tmp_path / "prebuilt"
+    fallback.mkdir()
+    (fallback / "abc.bloom").write_bytes(b"apk")
+    store = ContentStore(str(tmp_path / "objects"), fallback_roots=[str(fallback)])
+
+    assert store.get_bytes("abc", 'bloom') == b"apk"
+    store.put_bytes("abc", 'bloom', b"local")
+    assert store.get_bytes("abc", 'bloom') == b"local"
+    assert store.prune(keep=[]) == 1
+    assert (fallback / "abc.bloom").read_bytes() == b"apk"
+
+
+def test_prune_keeps_listed_hashes_and_temp_files(tmp_path):
+    store = ContentStore(str(tmp_path / "objects"))
+    store.put_bytes("a" * 64, 'sealed', b"1")
+    store.put_bytes("a" * 64, 'bloom', b"2")
+    store.put_bytes("b" * 64, 'sealed', b"3")
+    (tmp_path / "objects" / "descarga.tmp").write_bytes(b"")
+
+    assert store.prune(keep={"a" * 64}) == 1
+    assert sorted(os.listdir(store.root)) == sorted(
+        [f"{'a' * 64}.sealed", f"{'a' * 64}.bloom", "descarga.tmp"]
+    )
+
+
+class RosterServer:
+    """Sirve el CSV del roster; el contenido se cambia con set_body"""
+
+    def __init__(self):
+        self.body = b""
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(server.body)))
+                self.end_headers()
+                self.wfile.write(server.body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/roster.csv"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def set_body(self, text):
+        self.body = text.encode('utf-8')
+
+
+@pytest.fixture
+def server():
+    server = RosterServer()
+    yield server
+    server.httpd.shutdown()
+
+
+@pytest.fixture
+def auth_manager(tmp_path, monkeypatch, server):
+    monkeypatch.chdir(tmp_path)
+    manager = AuthManager()
+    manager.csv_url = server.url
+    ingested = []
+    original = manager._ingest_roster
+
+    def counting_ingest(content_hash):
+        ingested.append(content_hash)
+        return original(content_hash)
+
+    monkeypatch.setattr(manager, "_ingest_roster", counting_ingest)
+    manager.ingested = ingested
+    return manager
+
+
+V1 = "Cedula,Nombre\n1001,ana.perez\n"
+V2 = "Cedula,Nombre\n1001,ana.perez\n1002,luis.gomez\n"
+
+
+def test_unchanged_roster_is_not_ingested_again(auth_manager, server):
+    server.set_body(V1)
+    first = auth_manager._fetch_permissions()
+    assert first['changed'] is True
+    assert len(auth_manager.ingested) == 1
+
+    second = auth_manager._fetch_permissions()
+    assert second['changed'] is False
+    assert second['content_hash'] == first['content_hash']
+    assert len(auth_manager.ingested) == 1
+    # El CSV con cédulas en claro no queda en el almacén
+    assert not auth_manager.content_store.has(first['content_hash'], 'csv')
+
+
+def test_reverted_roster_reuses_the_stored_version(auth_manager, server):
+    server.set_body(V1)
+    v1 = auth_manager._fetch_permissions()['content_hash']
+    server.set_body(V2)
+    v2 = auth_manager._fetch_permissions()['content_hash']
+    server.set_body(V1)
+    again = auth_manager._fetch_permissions()
+
+    assert again['content_hash'] == v1 and again['changed'] is True
+    assert auth_manager.ingested == [v1, v2]
+    assert [entry['content_hash'] for entry in auth_manager.get_roster_history()] == [v1, v2]
+
+
+def test_rollback_switches_hash_without_download(auth_manager, server):
+    server.set_body(V1)
+    v1 = auth_manager._fetch_permissions()['content_hash']
+    server.set_body(V2)
+    auth_manager._fetch_permissions()
+    requests = server.requests
+
+    assert auth_manager.rollback_roster() is True
+    assert auth_manager.roster_hash == v1
+    assert set(auth_manager.permissions_cache) == {"ana.perez"}
+    assert server.requests == requests
+    assert len(auth_manager.ingested) == 2
@@ -0,0 +1,94 @@
+"""Pruebas del limpiador de disco: antigüedad, presupuesto LRU y archivos protegidos"""
+import os
+import time
+
+import utils
+from auth_manager import AuthManager, ingest_roster_rows
+from utils import DiskJanitor
+
+
+DAY = 86400
+
+
+def make_file(path, size=1024, age_days=0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    used = time.time() - age_days * DAY
+    os.utime(path, (used, used))
+    return path
+
+
+def make_janitor(tmp_path, **kwargs):
+    return DiskJanitor(roots=(str(tmp_path / "cache"), str(tmp_path / "logs")), **kwargs)
+
+
+def test_old_files_are_removed(tmp_path):
+    old = make_file(tmp_path / "cache" / "viejo.json", age_days=40)
+    recent = make_file(tmp_path / "logs" / "app.log", age_days=1)
+
+    cycle = make_janitor(tmp_path, max_age_days=30).run()
+    assert not old.exists()
+    assert recent.exists()
+    assert cycle['files'] == 2 and cycle['removed'] == 1
+
+
+def test_size_budget_evicts_least_recently_used(tmp_path):
+    files = [make_file(tmp_path / "cache" / "objects" / f"{i}.bin", size=400 * 1024, age_days=5 - i)
+             for i in range(5)]
+
+    make_janitor(tmp_path, max_total_mb=1).run()
+    assert [f.exists() for f in files] == [False, False, False, True, True]
+
+
+def test_protected_names_temp_files_and_providers_are_kept(tmp_path):
+    kept = [
+        make_file(tmp_path / "cache" / "session.dat", age_days=90),
+        make_file(tmp_path / "logs" / "audit.dat", age_days=90),
+        make_file(tmp_path / "cache" / "objects" / "descarga.tmp", age_days=90),
+        make_file(tmp_path / "logs" / "app_actual.log", age_days=90),
+    ]
+    janitor = make_janitor(tmp_path, max_age_days=1)
+    janitor.protect(lambda: [str(kept[-1])])
+    janitor.run()
+    assert all(f.exists() for f in kept)
+
+
+def test_each_step_does_one_unit_of_work(tmp_path, monkeypatch):
+    for i in range(20):
+        make_file(tmp_path / "cache" / f"{i}.json", age_days=40)
+
+    # Reloj que avanza 1 ms por lectura: un paso de 1.5 ms hace una sola operación
+    ticks = iter(range(10 ** 6))
+    monkeypatch.setattr(utils.time, "perf_counter", lambda: next(ticks) / 1000)
+    janitor = make_janitor(tmp_path, max_age_days=30)
+    janitor.begin()
+    steps = 1
+    while not janitor.step(slice_ms=1.5):
+        steps += 1
+    assert steps > 40
+    assert janitor.last_cycle['removed'] == 20
+
+
+def test_roster_history_survives_eviction(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = AuthManager()
+    versions = []
+    for rows in ([("ana.perez", "1001")], [("ana.perez", "1001"), ("luis.gomez", "1002")]):
+        permissions = ingest_roster_rows(rows)
+        content_hash = f"{len(rows):064x}"
+        manager._put_permissions(content_hash, permissions)
+        manager._activate_roster(content_hash, permissions)
+        versions.append(content_hash)
+    stale = make_file(tmp_path / "cache" / "objects" / f"{'e' * 64}.sealed", age_days=1)
+    for entry in os.scandir(tmp_path / "cache" / "objects"):
+        os.utime(entry.path, (time.time() - 90 * DAY,) * 2)
+
+    # Otro arranque: el historial todavía no se cargó en memoria
+    restarted = AuthManager()
+    janitor = DiskJanitor(roots=("cache",), max_age_days=30)
+    janitor.protect(restarted.get_active_files)
+    janitor.run()
+
+    assert not stale.exists()
+    assert restarted.rollback_roster(versions[0]) is True
+    assert set(restarted.permissions_cache) == {"ana.perez"}
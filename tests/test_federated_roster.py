@@ -0,0 +1,84 @@
+"""Pruebas del roster federado: fuente lenta, sin reenvíos y sin podar su descarga"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import auth_manager as auth_module
+from auth_manager import AuthManager
+
+
+MAIN_CSV = "Cedula,Nombre\n1001,ana.perez\n1002,luis.gomez\n".encode('utf-8')
+CONTRACTOR_CSV = "Cedula,Nombre\n2001,eva.ruiz\n".encode('utf-8')
+
+
+class RosterServer:
+    """Servidor con una fuente rápida y otra que espera a release"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.requests = {"/main.csv": 0, "/contratistas.csv": 0}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests[self.path] += 1
+                if self.path == "/contratistas.csv":
+                    server.release.wait(10)
+                    body = CONTRACTOR_CSV
+                else:
+                    body = MAIN_CSV
+                self.send_response(200)
+                self.send_header("ETag", f'"{len(body)}"')
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.httpd.server_port}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.release.set()
+        self.httpd.shutdown()
+
+
+@pytest.fixture
+def server():
+    server = RosterServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def auth_manager(tmp_path, monkeypatch, server):
+    monkeypatch.chdir(tmp_path)
+    manager = AuthManager()
+    manager.csv_url = f"{server.base}/main.csv"
+    manager.csv_sources = [{'name': 'contratistas', 'url': f"{server.base}/contratistas.csv"}]
+    manager.source_timeout = 0.3
+    return manager
+
+
+def test_slow_source_is_not_resubmitted_or_pruned(auth_manager, server):
+    first = auth_manager._fetch_permissions()
+    assert set(first['permissions']) == {"ana.perez", "luis.gomez"}
+    assert auth_manager.source_errors == {'contratistas': "sin respuesta a tiempo"}
+
+    # La descarga lenta sigue en curso: otro refresco no la vuelve a pedir
+    auth_manager._fetch_permissions()
+    assert server.requests["/contratistas.csv"] == 1
+
+    server.release.set()
+    future = next(f for (_, name, _), f in auth_module._source_futures.items()
+                  if name == 'contratistas')
+    contractor_hash = future.result(timeout=10)['content_hash']
+
+    # El roster que se activó mientras tanto no podó la versión descargada
+    assert auth_manager._has_permissions(contractor_hash)
+    third = auth_manager._fetch_permissions()
+    assert set(third['permissions']) == {"ana.perez", "luis.gomez", "eva.ruiz"}
+    assert server.requests["/contratistas.csv"] == 2
@@ -0,0 +1,42 @@
+"""Pruebas de escritura atómica: el archivo anterior sobrevive a un fallo"""
+import json
+import os
+
+import pytest
+
+import file_utils
+from file_utils import atomic_write_bytes, atomic_write_json
+
+
+def test_write_replaces_content(tmp_path):
+    target = tmp_path / "sub" / "data.json"
+    atomic_write_json(str(target), {'a': "ñ"})
+    atomic_write_json(str(target), {'b': 2})
+    assert json.loads(target.read_text(encoding='utf-8')) == {'b': 2}
+    assert os.listdir(tmp_path / "sub") == ["data.json"]
+
+
+def test_failed_write_keeps_previous_file(tmp_path):
+    target = tmp_path / "data.bin"
+    atomic_write_bytes(str(target), b"original")
+
+    with pytest.raises(TypeError):
+        atomic_write_bytes(str(target), "no son bytes")
+
+    assert target.read_bytes() == b"original"
+    assert os.listdir(tmp_path) == ["data.bin"]
+
+
+def test_failed_replace_removes_temp_file(tmp_path, monkeypatch):
+    target = tmp_path / "data.bin"
+    atomic_write_bytes(str(target), b"original")
+
+    def broken_replace(src, dst):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(file_utils.os, "replace", broken_replace)
+    with pytest.raises(OSError):
+        atomic_write_bytes(str(target), b"nuevo")
+
+    assert target.read_bytes() == b"original"
+    assert os.listdir(tmp_path) == ["data.bin"]
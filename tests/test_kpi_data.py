@@ -0,0 +1,83 @@
+"""Pruebas del almacén de KPIs: filtros, orden, búsqueda y artefacto precompilado"""
+import io
+
+from kpi_data import KpiStore, parse_kpi_value
+
+
+KPIS = (
+    "CC_TECNICO,TIPO_TRABAJO(Grupo),OTs Asignadas,KPI Efectividad,Nota Excelencia\n"
+    "101,Instalación,12,\"97,06%\",\"8,7\"\n"
+    "202,Reparación,5,\"50%\",\n"
+    "101,Reparación,7,\"80%\",\"9,1\"\n"
+    "303,Instalación,1.200,\"10%\",\"4,0\"\n"
+)
+NAMES = "CC_TECNICO,NombreTecnico\n101,Ana Pérez\n202,Luis Gómez\n"
+
+
+def make_store():
+    store = KpiStore()
+    store.load(io.StringIO(KPIS))
+    store.load_names(io.StringIO(NAMES))
+    store.build_indexes()
+    return store
+
+
+def technicians(store, row_ids):
+    return [store.data["CC_TECNICO"][i] for i in row_ids]
+
+
+def test_parse_kpi_value():
+    assert parse_kpi_value("97,06%") == 97.06
+    assert parse_kpi_value("1.200") == 1200.0
+    assert parse_kpi_value(" ") is None
+    assert parse_kpi_value("n/a") is None
+
+
+def test_filter_by_work_type():
+    store = make_store()
+    assert store.get_work_types() == ["Instalación", "Reparación"]
+    assert technicians(store, store.query("Reparación")) == ["202", "101"]
+    assert list(store.query("Otro")) == []
+
+
+def test_sort_keeps_empty_values_last():
+    store = make_store()
+    ascending = store.query(sort_column="Nota Excelencia")
+    descending = store.query(sort_column="Nota Excelencia", descending=True)
+    assert technicians(store, ascending) == ["303", "101", "101", "202"]
+    assert technicians(store, descending) == ["101", "101", "303", "202"]
+    assert technicians(store, store.query(sort_column="OTs Asignadas")) == ["202", "101", "101", "303"]
+
+
+def test_search_by_name_or_cedula():
+    store = make_store()
+    assert technicians(store, store.query(technician="pérez")) == ["101", "101"]
+    assert technicians(store, store.query(technician="20")) == ["202"]
+    assert technicians(store, store.query("Instalación", "ana")) == ["101"]
+
+    rows = store.view_rows(store.query(technician="luis"))
+    assert rows == [{
+        'technician': "Luis Gómez",
+        'work_type': "Reparación",
+        'assigned': "5",
+        'effectiveness': "50%",
+        'score': '-'
+    }]
+
+
+def test_prebuilt_store_answers_the_same_queries():
+    store = make_store()
+    loaded = KpiStore.from_bytes(store.to_bytes())
+    for args in ((None, None, "KPI Efectividad", True),
+                 ("Reparación", None, "Nota Excelencia", False),
+                 (None, "gómez", None, False)):
+        assert list(loaded.query(*args)) == list(store.query(*args))
+    assert loaded.get_work_types() == store.get_work_types()
+
+
+def test_load_local_opens_prebuilt_without_csv(tmp_path):
+    prebuilt = tmp_path / "kpis.bin"
+    prebuilt.write_bytes(make_store().to_bytes(sources={"kpis.csv": "ab" * 32}))
+    loaded = KpiStore.load_local(str(prebuilt), kpi_path=str(tmp_path / "kpis.csv"),
+                                 technicians_path=None)
+    assert loaded.get_work_types() == ["Instalación", "Reparación"]
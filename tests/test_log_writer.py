@@ -0,0 +1,61 @@
+"""Pruebas del escritor de logs en segundo plano: lotes y rotación por bytes"""
+import logging
+import os
+
+from utils import AsyncLogWriter
+
+
+def make_record(message, level=logging.INFO):
+    return logging.LogRecord("test", level, __file__, 1, message, None, None)
+
+
+def make_writer(tmp_path, **kwargs):
+    kwargs.setdefault('console_level', logging.CRITICAL + 1)
+    return AsyncLogWriter(str(tmp_path / "app.log"), logging.Formatter("%(message)s"), **kwargs)
+
+
+def test_queued_records_are_written_in_one_batch(tmp_path):
+    writer = make_writer(tmp_path, batch_size=100, flush_interval=60)
+    for i in range(5):
+        writer.queue.put(make_record(f"linea {i}"))
+    assert writer.flush()
+
+    with open(writer.log_file, encoding='utf-8') as f:
+        assert f.read().splitlines() == [f"linea {i}" for i in range(5)]
+    assert writer.stats['records'] == 5
+    assert writer.stats['batches'] == 1
+    writer.stop()
+
+
+def test_batch_size_triggers_write_without_flush(tmp_path):
+    writer = make_writer(tmp_path, batch_size=2, flush_interval=60)
+    writer.queue.put(make_record("a"))
+    writer.queue.put(make_record("b"))
+    writer.flush()
+    writer.queue.put(make_record("c"))
+    writer.stop()
+    assert writer.stats['batches'] == 2
+    assert writer.stats['records'] == 3
+
+
+def test_rotation_counts_utf8_bytes(tmp_path):
+    # 10 caracteres acentuados + salto de línea = 21 bytes por línea
+    line = "á" * 10
+    writer = make_writer(tmp_path, max_bytes=50, backup_count=2, batch_size=1)
+    for _ in range(3):
+        writer.queue.put(make_record(line))
+        writer.flush()
+    writer.stop()
+
+    assert writer.stats['rotations'] == 1
+    assert os.path.getsize(writer.log_file + ".1") == 42
+    assert os.path.getsize(writer.log_file) == 21
+    assert not os.path.exists(writer.log_file + ".2")
+
+
+def test_stop_writes_pending_records(tmp_path):
+    writer = make_writer(tmp_path, batch_size=100, flush_interval=60)
+    writer.queue.put(make_record("pendiente"))
+    writer.stop()
+    with open(writer.log_file, encoding='utf-8') as f:
+        assert f.read() == "pendiente\n"
@@ -0,0 +1,70 @@
+"""Pruebas del snapshot offline: lectura por entrada y tablero sin conexión"""
+import base64
+import json
+import threading
+
+from cryptography.fernet import Fernet
+
+from offline_snapshot import OfflineSnapshot, load_offline_dashboard
+
+
+def make_snapshot(tmp_path, entries):
+    fernet = Fernet(Fernet.generate_key())
+    snapshot = OfflineSnapshot(str(tmp_path / "snapshot.bin"), fernet_provider=lambda: fernet)
+    snapshot.write(entries)
+    return snapshot
+
+
+def test_entries_are_read_individually(tmp_path):
+    snapshot = make_snapshot(tmp_path, {
+        'roster.json': json.dumps({'ana': {'active': True}}),
+        'kpis/a.csv': b"x,y\n1,2\n"
+    })
+    assert sorted(snapshot.names()) == ['kpis/a.csv', 'roster.json']
+    assert snapshot.read_json('roster.json') == {'ana': {'active': True}}
+    assert snapshot.read('kpis/a.csv') == b"x,y\n1,2\n"
+
+
+def test_offline_dashboard_page_stays_in_memory(tmp_path):
+    snapshot = make_snapshot(tmp_path, {
+        'dashboards.json': json.dumps({
+            'dashboard_url': "https://app.powerbi.com/view?r=abc",
+            'config': {'title': "Operaciones"}
+        }),
+        'embed/dashboard.html': "<iframe src='x'></iframe>"
+    })
+
+    dashboard = load_offline_dashboard(snapshot)
+    assert dashboard['url'] == "https://app.powerbi.com/view?r=abc"
+    assert dashboard['title'] == "Operaciones"
+    prefix, encoded = dashboard['page'].split(",", 1)
+    assert prefix == "data:text/html;charset=utf-8;base64"
+    assert base64.b64decode(encoded) == b"<iframe src='x'></iframe>"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["snapshot.bin"]
+
+
+def test_snapshot_without_dashboard(tmp_path):
+    snapshot = make_snapshot(tmp_path, {'roster.json': "{}"})
+    assert load_offline_dashboard(snapshot) is None
+
+
+def test_concurrent_readers_share_one_mapping(tmp_path):
+    snapshot = make_snapshot(tmp_path, {'kpis/a.csv': b"x" * 4096})
+    snapshot.close()
+    errors = []
+
+    def reader():
+        try:
+            for _ in range(50):
+                assert snapshot.read('kpis/a.csv') == b"x" * 4096
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for _ in range(50):
+        snapshot.close()
+    for thread in threads:
+        thread.join(10)
+    assert errors == []
@@ -0,0 +1,78 @@
+"""Pruebas de permisos compilados a bitsets contra la verificación por texto anterior"""
+import pytest
+
+from auth_manager import AuthManager
+from permissions import ALL_PERMISSIONS, PermissionRegistry
+
+
+def string_check(permissions, permission):
+    """Verificación por texto que hacía has_permission antes de los bitsets"""
+    user_permissions = permissions.lower()
+    return permission.lower() in user_permissions or 'admin' in user_permissions
+
+
+USERS = ["dashboard", "dashboard, kpis", "Reports,KPIs", "admin", "", "kpis , export"]
+CHECKS = ["dashboard", "kpis", "reports", "export", "KPIs", "settings"]
+
+
+@pytest.fixture
+def auth_manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return AuthManager()
+
+
+def login_as(auth_manager, permissions, role=None):
+    auth_manager.current_user = {'username': "ana", 'permissions': permissions, 'role': role}
+    auth_manager.permission_bits = auth_manager._user_permission_bits(auth_manager.current_user)
+
+
+@pytest.mark.parametrize("permissions", USERS)
+def test_bitsets_match_the_string_check(auth_manager, permissions):
+    login_as(auth_manager, permissions)
+    for permission in CHECKS:
+        assert auth_manager.has_permission(permission) == string_check(permissions, permission)
+
+
+def test_permission_prefix_is_not_a_match(auth_manager):
+    # Por texto 'report' coincidía dentro de 'reports'
+    login_as(auth_manager, "reports")
+    assert string_check("reports", "report") is True
+    assert auth_manager.has_permission("report") is False
+    assert auth_manager.has_permission("reports") is True
+
+
+def test_admin_gets_every_permission(auth_manager):
+    registry = PermissionRegistry()
+    assert registry.mask("kpis, admin") == ALL_PERMISSIONS
+
+    login_as(auth_manager, "admin")
+    assert auth_manager.permission_bits == ALL_PERMISSIONS
+    # También permisos que se registran después de compilar al usuario
+    assert auth_manager.has_permission("permiso_nuevo_123")
+
+    login_as(auth_manager, "", role="admin")
+    assert auth_manager.has_permission("export")
+
+
+def test_role_adds_its_permissions(auth_manager):
+    login_as(auth_manager, "kpis", role="usuario")
+    assert auth_manager.has_permission("dashboard")
+    assert not auth_manager.has_permission("export")
+
+
+def test_filter_permitted(auth_manager):
+    items = [
+        {'name': "Operaciones", 'permission': "dashboard"},
+        {'name': "KPIs", 'permission': "kpis"},
+        {'name': "Exportar", 'permission': ["kpis", "export"]},
+        {'name': "Público", 'permission': ""},
+    ]
+    login_as(auth_manager, "dashboard,kpis")
+    assert [i['name'] for i in auth_manager.filter_permitted(items)] == ["Operaciones", "KPIs", "Público"]
+
+    login_as(auth_manager, "admin")
+    assert len(auth_manager.filter_permitted(items)) == 4
+
+    auth_manager.current_user = None
+    assert auth_manager.filter_permitted(items) == []
+    assert auth_manager.has_permission("dashboard") is False
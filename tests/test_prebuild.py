@@ -0,0 +1,71 @@
+"""Pruebas del paquete precompilado: roster local o de URL y filtro de Bloom"""
+import os
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+import prebuild
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROSTER = os.path.join(ROOT, "usuarios_sistema.csv")
+
+
+class RosterHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        with open(ROSTER, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    shutil.copy(ROSTER, tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def roster_url():
+    server = HTTPServer(("127.0.0.1", 0), RosterHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/usuarios_sistema.csv"
+    server.shutdown()
+
+
+def test_url_build_matches_local_build(workdir, roster_url):
+    remote = prebuild.prebuild("remote", roster_url=roster_url, kpi_path=None)
+    local = prebuild.prebuild("local", roster_path="usuarios_sistema.csv", kpi_path=None)
+    assert remote['roster']['content_hash'] == local['roster']['content_hash']
+    assert remote['roster']['users'] == local['roster']['users']
+
+
+def test_bundle_has_no_roster_plaintext(workdir):
+    manifest = prebuild.prebuild("out", roster_path="usuarios_sistema.csv", kpi_path=None)
+    content_hash = manifest['roster']['content_hash']
+    assert os.listdir(os.path.join("out", "objects")) == [f"{content_hash}.bloom"]
+    assert manifest['roster']['users'] > 0
+
+
+def test_bundle_filter_matches_app_users(workdir):
+    from auth_manager import ROSTER_FILTER, ingest_roster_rows, read_roster_rows
+    from bloom_filter import BloomFilter
+
+    manifest = prebuild.prebuild("out", roster_path="usuarios_sistema.csv", kpi_path=None)
+    with open("usuarios_sistema.csv", 'r', encoding='utf-8-sig') as f:
+        users = ingest_roster_rows(read_roster_rows(f))
+    assert manifest['roster']['users'] == len(users)
+
+    content_hash = manifest['roster']['content_hash']
+    with open(os.path.join("out", "objects", f"{content_hash}.{ROSTER_FILTER}"), 'rb') as f:
+        bloom = BloomFilter.from_bytes(f.read())
+    assert all(username in bloom for username in users)
@@ -0,0 +1,51 @@
+"""Pruebas del limitador de intentos: bloqueo, guardado con retardo y expiración"""
+import json
+import os
+import time
+
+from rate_limiter import LoginRateLimiter
+
+
+def make_limiter(tmp_path, **kwargs):
+    kwargs.setdefault('save_delay', 60)
+    return LoginRateLimiter(state_file=str(tmp_path / "attempts.json"), **kwargs)
+
+
+def test_failures_are_saved_with_delay(tmp_path):
+    limiter = make_limiter(tmp_path)
+    assert limiter.record_failure("ana", "dev") is False
+    assert limiter.record_failure("luis", "dev") is False
+    assert not os.path.exists(limiter.state_file)
+
+    limiter.flush()
+    with open(limiter.state_file, encoding='utf-8') as f:
+        assert set(json.load(f)) == {"ana|dev", "luis|dev"}
+
+
+def test_lockout_is_saved_immediately(tmp_path):
+    limiter = make_limiter(tmp_path, max_attempts=2)
+    limiter.record_failure("ana", "dev")
+    assert limiter.record_failure("ana", "dev") is True
+
+    reloaded = make_limiter(tmp_path, max_attempts=2)
+    assert reloaded.is_locked("ANA", "dev")
+    assert not reloaded.is_locked("ana", "otro")
+
+
+def test_expired_keys_are_evicted(tmp_path):
+    limiter = make_limiter(tmp_path, window_seconds=300)
+    limiter.record_failure("ana", "dev")
+    limiter.record_failure("luis", "dev")
+    limiter._state["ana|dev"]['ring'] = [time.time() - 3600] * limiter.max_attempts
+
+    limiter.flush()
+    with open(limiter.state_file, encoding='utf-8') as f:
+        assert set(json.load(f)) == {"luis|dev"}
+    assert "ana|dev" not in limiter._state
+
+
+def test_success_clears_failures(tmp_path):
+    limiter = make_limiter(tmp_path, max_attempts=2)
+    limiter.record_failure("ana", "dev")
+    limiter.record_success("ana", "dev")
+    assert limiter.record_failure("ana", "dev") is False
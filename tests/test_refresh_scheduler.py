@@ -0,0 +1,82 @@
+"""Pruebas del planificador de refresco con reloj y executor de prueba"""
+from concurrent.futures import Future
+
+from refresh_scheduler import RefreshScheduler
+
+
+class FakeEvent:
+    def cancel(self):
+        pass
+
+
+class FakeClock:
+    def schedule_interval(self, callback, interval):
+        return FakeEvent()
+
+
+class PendingExecutor:
+    """Guarda las tareas sin ejecutarlas, como un pool ocupado"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, key, func, *args, on_success=None, on_error=None):
+        future = Future()
+        self.submitted.append((key, future, func, args))
+        return future
+
+
+def make_scheduler(executor):
+    scheduler = RefreshScheduler(interval=60, clock=FakeClock(), executor=executor)
+    scheduler.add_job("roster", lambda: True)
+    scheduler.start()
+    scheduler.run_now()
+    return scheduler
+
+
+def test_running_job_is_not_submitted_twice():
+    executor = PendingExecutor()
+    scheduler = make_scheduler(executor)
+    scheduler._tick()
+    scheduler.run_now()
+    scheduler._tick()
+    assert len(executor.submitted) == 1
+
+
+def test_cancelled_job_is_released_and_rescheduled():
+    executor = PendingExecutor()
+    scheduler = make_scheduler(executor)
+    scheduler._tick()
+    job = scheduler._jobs["roster"]
+    assert job.running
+
+    _, future, _, _ = executor.submitted[0]
+    future.cancel()
+    assert not job.running
+    assert scheduler.get_stats()["roster"]["next_in"] > 0
+
+    scheduler.run_now()
+    scheduler._tick()
+    assert len(executor.submitted) == 2
+
+
+def test_finished_job_is_released_by_run_job():
+    executor = PendingExecutor()
+    scheduler = make_scheduler(executor)
+    scheduler._tick()
+    _, future, func, args = executor.submitted[0]
+    future.set_result(func(*args))
+
+    job = scheduler._jobs["roster"]
+    assert not job.running
+    assert job.runs == 1 and job.changes == 1
+
+
+def test_start_clears_stale_running_flag():
+    executor = PendingExecutor()
+    scheduler = make_scheduler(executor)
+    scheduler._tick()
+    scheduler.stop()
+
+    scheduler.start()
+    assert not scheduler._jobs["roster"].running
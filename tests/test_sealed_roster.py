@@ -0,0 +1,45 @@
+"""Pruebas del roster sellado: sin cédulas en claro ni caché en claro de versiones anteriores"""
+import hashlib
+import json
+from datetime import datetime
+
+import pytest
+
+from auth_manager import ROSTER_SEALED, AuthManager, ingest_roster_rows
+from sealed_roster import SealedRoster
+
+
+@pytest.fixture
+def auth_manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return AuthManager()
+
+
+def test_records_do_not_keep_the_cedula():
+    permissions = ingest_roster_rows([("Ana.Perez", "1001"), ("", "1002")])
+    assert list(permissions) == ["ana.perez"]
+    record = permissions["ana.perez"]
+    assert "cedula" not in record
+    assert record['password_hash'] == hashlib.sha256(b"1001").hexdigest()
+
+
+def test_sealed_roster_has_no_cedulas(auth_manager):
+    content_hash = "ab" * 32
+    auth_manager._put_permissions(content_hash, ingest_roster_rows([("ana.perez", "1001")]))
+    with open(auth_manager.content_store.path(content_hash, ROSTER_SEALED), 'rb') as f:
+        assert b"1001" not in f.read()
+
+    sealed = SealedRoster(auth_manager.content_store.path(content_hash, ROSTER_SEALED),
+                          auth_manager.fernet, auth_manager.index_key)
+    try:
+        assert sealed.lookup("ana.perez")['password_hash'] == hashlib.sha256(b"1001").hexdigest()
+    finally:
+        sealed.close()
+
+
+def test_plaintext_cache_of_previous_versions_is_not_used(auth_manager):
+    with open(auth_manager.cache_file, 'w', encoding='utf-8') as f:
+        json.dump({'permissions': {'ana.perez': {'cedula': "1001", 'active': True}},
+                   'timestamp': datetime.now().isoformat()}, f)
+    assert not auth_manager._load_permissions_from_cache()
+    assert not auth_manager.permissions_cache
@@ -0,0 +1,111 @@
+"""Pruebas de sesiones: reloj monotónico, rueda de temporizadores y reanudación encriptada"""
+import time
+
+from cryptography.fernet import Fernet
+
+import session_manager
+from session_manager import Session, SessionManager, TimerWheel
+
+
+def shift_clock(monkeypatch, name, seconds):
+    real = getattr(time, name)
+    monkeypatch.setattr(session_manager.time, name, lambda: real() + seconds)
+
+
+def test_session_expiry_follows_the_monotonic_clock(monkeypatch):
+    session = Session("t", {'username': "ana"}, timeout=60)
+    assert not session.is_expired()
+
+    # Cambiar la hora del teléfono no alarga ni acorta la sesión
+    shift_clock(monkeypatch, "time", 3600)
+    assert not session.is_expired()
+    assert 0 < session.remaining() <= 60
+
+    shift_clock(monkeypatch, "monotonic", 61)
+    assert session.is_expired()
+    assert session.remaining() == 0.0
+
+
+def test_timer_wheel_fires_due_tokens_only():
+    wheel = TimerWheel(tick=1.0, slots=256)
+    base = wheel._current_tick
+    wheel.schedule("a", base + 2.5)
+    wheel.schedule("b", base + 5.5)
+    wheel.schedule("c", base + 7.5)
+    wheel.cancel("c")
+
+    assert wheel.advance(base + 1) == []
+    assert wheel.advance(base + 3) == ["a"]
+    assert wheel.advance(base + 10) == ["b"]
+    assert wheel.advance(base + 20) == []
+
+
+def test_timer_wheel_wraps_past_all_slots():
+    wheel = TimerWheel(tick=1.0, slots=256)
+    base = wheel._current_tick
+    # Misma ranura que base + 4, pero una vuelta después
+    wheel.schedule("lejano", base + 260.5)
+    wheel.schedule("cercano", base + 4.5)
+
+    assert wheel.advance(base + 5) == ["cercano"]
+    assert wheel.advance(base + 259) == []
+    assert wheel.advance(base + 261) == ["lejano"]
+
+
+def test_timer_wheel_skips_more_than_one_revolution():
+    wheel = TimerWheel(tick=1.0, slots=256)
+    base = wheel._current_tick
+    for i in range(300):
+        wheel.schedule(f"t{i}", base + i + 0.5)
+
+    assert len(wheel.advance(base + 1000)) == 300
+    assert not any(wheel.slots)
+
+
+def make_manager(tmp_path, fernet, timeout=60):
+    return SessionManager(timeout=timeout, session_file=str(tmp_path / "session.dat"),
+                          fernet_provider=lambda: fernet)
+
+
+def test_session_is_restored_encrypted(tmp_path):
+    fernet = Fernet(Fernet.generate_key())
+    session = make_manager(tmp_path, fernet).create({'username': "ana.perez"})
+
+    assert b"ana.perez" not in (tmp_path / "session.dat").read_bytes()
+
+    restored = make_manager(tmp_path, fernet).restore()
+    assert restored.token == session.token
+    assert restored.user == {'username': "ana.perez"}
+
+
+def test_expired_session_file_is_removed(tmp_path, monkeypatch):
+    fernet = Fernet(Fernet.generate_key())
+    make_manager(tmp_path, fernet).create({'username': "ana"})
+
+    shift_clock(monkeypatch, "time", 120)
+    assert make_manager(tmp_path, fernet).restore() is None
+    assert not (tmp_path / "session.dat").exists()
+
+
+def test_shorter_timeout_applies_on_restore(tmp_path, monkeypatch):
+    fernet = Fernet(Fernet.generate_key())
+    make_manager(tmp_path, fernet, timeout=3600).create({'username': "ana"})
+
+    shift_clock(monkeypatch, "time", 120)
+    assert make_manager(tmp_path, fernet, timeout=60).restore() is None
+
+
+def test_session_file_from_another_key_is_ignored(tmp_path):
+    make_manager(tmp_path, Fernet(Fernet.generate_key())).create({'username': "ana"})
+    assert make_manager(tmp_path, Fernet(Fernet.generate_key())).restore() is None
+
+
+def test_expire_due_removes_sessions(tmp_path, monkeypatch):
+    manager = make_manager(tmp_path, Fernet(Fernet.generate_key()))
+    session = manager.create({'username': "ana"})
+    assert manager.expire_due() == []
+
+    shift_clock(monkeypatch, "monotonic", 120)
+    assert manager.expire_due() == [session.token]
+    assert manager.get(session.token) is None
+    assert not (tmp_path / "session.dat").exists()
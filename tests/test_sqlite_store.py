@@ -0,0 +1,81 @@
+"""Pruebas del backend SQLite: auditoría por archivo, KPIs precompilados y roster ilegible"""
+import io
+import os
+from datetime import datetime
+
+import pytest
+from cryptography.fernet import Fernet
+
+from audit_log import AuditLog
+from auth_manager import AuthManager, ingest_roster_rows
+from kpi_data import KpiStore
+from sqlite_store import SqliteKpiStore, SqliteStore
+
+
+DAY = datetime(2024, 3, 5, 10, 0).timestamp()
+
+
+@pytest.fixture
+def db(tmp_path):
+    store = SqliteStore(str(tmp_path / "tablero.db"))
+    yield store
+    store.close()
+
+
+def audit_rows(db):
+    return db.connection().execute("SELECT log_id, recno, user FROM audit ORDER BY timestamp").fetchall()
+
+
+def test_audit_sync_is_incremental(db, tmp_path):
+    log = AuditLog(str(tmp_path / "logs"))
+    log.append("ana", "login", True, DAY)
+    assert db.sync_audit(log) == 1
+    log.append("luis", "login", False, DAY + 1)
+    assert db.sync_audit(log) == 1
+    assert db.sync_audit(log) == 0
+    assert [r['action'] for r in db.query_audit("ANA")] == ["login"]
+
+
+def test_reset_audit_file_is_copied_again(db, tmp_path):
+    log_dir = str(tmp_path / "logs")
+    log = AuditLog(log_dir)
+    log.append("ana", "login", True, DAY)
+    log.append("ana", "logout", True, DAY + 1)
+    db.sync_audit(log)
+
+    # audit.dat vuelve a empezar: sus números de registro se repiten
+    os.remove(log.data_file)
+    log = AuditLog(log_dir)
+    log.append("luis", "login", True, DAY + 2)
+    assert db.sync_audit(log) == 1
+
+    rows = audit_rows(db)
+    assert [user for _, _, user in rows] == ["ana", "ana", "luis"]
+    assert rows[0][0] != rows[2][0] and rows[2][1] == 0
+
+
+def test_roster_sealed_with_another_key_is_discarded(db, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    auth_manager = AuthManager()
+    auth_manager.roster_db = db
+    permissions = ingest_roster_rows([("ana.perez", "1001")])
+    db.put_roster("ab" * 32, permissions, Fernet(Fernet.generate_key()), auth_manager.index_key)
+
+    assert auth_manager._get_permissions("ab" * 32) is None
+    assert not db.has_roster("ab" * 32)
+
+
+def test_kpis_load_from_prebuilt_without_csv(db, tmp_path):
+    store = KpiStore()
+    store.load(io.StringIO("CC_TECNICO,TIPO_TRABAJO(Grupo),OTs Asignadas\n101,Instalación,12\n"))
+    store.build_indexes()
+    prebuilt = tmp_path / "kpis.bin"
+    prebuilt.write_bytes(store.to_bytes(sources={"kpis.csv": "ab" * 32}))
+
+    kpis = SqliteKpiStore.load_local(db, kpi_path=str(tmp_path / "kpis.csv"), technicians_path=None,
+                                     prebuilt_path=str(prebuilt))
+    assert kpis.get_work_types() == ["Instalación"]
+    assert db.kpi_sources() == {"kpis.csv": "ab" * 32}
+
+    with pytest.raises(FileNotFoundError):
+        SqliteKpiStore.load_local(db, kpi_path=str(tmp_path / "kpis.csv"), technicians_path=None)
@@ -0,0 +1,52 @@
+"""Pruebas del backend tabular: stdlib y paridad con pandas"""
+import io
+
+import pytest
+
+import tabular
+from tabular import cell_text, normalize_columns, read_csv
+
+
+CSV_TEXT = "\ufeffUsuario , Cedula,Activo\nana,101,si\n\n luis ,202,\ncorta\n"
+
+
+def read_with(backend):
+    table = normalize_columns(read_csv(io.StringIO(CSV_TEXT), backend=backend, dtype=str))
+    rows = [
+        {column: cell_text(row, column) for column in table.columns}
+        for _, row in table.iterrows()
+    ]
+    return table.columns, rows
+
+
+def test_stdlib_reader_normalizes_and_pads_rows():
+    columns, rows = read_with("stdlib")
+    assert columns == ["usuario", "cedula", "activo"]
+    assert rows == [
+        {'usuario': "ana", 'cedula': "101", 'activo': "si"},
+        {'usuario': "luis", 'cedula': "202", 'activo': ""},
+        {'usuario': "corta", 'cedula': "", 'activo': ""},
+    ]
+
+
+def test_stdlib_matches_pandas():
+    pytest.importorskip("pandas")
+    assert read_with("stdlib") == read_with("pandas")
+
+
+def test_stdlib_round_trip(tmp_path):
+    table = tabular.from_dict({'a': ["1", "2"], 'b': ["x", "y,z"]}, backend="stdlib")
+    path = tmp_path / "out.csv"
+    table.to_csv(str(path))
+    again = read_csv(str(path), backend="stdlib")
+    assert again.columns == ["a", "b"]
+    assert again["b"] == ["x", "y,z"]
+    assert len(again[["a"]]) == 2
+
+
+def test_forced_backend_falls_back_without_pandas(monkeypatch):
+    monkeypatch.setenv(tabular.BACKEND_ENV_VAR, "stdlib")
+    assert tabular.get_backend() == "stdlib"
+    monkeypatch.setenv(tabular.BACKEND_ENV_VAR, "pandas")
+    expected = "pandas" if tabular.pandas_available() else "stdlib"
+    assert tabular.get_backend() == expected
@@ -0,0 +1,148 @@
+"""Pruebas del ejecutor de tareas (agrupación, cancelación y entrega de resultados)"""
+
+import threading
+
+from task_executor import TaskExecutor
+
+
+class RecordingScheduler:
+    """Sustituto de Clock.schedule_once: ejecuta el callback en el acto y lo registra"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, callback, timeout):
+        self.calls.append(timeout)
+        callback(0)
+
+
+def _wait(future):
+    future.result(timeout=5)
+
+
+def test_repeated_key_is_coalesced():
+    scheduler = RecordingScheduler()
+    executor = TaskExecutor(max_workers=2, scheduler=scheduler)
+    release = threading.Event()
+    runs = []
+    results = []
+
+    def task():
+        runs.append(1)
+        release.wait(5)
+        return "ok"
+
+    first = executor.submit("kpi_load", task, on_success=results.append)
+    second = executor.submit("kpi_load", task, on_success=results.append)
+    assert first is second
+    assert executor.is_running("kpi_load")
+
+    release.set()
+    _wait(first)
+    executor.shutdown(wait=True)
+
+    assert runs == [1]
+    assert results == ["ok", "ok"]
+    assert executor.stats['submitted'] == 1
+    assert executor.stats['coalesced'] == 1
+
+
+def test_finished_key_starts_a_new_task():
+    executor = TaskExecutor(max_workers=1, scheduler=RecordingScheduler())
+    first = executor.submit("refresh", lambda: 1)
+    _wait(first)
+    second = executor.submit("refresh", lambda: 2)
+    assert second is not first
+    assert second.result(timeout=5) == 2
+    executor.shutdown(wait=True)
+
+
+def test_cancel_all_discards_results_by_generation():
+    executor = TaskExecutor(max_workers=1, scheduler=RecordingScheduler())
+    started = threading.Event()
+    release = threading.Event()
+    delivered = []
+
+    def running():
+        started.set()
+        release.wait(5)
+        return "viejo"
+
+    running_future = executor.submit("login", running, on_success=delivered.append)
+    queued_future = executor.submit("kpis", lambda: "en cola", on_success=delivered.append)
+    started.wait(5)
+
+    assert executor.cancel_all() == 1
+    assert queued_future.cancelled()
+
+    # La tarea en curso termina, pero su resultado pertenece a la sesión anterior
+    release.set()
+    _wait(running_future)
+    assert delivered == []
+
+    # Lo enviado después de cancel_all sí se entrega
+    _wait(executor.submit("login", lambda: "nuevo", on_success=delivered.append))
+    executor.shutdown(wait=True)
+    assert delivered == ["nuevo"]
+
+
+def test_results_and_errors_go_through_scheduler():
+    scheduler = RecordingScheduler()
+    executor = TaskExecutor(max_workers=1, scheduler=scheduler)
+    results = []
+    errors = []
+
+    def fail():
+        raise ValueError("sin red")
+
+    _wait(executor.submit("ok", lambda: 42, on_success=results.append))
+    future = executor.submit("error", fail, on_error=errors.append)
+    try:
+        _wait(future)
+    except ValueError:
+        pass
+    executor.shutdown(wait=True)
+
+    assert results == [42]
+    assert [str(e) for e in errors] == ["sin red"]
+    assert scheduler.calls == [0, 0]
+
+
+def test_fast_tasks_do_not_deadlock():
+    """Una tarea que termina antes de registrar su callback no debe bloquear submit"""
+    executor = TaskExecutor(max_workers=1, scheduler=lambda callback, timeout: None)
+
+    def hammer():
+        for i in range(2000):
+            executor.submit(("boton", i % 3), int)
+
+    worker = threading.Thread(target=hammer, daemon=True)
+    worker.start()
+    worker.join(10)
+    assert not worker.is_alive(), "submit quedó bloqueado"
+    executor.shutdown(wait=True)
+
+
+def test_cancel_drops_result_of_running_task():
+    executor = TaskExecutor(max_workers=1, scheduler=RecordingScheduler())
+    started = threading.Event()
+    release = threading.Event()
+    delivered = []
+
+    def running():
+        started.set()
+        release.wait(5)
+        return "viejo"
+
+    future = executor.submit("auth", running, on_success=delivered.append)
+    started.wait(5)
+    assert executor.cancel("auth") is False
+    assert not executor.is_running("auth")
+
+    release.set()
+    _wait(future)
+    assert delivered == []
+
+    _wait(executor.submit("auth", lambda: "nuevo", on_success=delivered.append))
+    executor.shutdown(wait=True)
+    assert delivered == ["nuevo"]
@@ -2,13 +2,20 @@
 Utilidades adicionales para la aplicación PowerBI Mobile Dashboard
 """
 
+import atexit
 import hashlib
 import json
 import os
 import logging
+import queue
+import sys
+import threading
+import time
 from datetime import datetime, timedelta
-import pandas as pd
-from cryptography.fernet import Fernet
+from logging.handlers import QueueHandler
+import tabular
+from audit_log import AuditLog
+from metrics import get_metrics
 
 
 class PasswordUtils:
@@ -75,23 +82,191 @@ class CSVGenerator:
 
     def generate_csv(self, filename="users.csv"):
         """Genera archivo CSV"""
-        df = pd.DataFrame(self.template_data)
+        df = tabular.from_dict(self.template_data)
         df.to_csv(filename, index=False, encoding='utf-8')
         return df
 
     def preview(self):
         """Muestra preview de los datos"""
-        df = pd.DataFrame(self.template_data)
+        df = tabular.from_dict(self.template_data)
         return df
 
 
+class AsyncLogWriter:
+    """
+    Escritor de logs en segundo plano. Los registros llegan por una cola y un
+    hilo los escribe por lotes (al llegar a batch_size o cada flush_interval
+    segundos), rotando el archivo por tamaño como RotatingFileHandler
+    """
+
+    _STOP = object()
+
+    def __init__(self, log_file, formatter, max_bytes=1048576, backup_count=3,
+                 batch_size=256, flush_interval=1.0, console_level=logging.WARNING):
+        self.log_file = log_file
+        self.formatter = formatter
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.console_level = console_level
+        self.queue = queue.SimpleQueue()
+        self.stats = {'records': 0, 'batches': 0, 'rotations': 0}
+
+        self._stream = None
+        self._size = 0
+        self._flush_requests = []
+        self._thread = threading.Thread(
+            target=self._run,
+            name="log-writer",
+            daemon=True
+        )
+        self._thread.start()
+
+    def _open(self):
+        """Abre el archivo de log en modo append"""
+        self._stream = open(self.log_file, 'a', encoding='utf-8')
+        self._size = self._stream.tell()
+
+    def _rotate(self):
+        """Rota app.log -> app.log.1 -> ... -> app.log.N"""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                source = f"{self.log_file}.{i}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.log_file}.{i + 1}")
+            if os.path.exists(self.log_file):
+                os.replace(self.log_file, f"{self.log_file}.1")
+        else:
+            open(self.log_file, 'w').close()
+
+        self.stats['rotations'] += 1
+        self._open()
+
+    def _write_batch(self, records):
+        """Formatea y escribe un lote de registros con una sola escritura"""
+        with get_metrics().time("log.write_batch"):
+            self._write_records(records)
+        get_metrics().inc("log.records", len(records))
+
+    def _write_records(self, records):
+        if self._stream is None:
+            self._open()
+
+        lines = []
+        console_lines = []
+        for record in records:
+            line = self.formatter.format(record) + "\n"
+            lines.append(line)
+            if record.levelno >= self.console_level:
+                console_lines.append(line)
+
+        data = "".join(lines)
+        # max_bytes está en bytes: los acentos ocupan más de un byte en UTF-8
+        size = len(data.encode('utf-8'))
+        if self.max_bytes and self._size and self._size + size > self.max_bytes:
+            self._rotate()
+
+        self._stream.write(data)
+        self._stream.flush()
+        self._size += size
+
+        if console_lines:
+            sys.stderr.write("".join(console_lines))
+
+        self.stats['records'] += len(records)
+        self.stats['batches'] += 1
+
+    def _run(self):
+        """Bucle del hilo escritor"""
+        batch = []
+        deadline = None
+
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            stop = item is self._STOP
+            if isinstance(item, threading.Event):
+                self._flush_requests.append(item)
+            elif isinstance(item, tuple):
+                # Tarea auxiliar (p. ej. registro de auditoría) en este hilo
+                func, args = item
+                try:
+                    func(*args)
+                except Exception as e:
+                    sys.stderr.write(f"Error en tarea de logs: {e}\n")
+            elif item is not None and not stop:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            expired = deadline is not None and time.monotonic() >= deadline
+            if batch and (len(batch) >= self.batch_size or expired or stop or self._flush_requests):
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    sys.stderr.write(f"Error escribiendo logs: {e}\n")
+                batch = []
+                deadline = None
+
+            for event in self._flush_requests:
+                event.set()
+            self._flush_requests = []
+
+            if stop:
+                if self._stream is not None:
+                    self._stream.close()
+                    self._stream = None
+                return
+
+    def submit(self, func, *args):
+        """Ejecuta func(*args) en el hilo escritor, en orden con los logs"""
+        self.queue.put((func, args))
+
+    def flush(self, timeout=5.0):
+        """Espera a que los registros encolados hasta ahora se escriban"""
+        if not self._thread.is_alive():
+            return False
+        event = threading.Event()
+        self.queue.put(event)
+        return event.wait(timeout)
+
+    def stop(self, timeout=5.0):
+        """Escribe lo pendiente y detiene el hilo escritor"""
+        if self._thread.is_alive():
+            self.queue.put(self._STOP)
+            self._thread.join(timeout)
+
+
+class _EnqueueHandler(QueueHandler):
+    """QueueHandler que no formatea en el hilo que registra"""
+
+    def prepare(self, record):
+        # El formateo lo hace AsyncLogWriter en su hilo
+        return record
+
+
 class LogManager:
     """Gestor de logs para la aplicación"""
 
-    def __init__(self, log_dir="logs", log_level=logging.INFO):
+    def __init__(self, log_dir="logs", log_level=logging.INFO,
+                 max_file_size=1048576, backup_count=3, logger_name='PowerBI_App'):
         self.log_dir = log_dir
         self.log_level = log_level
+        self.max_file_size = max_file_size
+        self.backup_count = backup_count
+        self.logger_name = logger_name
         self.logger = None
+        self.writer = None
+        self.audit = None
         self._setup_logging()
 
     def _setup_logging(self):
@@ -99,32 +274,61 @@ class LogManager:
         os.makedirs(self.log_dir, exist_ok=True)
 
         # Configurar logger
-        self.logger = logging.getLogger('PowerBI_App')
+        self.logger = logging.getLogger(self.logger_name)
         self.logger.setLevel(self.log_level)
 
-        # Evitar duplicar handlers
+        # Evitar duplicar handlers: reutilizar el escritor ya configurado
         if self.logger.handlers:
+            for handler in self.logger.handlers:
+                self.writer = getattr(handler, 'writer', self.writer)
+                self.audit = getattr(handler, 'audit', self.audit)
             return
 
-        # Handler para archivo
-        log_file = os.path.join(self.log_dir, f"app_{datetime.now().strftime('%Y%m%d')}.log")
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setLevel(self.log_level)
-
-        # Handler para consola
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.WARNING)
-
         # Formato de logs
         formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
 
-        # Agregar handlers
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        # El hilo que registra (a menudo el de Kivy) solo encola; el archivo
+        # y la consola los escribe el hilo de fondo por lotes
+        log_file = os.path.join(self.log_dir, f"app_{datetime.now().strftime('%Y%m%d')}.log")
+        self.writer = AsyncLogWriter(
+            log_file,
+            formatter,
+            max_bytes=self.max_file_size,
+            backup_count=self.backup_count,
+            console_level=logging.WARNING
+        )
+
+        queue_handler = _EnqueueHandler(self.writer.queue)
+        queue_handler.setLevel(self.log_level)
+        queue_handler.writer = self.writer
+
+        # Auditoría estructurada (usuario/acción/estado) junto al log de texto
+        self.audit = AuditLog(self.log_dir)
+        queue_handler.audit = self.audit
+
+        self.logger.addHandler(queue_handler)
+        self.logger.propagate = False
+        atexit.register(self.close)
+
+    def flush(self, timeout=5.0):
+        """Fuerza la escritura de los registros pendientes"""
+        if self.writer is not None:
+            return self.writer.flush(timeout)
+        return True
+
+    def close(self):
+        """Escribe lo pendiente y detiene el escritor en segundo plano"""
+        if self.writer is not None:
+            self.writer.stop()
+        if self.audit is not None:
+            self.audit.close()
+
+    def _audit(self, username, action, status):
+        """Encola un registro de auditoría (se escribe en el hilo escritor)"""
+        if self.audit is not None and self.writer is not None:
+            self.writer.submit(self.audit.append, username, action, status, time.time())
 
     def info(self, message):
         """Log nivel info"""
@@ -148,17 +352,25 @@ class LogManager:
         if details:
             message += f" | Detalles: {details}"
         self.info(message)
+        self._audit(username, action, AuditLog.STATUS_INFO)
 
     def log_auth_attempt(self, username, success, ip_address="unknown"):
         """Log específico para intentos de autenticación"""
         status = "EXITOSO" if success else "FALLIDO"
         self.info(f"Intento de login {status} - Usuario: {username} - IP: {ip_address}")
+        self._audit(username, "login", bool(success))
 
     def log_powerbi_access(self, username, dashboard_url, success):
         """Log específico para acceso a Power BI"""
         status = "EXITOSO" if success else "FALLIDO"
         url_preview = dashboard_url[:50] + "..." if len(dashboard_url) > 50 else dashboard_url
         self.info(f"Acceso Power BI {status} - Usuario: {username} - URL: {url_preview}")
+        self._audit(username, "powerbi_access", bool(success))
+
+    def query_audit(self, **filters):
+        """Consulta la auditoría estructurada (ver AuditLog.query)"""
+        self.flush()
+        return self.audit.query(**filters) if self.audit is not None else []
 
 
 class DataValidator:
@@ -166,7 +378,7 @@ class DataValidator:
 
     @staticmethod
     def validate_csv_structure(df):
-        """Valida estructura del CSV de usuarios"""
+        """Valida estructura del CSV de usuarios (DataFrame o tabular.Table)"""
         required_columns = [
             'usuario', 'password_hash', 'activo', 'fecha_expiracion',
             'permisos', 'nombre_completo', 'departamento', 'rol'
@@ -182,7 +394,7 @@ class DataValidator:
         # Verificar datos
         for index, row in df.iterrows():
             # Usuario no vacío
-            if pd.isna(row.get('usuario')) or str(row.get('usuario')).strip() == '':
+            if tabular.is_missing(row.get('usuario')) or str(row.get('usuario')).strip() == '':
                 errors.append(f"Fila {index + 1}: Usuario vacío")
 
             # Hash de contraseña válido
@@ -203,6 +415,31 @@ class DataValidator:
 
         return len(errors) == 0, errors
 
+    @staticmethod
+    def validate_roster_rows(rows):
+        """
+        Valida los pares (nombre, cédula) del roster. Las filas incompletas o
+        repetidas se informan pero no invalidan el roster; sin usuarios sí
+        """
+        errors = []
+        seen = set()
+        valid = 0
+
+        for index, (nombre, cedula) in enumerate(rows):
+            if not nombre or not cedula:
+                errors.append(f"Fila {index + 1}: nombre o cédula vacío (se omite)")
+                continue
+
+            username = nombre.lower()
+            if username in seen:
+                errors.append(f"Fila {index + 1}: usuario repetido '{username}' (prevalece la última)")
+            seen.add(username)
+            valid += 1
+
+        if not valid:
+            errors.insert(0, "El roster no tiene usuarios válidos (columnas nombre y cedula)")
+        return valid > 0, errors
+
     @staticmethod
     def validate_powerbi_url(url):
         """Valida URL de Power BI"""
@@ -269,55 +506,91 @@ class SecurityUtils:
         return sanitized[:max_length].strip()
 
 
+def scan_files(root, recursive=True):
+    """
+    Recorre root con os.scandir y devuelve [(ruta, nombre, stat)]: un solo
+    stat por archivo (scandir ya trae el tipo de cada entrada)
+    """
+    files = []
+    pending = [root]
+    while pending:
+        try:
+            entries = list(os.scandir(pending.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    files.append((entry.path, entry.name, entry.stat(follow_symlinks=False)))
+            except OSError:
+                pass
+    return files
+
+
+def _last_used(stat):
+    # Muchos sistemas (Android incluido) montan con relatime/noatime: el
+    # último uso es el más reciente entre acceso y modificación
+    return max(stat.st_atime, stat.st_mtime)
+
+
 class MaintenanceUtils:
     """Utilidades de mantenimiento"""
 
+    # Estado que no se borra aunque sea antiguo: identidad del dispositivo,
+    # sesión, bloqueos de login, snapshot offline y auditoría
+    PROTECTED_FILES = frozenset({
+        "device.id",
+        "session.dat",
+        "login_attempts.json",
+        "metrics.json",
+        "offline_snapshot.bin",
+        "audit.dat",
+        "audit_strings.log",
+        "audit_index.bin",
+        "tablero.db",
+        "tablero.db-wal",
+        "tablero.db-shm",
+    })
+
     @staticmethod
     def cleanup_cache(cache_dir="cache", max_age_hours=24):
-        """Limpia archivos de caché antiguos"""
-        if not os.path.exists(cache_dir):
-            return 0
-
-        cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
+        """Limpia archivos de caché antiguos (salvo los protegidos)"""
+        cutoff_time = time.time() - max_age_hours * 3600
         removed_count = 0
 
-        for filename in os.listdir(cache_dir):
-            file_path = os.path.join(cache_dir, filename)
-            if os.path.isfile(file_path):
-                file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-                if file_time < cutoff_time:
-                    try:
-                        os.remove(file_path)
-                        removed_count += 1
-                    except OSError:
-                        pass
+        for path, name, stat in scan_files(cache_dir, recursive=False):
+            if name in MaintenanceUtils.PROTECTED_FILES or stat.st_mtime >= cutoff_time:
+                continue
+            try:
+                os.remove(path)
+                removed_count += 1
+            except OSError:
+                pass
 
         return removed_count
 
     @staticmethod
     def cleanup_logs(log_dir="logs", max_files=10):
         """Limpia archivos de log antiguos"""
-        if not os.path.exists(log_dir):
-            return 0
-
         log_files = [
-            f for f in os.listdir(log_dir)
-            if f.endswith('.log') and os.path.isfile(os.path.join(log_dir, f))
+            (stat.st_mtime, path)
+            for path, name, stat in scan_files(log_dir, recursive=False)
+            if name.endswith('.log')
         ]
 
         if len(log_files) <= max_files:
             return 0
 
-        # Ordenar por fecha de modificación
-        log_files.sort(key=lambda x: os.path.getmtime(os.path.join(log_dir, x)))
-
         # Eliminar archivos más antiguos
-        files_to_remove = log_files[:-max_files]
+        log_files.sort()
         removed_count = 0
 
-        for filename in files_to_remove:
+        for _, path in log_files[:-max_files]:
             try:
-                os.remove(os.path.join(log_dir, filename))
+                os.remove(path)
                 removed_count += 1
             except OSError:
                 pass
@@ -327,43 +600,284 @@ class MaintenanceUtils:
     @staticmethod
     def get_app_statistics(cache_dir="cache", log_dir="logs"):
         """Obtiene estadísticas de la aplicación"""
-        stats = {
-            'cache_files': 0,
-            'cache_size_mb': 0,
-            'log_files': 0,
-            'log_size_mb': 0,
-            'last_cleanup': None
+        cache_files = scan_files(cache_dir)
+        log_files = [item for item in scan_files(log_dir, recursive=False)
+                     if item[1].endswith('.log')]
+
+        last_cleanup = None
+        if _disk_janitor is not None and _disk_janitor.last_run is not None:
+            last_cleanup = datetime.fromtimestamp(_disk_janitor.last_run).isoformat()
+
+        return {
+            'cache_files': len(cache_files),
+            'cache_size_mb': round(sum(s.st_size for _, _, s in cache_files) / (1024 * 1024), 2),
+            'log_files': len(log_files),
+            'log_size_mb': round(sum(s.st_size for _, _, s in log_files) / (1024 * 1024), 2),
+            'last_cleanup': last_cleanup
         }
 
-        # Estadísticas de caché
-        if os.path.exists(cache_dir):
-            cache_files = os.listdir(cache_dir)
-            stats['cache_files'] = len(cache_files)
 
-            total_size = sum(
-                os.path.getsize(os.path.join(cache_dir, f))
-                for f in cache_files
-                if os.path.isfile(os.path.join(cache_dir, f))
-            )
-            stats['cache_size_mb'] = round(total_size / (1024 * 1024), 2)
+class DiskJanitor:
+    """
+    Limpieza incremental de cache/ y logs/ con un presupuesto conjunto de
+    tamaño y antigüedad. Cada tick trabaja a lo sumo slice_ms: primero
+    recorre los directorios con scandir y luego borra lo vencido y, si aún
+    se excede el tamaño, lo usado hace más tiempo (LRU)
+    """
+
+    IDLE, SCANNING, EVICTING = "idle", "scanning", "evicting"
+
+    def __init__(self, roots=("cache", "logs"), max_total_mb=50, max_age_days=30,
+                 interval=3600, slice_ms=4.0, tick=0.5, clock=None):
+        self.roots = tuple(roots)
+        self.max_total_bytes = int(max_total_mb * 1024 * 1024)
+        self.max_age = max_age_days * 86400
+        self.interval = interval
+        self.slice_ms = slice_ms
+        self.tick = tick
+        self._clock = clock
+        self._event = None
+        self._providers = []
+
+        self.state = self.IDLE
+        self.last_run = None
+        self._dirs = []
+        self._entries = []
+        self._files = []
+        self._plan = []
+        self._cycle = None
+        self.last_cycle = None
+
+    def protect(self, provider):
+        """
+        Registra una función que devuelve rutas en uso (p. ej. el log actual
+        o los objetos del roster activo) que no deben borrarse
+        """
+        self._providers.append(provider)
+
+    def _protected_paths(self):
+        paths = set()
+        for provider in self._providers:
+            try:
+                paths.update(os.path.abspath(path) for path in provider() or ())
+            except Exception as e:
+                print(f"Error obteniendo archivos protegidos: {e}")
+        return paths
+
+    def _is_protected(self, path, name, protected):
+        return (name in MaintenanceUtils.PROTECTED_FILES
+                or name.endswith(".tmp")
+                or os.path.abspath(path) in protected)
+
+    def begin(self):
+        """Inicia un ciclo de limpieza (no hace nada si ya hay uno en curso)"""
+        if self.state != self.IDLE:
+            return False
+        self.state = self.SCANNING
+        self._dirs = list(self.roots)
+        self._entries = []
+        self._files = []
+        self._plan = []
+        self._cycle = {
+            'started': time.time(),
+            'files': 0,
+            'bytes': 0,
+            'removed': 0,
+            'removed_bytes': 0,
+            'slices': 0,
+            'busy_ms': 0.0
+        }
+        return True
+
+    def step(self, slice_ms=None):
+        """
+        Avanza el ciclo en curso durante como mucho slice_ms milisegundos.
+        Devuelve True cuando el ciclo terminó
+        """
+        if self.state == self.IDLE:
+            return True
+
+        start = time.perf_counter()
+        deadline = start + (self.slice_ms if slice_ms is None else slice_ms) / 1000
+        try:
+            while self.state != self.IDLE and time.perf_counter() < deadline:
+                if self.state == self.SCANNING:
+                    self._scan_one()
+                else:
+                    self._evict_one()
+        finally:
+            self._cycle['slices'] += 1
+            self._cycle['busy_ms'] += (time.perf_counter() - start) * 1000
+        return self.state == self.IDLE
+
+    def run(self):
+        """Ejecuta un ciclo completo de una vez (p. ej. desde la línea de comandos)"""
+        self.begin()
+        while not self.step(slice_ms=1000):
+            pass
+        return self.last_cycle
+
+    def _scan_one(self):
+        """Procesa una entrada (o lista un directorio) del recorrido"""
+        if self._entries:
+            entry = self._entries.pop()
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    self._dirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    self._files.append((_last_used(stat), stat.st_size, entry.path, entry.name))
+            except OSError:
+                pass
+        elif self._dirs:
+            try:
+                self._entries = list(os.scandir(self._dirs.pop()))
+            except OSError:
+                self._entries = []
+        else:
+            self._plan_eviction()
+
+    def _plan_eviction(self):
+        """Decide qué borrar: lo vencido y después lo menos usado hasta cumplir el tamaño"""
+        files = self._files
+        self._files = []
+        total = sum(size for _, size, _, _ in files)
+        self._cycle['files'] = len(files)
+        self._cycle['bytes'] = total
+
+        protected = self._protected_paths()
+        cutoff = time.time() - self.max_age
+        files.sort()
+
+        plan = []
+        for last_used, size, path, name in files:
+            if self._is_protected(path, name, protected):
+                continue
+            if last_used < cutoff or total > self.max_total_bytes:
+                plan.append((last_used, path))
+                total -= size
+            else:
+                # Ordenado por último uso: el resto es reciente y cabe
+                break
+
+        self._plan = plan[::-1]
+        self.state = self.EVICTING
+
+    def _evict_one(self):
+        if not self._plan:
+            self._finish()
+            return
 
-        # Estadísticas de logs
-        if os.path.exists(log_dir):
-            log_files = [f for f in os.listdir(log_dir) if f.endswith('.log')]
-            stats['log_files'] = len(log_files)
+        last_used, path = self._plan.pop()
+        try:
+            stat = os.stat(path)
+            # Se usó durante el ciclo: se conserva
+            if _last_used(stat) > last_used:
+                return
+            os.remove(path)
+            self._cycle['removed'] += 1
+            self._cycle['removed_bytes'] += stat.st_size
+        except OSError:
+            pass
+
+    def _finish(self):
+        self.state = self.IDLE
+        self.last_run = time.time()
+        self._cycle['duration_s'] = round(self.last_run - self._cycle['started'], 3)
+        self.last_cycle = self._cycle
+
+    def _get_clock(self):
+        if self._clock is None:
+            from kivy.clock import Clock
+            self._clock = Clock
+        return self._clock
+
+    def start(self):
+        """Programa la limpieza periódica en el reloj de Kivy"""
+        if self._event is None:
+            self._event = self._get_clock().schedule_interval(self._tick, self.tick)
+
+    def stop(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def _tick(self, dt=0):
+        if self.state == self.IDLE:
+            if self.last_run is not None and time.time() - self.last_run < self.interval:
+                return
+            self.begin()
+        self.step()
+
+    def get_stats(self):
+        """Estado y resultado del último ciclo"""
+        return {
+            'state': self.state,
+            'max_total_mb': round(self.max_total_bytes / (1024 * 1024), 2),
+            'max_age_days': round(self.max_age / 86400, 2),
+            'last_cycle': None if self.last_cycle is None else dict(
+                self.last_cycle, busy_ms=round(self.last_cycle['busy_ms'], 2))
+        }
 
-            total_size = sum(
-                os.path.getsize(os.path.join(log_dir, f))
-                for f in log_files
-                if os.path.isfile(os.path.join(log_dir, f))
-            )
-            stats['log_size_mb'] = round(total_size / (1024 * 1024), 2)
 
-        return stats
+# Instancias globales
+# El LogManager crea el directorio logs/ y abre archivos, así que se
+# construye en el primer uso y no al importar el módulo
+_log_manager = None
+_disk_janitor = None
+
+
+def get_log_manager():
+    """Obtiene instancia global del gestor de logs"""
+    global _log_manager
+
+    if _log_manager is None:
+        from config_manager import get_config
+
+        logging_config = get_config().get("logging", default={})
+        level_name = str(logging_config.get("level", "INFO")).upper()
+        _log_manager = LogManager(
+            log_level=getattr(logging, level_name, logging.INFO),
+            max_file_size=logging_config.get("max_file_size", 1048576),
+            backup_count=logging_config.get("backup_count", 3)
+        )
+
+    return _log_manager
+
+
+def _active_log_files():
+    """Log de texto que se está escribiendo (si el gestor ya existe)"""
+    if _log_manager is not None and _log_manager.writer is not None:
+        return [_log_manager.writer.log_file]
+    return []
+
+
+def get_disk_janitor():
+    """Obtiene instancia global del limpiador de disco"""
+    global _disk_janitor
+
+    if _disk_janitor is None:
+        from config_manager import get_config
+
+        maintenance = get_config().get("maintenance", default={})
+        _disk_janitor = DiskJanitor(
+            max_total_mb=maintenance.get("max_disk_mb", 50),
+            max_age_days=maintenance.get("max_age_days", 30),
+            interval=maintenance.get("interval", 3600),
+            slice_ms=maintenance.get("slice_ms", 4)
+        )
+        _disk_janitor.protect(_active_log_files)
+
+    return _disk_janitor
+
+
+def __getattr__(name):
+    """Mantiene compatibilidad con `from utils import log_manager`"""
+    if name == 'log_manager':
+        return get_log_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-# Instancias globales
-log_manager = LogManager()
 password_utils = PasswordUtils()
 data_validator = DataValidator()
 security_utils = SecurityUtils()